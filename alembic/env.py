@@ -16,7 +16,7 @@ load_dotenv()
 
 # Import models for autogenerate support
 from app.models.base import Base
-from app.models import user, product, category, sale, sale_item, customer, employee, inventory
+from app.models import user, product, category, sale, sale_item, customer, employee, inventory, change_log
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
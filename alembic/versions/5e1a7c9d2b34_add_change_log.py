@@ -0,0 +1,37 @@
+"""add_change_log
+
+Revision ID: 5e1a7c9d2b34
+Revises: c2b443d34e3a
+Create Date: 2026-10-19 09:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1a7c9d2b34'
+down_revision: Union[str, None] = 'c2b443d34e3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Log de alterações com sequência global (BIGSERIAL) para sincronização por número de sequência
+    op.create_table(
+        'change_log',
+        sa.Column('seq', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('entity', sa.String(length=50), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(length=10), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index('idx_change_log_entity_seq', 'change_log', ['entity', 'seq'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_change_log_entity_seq', table_name='change_log')
+    op.drop_table('change_log')
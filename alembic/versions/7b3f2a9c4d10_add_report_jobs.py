@@ -0,0 +1,49 @@
+"""add_report_jobs
+
+Revision ID: 7b3f2a9c4d10
+Revises: 5e1a7c9d2b34
+Create Date: 2026-10-19 10:41:07.218934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3f2a9c4d10'
+down_revision: Union[str, None] = '5e1a7c9d2b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fila de relatórios/exportações processados em segundo plano
+    op.create_table(
+        'report_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('result', sa.LargeBinary(), nullable=True),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_report_jobs_status_id', 'report_jobs', ['status', 'id'])
+    op.create_index('idx_report_jobs_user_id', 'report_jobs', ['user_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('idx_report_jobs_user_id', table_name='report_jobs')
+    op.drop_index('idx_report_jobs_status_id', table_name='report_jobs')
+    op.drop_table('report_jobs')
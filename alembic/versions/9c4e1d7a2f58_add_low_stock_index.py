@@ -0,0 +1,33 @@
+"""add_low_stock_index
+
+Revision ID: 9c4e1d7a2f58
+Revises: 7b3f2a9c4d10
+Create Date: 2026-10-19 11:02:44.583190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e1d7a2f58'
+down_revision: Union[str, None] = '7b3f2a9c4d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Índice parcial por déficit (min_stock - current_stock) apenas dos produtos ativos abaixo do mínimo
+    op.create_index(
+        'idx_products_low_stock',
+        'products',
+        [sa.text('(min_stock - current_stock) DESC'), 'id'],
+        postgresql_where=sa.text('current_stock <= min_stock AND is_active'),
+        sqlite_where=sa.text('current_stock <= min_stock AND is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_products_low_stock', table_name='products')
@@ -0,0 +1,59 @@
+"""add_change_log_counter
+
+Revision ID: a4f9d2c7e315
+Revises: e8b4c2f6a071
+Create Date: 2026-10-19 18:05:44.512930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4f9d2c7e315'
+down_revision: Union[str, None] = 'e8b4c2f6a071'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabelas sincronizadas (TRACKED_TABLES em app/models/change_log.py)
+TRACKED_TABLES = ("categories", "products", "customers", "users", "employees", "sales")
+
+
+def upgrade() -> None:
+    # O seq do change_log passa a ser atribuído no commit a partir deste contador
+    # (linha única), em vez do BIGSERIAL atribuído no flush
+    op.create_table(
+        'change_log_counter',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # Registros anteriores ao change_log não tinham entrada: um dispositivo novo
+    # sincronizando com since_seq=0 não receberia o catálogo existente. Cada registro
+    # sem entrada recebe um "insert" (os inativos chegam ao cliente como tombstones).
+    for table in TRACKED_TABLES:
+        op.execute(
+            f"""
+            INSERT INTO change_log (entity, entity_id, operation, changed_at)
+            SELECT '{table}', t.id, 'insert', t.last_updated
+            FROM {table} t
+            WHERE NOT EXISTS (
+                SELECT 1 FROM change_log c WHERE c.entity = '{table}' AND c.entity_id = t.id
+            )
+            ORDER BY t.id
+            """
+        )
+    op.execute("INSERT INTO change_log_counter (id, value) SELECT 1, COALESCE(MAX(seq), 0) FROM change_log")
+
+
+def downgrade() -> None:
+    # Devolve a numeração ao BIGSERIAL a partir do último seq atribuído
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('change_log', 'seq'), "
+            "GREATEST((SELECT COALESCE(MAX(seq), 0) FROM change_log), 1))"
+        )
+    op.drop_table('change_log_counter')
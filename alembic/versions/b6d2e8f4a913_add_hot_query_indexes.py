@@ -0,0 +1,57 @@
+"""add_hot_query_indexes
+
+Revision ID: b6d2e8f4a913
+Revises: 9c4e1d7a2f58
+Create Date: 2026-10-19 11:24:18.907342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2e8f4a913'
+down_revision: Union[str, None] = '9c4e1d7a2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Os índices de last_updated das tabelas sincronizadas já existem no banco (add_sync_columns e
+# add_sync_columns_to_employees), mas não estavam declarados nos modelos e o autogenerate os
+# removia (f8eefa29ef34); agora constam nos modelos e não são recriados aqui.
+INDEXES = [
+    # Relatórios financeiros: status = 'CONCLUIDA' AND created_at no intervalo
+    ('idx_sales_status_created_at', 'sales', ['status', 'created_at'], None),
+    # Listagem de vendas: WHERE is_active ORDER BY created_at DESC
+    ('idx_sales_active_created_at', 'sales', [sa.text('created_at DESC')], 'is_active'),
+    # Itens por venda (joinedload e carga em lote da listagem)
+    ('idx_sale_items_sale_id', 'sale_items', ['sale_id', 'id'], None),
+    # Itens por produto (relatórios por produto, exclusão de produto)
+    ('idx_sale_items_product_id', 'sale_items', ['product_id'], None),
+    # Histórico de movimentações de um produto
+    ('idx_inventory_movements_product_id', 'inventory_movements', ['product_id', 'id'], None),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY não bloqueia escrita (checkouts continuam durante o deploy),
+    # mas não pode rodar dentro de transação. IF NOT EXISTS permite repetir a migração se
+    # ela for interrompida no meio; um índice deixado INVALID deve ser removido antes.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
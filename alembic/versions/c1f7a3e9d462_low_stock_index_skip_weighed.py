@@ -0,0 +1,39 @@
+"""low_stock_index_skip_weighed
+
+Revision ID: c1f7a3e9d462
+Revises: a4f9d2c7e315
+Create Date: 2026-10-19 19:12:08.340517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1f7a3e9d462'
+down_revision: Union[str, None] = 'a4f9d2c7e315'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create_low_stock_index(where: str) -> None:
+    op.create_index(
+        'idx_products_low_stock',
+        'products',
+        [sa.text('(min_stock - current_stock) DESC'), 'id'],
+        postgresql_where=sa.text(where),
+        sqlite_where=sa.text(where),
+    )
+
+
+def upgrade() -> None:
+    # Produtos vendidos por peso não controlam estoque (ficam em 0/0) e saem do índice de estoque baixo
+    op.drop_index('idx_products_low_stock', table_name='products')
+    _create_low_stock_index('current_stock <= min_stock AND is_active AND NOT venda_por_peso')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_products_low_stock', table_name='products')
+    _create_low_stock_index('current_stock <= min_stock AND is_active')
@@ -0,0 +1,52 @@
+"""add_product_snapshot_to_sale_items
+
+Revision ID: d3a7f1c5e820
+Revises: b6d2e8f4a913
+Create Date: 2026-10-19 14:02:51.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7f1c5e820'
+down_revision: Union[str, None] = 'b6d2e8f4a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Linhas de sale_items por UPDATE do preenchimento
+BACKFILL_BATCH = 50000
+
+
+def upgrade() -> None:
+    op.add_column('sale_items', sa.Column('product_name_at_sale', sa.String(length=200), nullable=True))
+    op.add_column('sale_items', sa.Column('cost_price_at_sale', sa.Numeric(precision=10, scale=2), nullable=True))
+
+    # Vendas antigas recebem o nome e o custo atuais do produto (o histórico de preços
+    # não existe). Em lotes por faixa de id, cada um confirmado separadamente, para não
+    # manter a tabela inteira bloqueada durante o deploy.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        bounds = bind.execute(sa.text("SELECT min(id), max(id) FROM sale_items")).first()
+        if bounds[0] is None:
+            return
+        for start in range(bounds[0], bounds[1] + 1, BACKFILL_BATCH):
+            bind.execute(
+                sa.text(
+                    """
+                    UPDATE sale_items SET
+                        product_name_at_sale = (SELECT name FROM products WHERE products.id = sale_items.product_id),
+                        cost_price_at_sale = (SELECT cost_price FROM products WHERE products.id = sale_items.product_id)
+                    WHERE id >= :start AND id < :end AND product_name_at_sale IS NULL
+                    """
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH},
+            )
+
+
+def downgrade() -> None:
+    op.drop_column('sale_items', 'cost_price_at_sale')
+    op.drop_column('sale_items', 'product_name_at_sale')
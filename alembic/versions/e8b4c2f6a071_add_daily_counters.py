@@ -0,0 +1,51 @@
+"""add_daily_counters
+
+Revision ID: e8b4c2f6a071
+Revises: d3a7f1c5e820
+Create Date: 2026-10-19 16:40:12.084211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b4c2f6a071'
+down_revision: Union[str, None] = 'd3a7f1c5e820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_sales_counters',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('revenue_cents', sa.BigInteger(), nullable=False),
+        sa.Column('sales_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('day'),
+    )
+    op.create_table(
+        'daily_product_sales',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('product_name', sa.String(length=200), nullable=True),
+        sa.Column('quantity', sa.Numeric(precision=14, scale=3), nullable=False),
+        sa.Column('revenue_cents', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('day', 'product_id'),
+    )
+    op.create_index(
+        'idx_daily_product_sales_day_quantity',
+        'daily_product_sales',
+        ['day', sa.text('quantity DESC')],
+    )
+    # Os contadores começam vazios: a reconciliação periódica preenche hoje e ontem
+
+
+def downgrade() -> None:
+    op.drop_index('idx_daily_product_sales_day_quantity', table_name='daily_product_sales')
+    op.drop_table('daily_product_sales')
+    op.drop_table('daily_sales_counters')
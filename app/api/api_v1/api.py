@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from .endpoints import auth, products, categories, sales, customers, employees, inventory, users, cart, admin, sync, reports
+from .endpoints import auth, products, categories, sales, customers, employees, inventory, users, cart, admin, sync, reports, events
 
 api_router = APIRouter()
 
@@ -16,3 +16,4 @@ api_router.include_router(cart.router, prefix="/cart", tags=["cart"])
 api_router.include_router(admin.router, prefix="/admin", tags=["administrativo"])
 api_router.include_router(sync.router, prefix="/sync", tags=["sync"])
 api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(events.router, prefix="/events", tags=["events"])
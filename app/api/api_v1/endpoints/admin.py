@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from typing import List
 import os
@@ -10,6 +11,8 @@ from app.models.base import Base
 from app.models.user import User, UserRole
 from app.core.security import get_current_active_user, get_password_hash
 from app.core.config import settings
+from app.core.profiler import profiler
+from app.schemas.profiling import ProfileRouteRequest, ProfileWorkerRequest
 
 router = APIRouter()
 
@@ -78,3 +81,78 @@ def admin_reset_database(
         )
     
     return reset_database()
+
+
+def require_profiling_admin(current_user: User = Depends(get_current_active_user)) -> User:
+    """Profiling só para administradores e apenas quando habilitado (PROFILING_ENABLED)"""
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling desabilitado"
+        )
+    if not current_user.is_superuser and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem executar esta operação"
+        )
+    return current_user
+
+def _start_profiling(start, *args):
+    try:
+        start(*args)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return profiler.status()
+
+# As sessões de profiling são por worker: o status informa o pid que atendeu a requisição
+
+@router.post("/profiling/route")
+def profile_route(
+    request: ProfileRouteRequest,
+    current_user: User = Depends(require_profiling_admin)
+):
+    """Amostra as próximas N requisições da rota informada neste worker"""
+    return _start_profiling(
+        profiler.arm_route,
+        request.route,
+        request.requests,
+        request.interval_ms / 1000,
+        settings.PROFILING_MAX_SECONDS
+    )
+
+@router.post("/profiling/worker")
+def profile_worker(
+    request: ProfileWorkerRequest,
+    current_user: User = Depends(require_profiling_admin)
+):
+    """Amostra todas as threads deste worker por T segundos"""
+    return _start_profiling(
+        profiler.start_worker,
+        min(request.seconds, settings.PROFILING_MAX_SECONDS),
+        request.interval_ms / 1000
+    )
+
+@router.get("/profiling")
+def profiling_status(current_user: User = Depends(require_profiling_admin)):
+    """Situação da sessão de profiling deste worker"""
+    return profiler.status()
+
+@router.delete("/profiling")
+def stop_profiling(current_user: User = Depends(require_profiling_admin)):
+    """Interrompe a sessão em andamento (as amostras coletadas são mantidas)"""
+    profiler.stop()
+    return profiler.status()
+
+@router.get("/profiling/download", response_class=PlainTextResponse)
+def download_profile(current_user: User = Depends(require_profiling_admin)):
+    """Pilhas no formato collapsed (flamegraph.pl, speedscope, inferno)"""
+    if not profiler.samples:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Nenhuma amostra coletada neste worker"
+        )
+    started = profiler.started_at.strftime("%Y%m%d%H%M%S")
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{os.getpid()}-{started}.folded"'}
+    )
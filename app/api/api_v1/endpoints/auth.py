@@ -4,29 +4,25 @@ from sqlalchemy.orm import Session
 from datetime import datetime, timedelta, timezone
 from typing import Any
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from decimal import Decimal
 from datetime import date
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.passwords import get_password_hash, verify_password
+import logging
 from app.schemas.user import UserCreate, UserResponse, UserLogin, Token
 from app.models.user import User, UserRole
 from app.models.employee import Employee  # Adicionado import do modelo Employee
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
 # Configurações de segurança
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 # Funções auxiliares
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     delta = expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -62,11 +58,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
     Registrar novo usuário
     """
     try:
-        print(f"\n=== INÍCIO DO REGISTRO ===")
-        print(f"Tentando registrar usuário: {user_data.username}")
-        print(f"Email: {user_data.email}")
-        print(f"Nome completo: {user_data.full_name}")
-        print(f"É admin: {getattr(user_data, 'is_admin', False)}")
+        logger.debug(
+            "Registro de usuário iniciado",
+            extra={"username": user_data.username, "is_admin": getattr(user_data, 'is_admin', False)}
+        )
         
         # Verificar se já existe usuário com o mesmo username
         existing_user = db.query(User).filter(
@@ -75,7 +70,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
         ).first()
         
         if existing_user:
-            print(f"❌ ERRO: Já existe um usuário ativo com o username: {user_data.username}")
+            logger.warning("Registro recusado: username já existe", extra={"username": user_data.username})
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Já existe um usuário com este username"
@@ -89,7 +84,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
             ).first()
             
             if existing_email:
-                print(f"❌ ERRO: Já existe um usuário ativo com o email: {user_data.email}")
+                logger.warning("Registro recusado: email já existe", extra={"username": user_data.username})
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Já existe um usuário com este email"
@@ -97,7 +92,6 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
         
         # Criar hash da senha
         hashed_password = get_password_hash(user_data.password)
-        print("✅ Hash da senha criado com sucesso")
         
         # Definir role e is_superuser baseado em is_admin
         is_admin = getattr(user_data, 'is_admin', False)
@@ -114,8 +108,6 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
             salary=Decimal('1500.00')  # Valor padrão explícito
         )
         
-        print(f"📝 Criando novo usuário no banco de dados: {db_user}")
-        
         # Adicionar e commitar o usuário
         db.add(db_user)
         db.commit()
@@ -124,8 +116,6 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
         # Se o usuário for um CASHIER, criar um registro de funcionário correspondente
         if db_user.role == UserRole.CASHIER:
             try:
-                print(f"🔄 Criando registro de funcionário para o usuário {db_user.id}")
-                
                 # Extrair primeiro e último nome do full_name
                 name_parts = db_user.full_name.strip().split()
                 first_name = name_parts[0] if name_parts else ""
@@ -152,7 +142,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
                 db.commit()
                 db.refresh(employee)
                 
-                print(f"✅ Funcionário criado com sucesso! ID: {employee.id}")
+                logger.info("Funcionário criado para o usuário", extra={"user_id": db_user.id, "employee_id": employee.id})
                 
                 # Atualizar o usuário com o ID do funcionário (se necessário)
                 # db_user.employee_id = employee.id
@@ -162,19 +152,19 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
             except Exception as emp_error:
                 # Se der erro ao criar o funcionário, apenas loga o erro e continua
                 # Não falha o registro do usuário por causa disso
-                error_type = type(emp_error).__name__
-                error_detail = str(emp_error)
-                print(f"⚠️ AVISO: Não foi possível criar registro de funcionário: {error_detail} (Tipo: {error_type})")
+                logger.warning(
+                    "Não foi possível criar registro de funcionário: %s", emp_error,
+                    extra={"user_id": db_user.id, "error_type": type(emp_error).__name__}
+                )
         
-        print(f"✅ Usuário criado com sucesso! ID: {db_user.id}")
+        logger.info("Usuário registrado", extra={"user_id": db_user.id, "role": db_user.role.value})
         return db_user
         
     except Exception as e:
         db.rollback()
         error_type = type(e).__name__
         error_detail = str(e)
-        print(f"❌ ERRO ao criar usuário: {error_detail}. Tipo: {error_type}")
-        print(f"=== FIM DO REGISTRO COM ERRO ===\n")
+        logger.error("Erro ao criar usuário: %s", error_detail, extra={"error_type": error_type})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao criar usuário: {error_detail}"
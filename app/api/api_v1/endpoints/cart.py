@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 import sqlalchemy.orm
 from typing import List, Dict, Any, Optional
@@ -10,29 +11,62 @@ logger = logging.getLogger(__name__)
 
 from app.core.database import get_db
 from app.models.product import Product
-from app.models.sale import Sale, SaleStatus
+from app.models.sale import Sale, SaleStatus, generate_sale_number
 from app.models.sale_item import SaleItem
+from app.models.inventory import MovementType
+from app.services.stock import (
+    StockChange, apply_stock_changes, pending_low_stock_alerts, ProductNotFoundError, InsufficientStockError
+)
 from app.schemas.sale import CartItemCreate, CartResponse, CheckoutRequest, SaleResponse, PaymentMethod, CartItemResponse
 from app.models.user import User
 from app.core.security import get_current_active_user
+from app.core.metrics import CART_STORE_SIZE, record_checkout
+from app.core.money import to_cents, from_cents, cents_to_float, multiply, divide
+from app.core.events import SALE_COMPLETED, queue_event
+from app.services.counters import record_sale
 
 router = APIRouter(tags=["cart"])
 
+# Itens listados no evento sale.completed (o payload do NOTIFY é limitado a 8000 bytes)
+SALE_EVENT_MAX_ITEMS = 50
+
 # Armazenamento temporário do carrinho (em produção, use Redis ou banco de dados)
 cart_store: Dict[str, Dict[str, Any]] = {}
 
+# Valores do carrinho são guardados em centavos (int) e convertidos só na resposta
+
+def _new_cart(user_id: int) -> Dict[str, Any]:
+    return {
+        "items": [],
+        "created_at": datetime.utcnow(),
+        "user_id": user_id,
+        "subtotal_cents": 0
+    }
+
 def get_or_create_cart(session_id: str, user_id: int) -> Dict[str, Any]:
     """Obtém ou cria um carrinho para a sessão"""
     if session_id not in cart_store:
-        cart_store[session_id] = {
-            "items": [],
-            "created_at": datetime.utcnow(),
-            "user_id": user_id,
-            "subtotal": 0.0,
-            "total": 0.0
-        }
+        cart_store[session_id] = _new_cart(user_id)
+        CART_STORE_SIZE.set(len(cart_store))
     return cart_store[session_id]
 
+def _recalculate(cart: Dict[str, Any]) -> None:
+    cart["subtotal_cents"] = sum(item["total_price_cents"] for item in cart["items"])
+
+def _item_payload(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Item no formato de CartItemResponse"""
+    custom_price_cents = item["custom_price_cents"]
+    return {
+        "product_id": item["product_id"],
+        "nome": item["nome"],
+        "quantity": item["quantity"],
+        "unit_price": cents_to_float(item["unit_price_cents"]),
+        "total_price": cents_to_float(item["total_price_cents"]),
+        "is_weight_sale": item["is_weight_sale"],
+        "weight_in_kg": item["weight_in_kg"],
+        "custom_price": cents_to_float(custom_price_cents) if custom_price_cents is not None else None
+    }
+
 @router.post("/add", response_model=CartItemResponse)
 async def add_to_cart(
     item: CartItemCreate,
@@ -42,8 +76,7 @@ async def add_to_cart(
 ):
     """Adiciona um item ao carrinho"""
     try:
-        logger.info(f"Iniciando adição ao carrinho. Sessão: {session_id}, Usuário: {current_user.id}")
-        logger.info(f"Dados do item: {item.dict()}")
+        logger.debug("Adição ao carrinho. Sessão: %s, Usuário: %s, Item: %s", session_id, current_user.id, item)
         
         # Obter o produto
         product = db.query(Product).filter(
@@ -52,42 +85,38 @@ async def add_to_cart(
         ).first()
         
         if not product:
-            logger.error(f"Produto não encontrado ou inativo. ID: {item.product_id}")
+            logger.warning("Produto não encontrado ou inativo. ID: %s", item.product_id)
             raise HTTPException(status_code=404, detail="Produto não encontrado ou inativo")
         
-        logger.info(f"Produto encontrado: {product.nome} (ID: {product.id})")
-        
         # Verificar se é venda por peso
         if product.venda_por_peso:
-            logger.info("Produto com venda por peso")
             if not item.is_weight_sale or item.weight_in_kg is None or item.custom_price is None:
                 error_msg = "Para produtos vendidos por peso, é necessário informar o peso e o preço personalizado"
-                logger.error(error_msg)
+                logger.warning(error_msg)
                 raise HTTPException(status_code=400, detail=error_msg)
             
-            # Usar o peso informado para a quantidade
+            # Usar o peso informado para a quantidade; o total é o preço da pesagem
             quantity = float(item.weight_in_kg)
-            unit_price = float(item.custom_price) / quantity if quantity > 0 else 0
-            total_price = float(item.custom_price)
-            logger.info(f"Venda por peso - Peso: {quantity}kg, Preço total: {total_price}, Preço unitário: {unit_price}")
+            total_price_cents = to_cents(item.custom_price)
+            unit_price_cents = divide(total_price_cents, quantity)
+            logger.debug("Venda por peso - Peso: %skg, Preço total: %s, Preço unitário: %s", quantity, total_price_cents, unit_price_cents)
         else:
             # Venda normal por unidade
             quantity = float(item.quantity)
             try:
-                # Converter o preco_venda para float, tratando diferentes tipos
-                preco_venda = float(str(product.preco_venda).replace(',', '.'))
-                unit_price = preco_venda
-                total_price = unit_price * quantity
-                logger.info(f"Venda por unidade - Quantidade: {quantity}, Preço unitário: {unit_price}, Total: {total_price}")
-            except (ValueError, TypeError) as e:
+                # preco_venda é Numeric (Decimal): conversão exata para centavos
+                unit_price_cents = to_cents(product.preco_venda)
+                total_price_cents = multiply(unit_price_cents, quantity)
+                logger.debug("Venda por unidade - Quantidade: %s, Preço unitário: %s, Total: %s", quantity, unit_price_cents, total_price_cents)
+            except (ArithmeticError, ValueError, TypeError) as e:
                 error_msg = f"Erro ao converter preço do produto: {str(e)}"
-                logger.error(f"{error_msg}. Valor de preco_venda: {product.preco_venda}, Tipo: {type(product.preco_venda)}")
+                logger.error("%s. Valor de preco_venda: %r", error_msg, product.preco_venda)
                 raise HTTPException(status_code=500, detail=error_msg)
         
         # Verificar estoque (se aplicável)
         if not product.venda_por_peso and product.estoque < quantity:
             error_msg = f"Estoque insuficiente. Disponível: {product.estoque}, Solicitado: {quantity}"
-            logger.error(error_msg)
+            logger.warning(error_msg)
             raise HTTPException(status_code=400, detail=error_msg)
         
         # Inicializar carrinho se não existir
@@ -105,11 +134,11 @@ async def add_to_cart(
             "product_id": product.id,
             "nome": product.nome,
             "quantity": quantity,
-            "unit_price": unit_price,
-            "total_price": total_price,
+            "unit_price_cents": unit_price_cents,
+            "total_price_cents": total_price_cents,
             "is_weight_sale": product.venda_por_peso,
             "weight_in_kg": float(item.weight_in_kg) if product.venda_por_peso and item.weight_in_kg is not None else None,
-            "custom_price": float(item.custom_price) if product.venda_por_peso and item.custom_price is not None else None
+            "custom_price_cents": to_cents(item.custom_price) if product.venda_por_peso and item.custom_price is not None else None
         }
         
         if item_index is not None:
@@ -120,22 +149,20 @@ async def add_to_cart(
             else:
                 # Para itens normais, somar quantidades
                 cart["items"][item_index]["quantity"] += quantity
-                cart["items"][item_index]["total_price"] += total_price
+                cart["items"][item_index]["total_price_cents"] += total_price_cents
         else:
             # Adicionar novo item
             cart["items"].append(item_data)
         
-        # Recalcular totais
-        cart["subtotal"] = sum(item["total_price"] for item in cart["items"])
-        cart["total"] = cart["subtotal"]  # Sem impostos por enquanto
+        _recalculate(cart)
         
-        return item_data
+        return _item_payload(item_data)
         
     except HTTPException as he:
-        logger.error(f"Erro HTTP: {str(he.detail)}")
+        logger.debug("Erro HTTP: %s", he.detail)
         raise
     except Exception as e:
-        logger.error(f"Erro inesperado: {str(e)}", exc_info=True)
+        logger.exception("Erro inesperado: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao processar o item no carrinho: {str(e)}"
@@ -147,10 +174,10 @@ async def view_cart(
 ) -> Any:
     """Visualiza o carrinho atual"""
     try:
-        logger.info(f"Visualizando carrinho. Sessão: {session_id}")
+        logger.debug("Visualizando carrinho. Sessão: %s", session_id)
         
         if session_id not in cart_store:
-            logger.info("Carrinho não encontrado, retornando carrinho vazio")
+            logger.debug("Carrinho não encontrado, retornando carrinho vazio")
             return {
                 "items": [],
                 "subtotal": 0.0,
@@ -159,20 +186,20 @@ async def view_cart(
             }
         
         cart = cart_store[session_id]
-        logger.info(f"Carrinho encontrado: {cart}")
+        subtotal = cents_to_float(cart["subtotal_cents"])
         
         return {
-            "items": cart["items"],
-            "subtotal": cart.get("subtotal", 0.0),
-            "total": cart.get("total", 0.0),
-            "tax_amount": cart.get("tax_amount", 0.0)
+            "items": [_item_payload(item) for item in cart["items"]],
+            "subtotal": subtotal,
+            "total": subtotal,  # Sem impostos por enquanto
+            "tax_amount": 0.0
         }
         
     except HTTPException as he:
-        logger.error(f"Erro HTTP: {str(he.detail)}")
+        logger.debug("Erro HTTP: %s", he.detail)
         raise
     except Exception as e:
-        logger.error(f"Erro inesperado: {str(e)}", exc_info=True)
+        logger.exception("Erro inesperado: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao visualizar o carrinho: {str(e)}"
@@ -186,19 +213,21 @@ async def checkout(
     current_user: User = Depends(get_current_active_user)
 ):
     """Finaliza a compra e cria a venda"""
+    # Tipo de erro registrado na métrica de checkouts quando uma HTTPException é levantada
+    error_type = "internal"
     try:
-        logger.info(f"Iniciando checkout. Sessão: {session_id}, Usuário: {current_user.id}")
-        logger.info(f"Dados do checkout: {checkout_data.dict()}")
+        logger.debug("Checkout iniciado. Sessão: %s, Usuário: %s, Dados: %s", session_id, current_user.id, checkout_data)
         
         if session_id not in cart_store:
-            logger.error("Carrinho não encontrado")
+            logger.warning("Carrinho não encontrado. Sessão: %s", session_id)
+            error_type = "cart_not_found"
             raise HTTPException(status_code=404, detail="Carrinho não encontrado")
         
         cart = cart_store[session_id]
-        logger.info(f"Carrinho encontrado: {cart}")
         
         if not cart["items"]:
-            logger.error("Carrinho vazio")
+            logger.warning("Carrinho vazio. Sessão: %s", session_id)
+            error_type = "empty_cart"
             raise HTTPException(
                 status_code=400,
                 detail="O carrinho está vazio"
@@ -207,18 +236,17 @@ async def checkout(
         # Cálculo dos totais (sem IVA)
         cart_data = {
             "items": cart["items"],
-            "subtotal": cart["subtotal"],
-            "total": cart["total"]
+            "subtotal": from_cents(cart["subtotal_cents"]),
+            "total": from_cents(cart["subtotal_cents"])  # Total igual ao subtotal
         }
-        logger.info(f"Totais calculados: {cart_data}")
         
         # Cria a venda
         sale = Sale(
-            sale_number=f"V{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            sale_number=generate_sale_number(),
             status=SaleStatus.CONCLUIDA,
-            subtotal=float(cart_data["subtotal"]),
-            tax_amount=0.0,  # Sem IVA
-            total_amount=float(cart_data["total"]),  # Total igual ao subtotal
+            subtotal=cart_data["subtotal"],
+            tax_amount=0,  # Sem IVA
+            total_amount=cart_data["total"],
             payment_method=PaymentMethod(checkout_data.payment_method),
             customer_id=checkout_data.customer_id,
             notes=checkout_data.notes,
@@ -227,93 +255,122 @@ async def checkout(
         
         db.add(sale)
         db.flush()  # Gera o ID da venda sem fazer commit
-        logger.info(f"Venda criada com ID: {sale.id}")
         
-        # Adiciona os itens da venda e atualiza o estoque
-        for item in cart_data["items"]:
-            logger.info(f"Processando item: {item}")
-            
-            # Busca o produto para atualizar o estoque
-            product = db.query(Product).filter(
-                Product.id == item["product_id"],
-                Product.is_active == True
-            ).with_for_update().first()  # Bloqueia o registro para atualização
-            
-            if not product:
-                db.rollback()
-                logger.error(f"Produto com ID {item['product_id']} não encontrado")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Produto com ID {item['product_id']} não encontrado"
-                )
-            
-            logger.info(f"Produto encontrado: {product.nome}, Estoque atual: {product.estoque}")
-            
-            # Verifica se há estoque suficiente
-            if not product.venda_por_peso and product.estoque < item["quantity"]:
-                db.rollback()
-                logger.error(f"Estoque insuficiente para o produto {product.nome}. Estoque atual: {product.estoque}, Quantidade solicitada: {item['quantity']}")
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Estoque insuficiente para o produto {product.nome}"
+        # Nome e custo atuais de cada produto, gravados no item (a venda não muda se o
+        # produto for editado depois)
+        snapshots = {
+            row.id: row for row in db.execute(
+                select(Product.id, Product.nome, Product.preco_compra).where(
+                    Product.id.in_({item["product_id"] for item in cart_data["items"]}),
+                    Product.is_active == True
                 )
-            
-            # Atualiza o estoque
-            if not product.venda_por_peso:
-                novo_estoque = product.estoque - item["quantity"]
-                logger.info(f"Atualizando estoque do produto {product.id} de {product.estoque} para {novo_estoque}")
-                product.estoque = novo_estoque
-                db.add(product)
-            
-            # Cria o item da venda com todos os campos necessários
-            sale_item_data = {
+            )
+        }
+        missing = {item["product_id"] for item in cart_data["items"]} - snapshots.keys()
+        if missing:
+            raise ProductNotFoundError(min(missing))
+
+        # Baixa de estoque em um único UPDATE atômico, com o histórico em inventory_movements
+        # (produtos vendidos por peso não controlam estoque)
+        apply_stock_changes(db, [
+            StockChange(
+                product_id=item["product_id"],
+                delta=-int(item["quantity"]),
+                movement_type=MovementType.SALE,
+                reference_id=str(sale.id),
+                reference_type="sale",
+            )
+            for item in cart_data["items"] if not item.get("is_weight_sale")
+        ])
+
+        db.execute(insert(SaleItem), [
+            {
                 "sale_id": sale.id,
                 "product_id": item["product_id"],
                 "quantity": item["quantity"],
-                "unit_price": float(item["unit_price"]),
-                "total_price": float(item["total_price"]),
+                "unit_price": from_cents(item["unit_price_cents"]),
+                "total_price": from_cents(item["total_price_cents"]),
                 "is_weight_sale": item.get("is_weight_sale", False),
                 "weight_in_kg": item.get("weight_in_kg"),
-                "custom_price": item.get("custom_price")
+                "custom_price": from_cents(item["custom_price_cents"]) if item["custom_price_cents"] is not None else None,
+                "product_name_at_sale": snapshots[item["product_id"]].nome,
+                "cost_price_at_sale": snapshots[item["product_id"]].preco_compra
             }
-            
-            # Criamos o item da venda com todos os campos
-            sale_item = SaleItem(**sale_item_data)
-            db.add(sale_item)
-            logger.info(f"Item de venda criado: {sale_item}")
+            for item in cart_data["items"]
+        ])
+        
+        # Delta para os dashboards, publicado apenas se o commit abaixo acontecer
+        queue_event(db, SALE_COMPLETED, {
+            "id": sale.id,
+            "sale_number": sale.sale_number,
+            "total": cents_to_float(cart["subtotal_cents"]),
+            "payment_method": sale.payment_method,
+            "user_id": current_user.id,
+            "customer_id": sale.customer_id,
+            "items_count": len(cart_data["items"]),
+            "items": [
+                {
+                    "product_id": item["product_id"],
+                    "quantity": item["quantity"],
+                    "total": cents_to_float(item["total_price_cents"])
+                }
+                for item in cart_data["items"][:SALE_EVENT_MAX_ITEMS]
+            ]
+        })
+        
+        low_stock_alerts = pending_low_stock_alerts(db)
+        
+        # Contadores do dia (GET /reports/today): por último, pois a linha do dia fica
+        # bloqueada até o commit
+        record_sale(db, cart["subtotal_cents"], [
+            (item["product_id"], snapshots[item["product_id"]].nome, item["quantity"], item["total_price_cents"])
+            for item in cart_data["items"]
+        ])
         
         # Confirma a transação
         db.commit()
-        logger.info("Transação confirmada com sucesso")
+        logger.info(
+            "Venda finalizada",
+            extra={"sale_id": sale.id, "user_id": current_user.id, "items": len(cart_data["items"]), "total": cents_to_float(cart["subtotal_cents"])}
+        )
         
-        # Carrega a venda com todos os itens e seus produtos relacionados
-        # Usando joinedload para garantir que product.nome esteja disponível para o Pydantic
+        # Carrega a venda com todos os itens; o nome do produto já está gravado em cada item
         sale_with_items = db.query(Sale).options(
-            sqlalchemy.orm.joinedload(Sale.items).joinedload(SaleItem.product),
+            sqlalchemy.orm.selectinload(Sale.items),
             sqlalchemy.orm.joinedload(Sale.user)
         ).filter(Sale.id == sale.id).first()
         
-        # Garantir que todos os relacionamentos estejam carregados e adicionar product_name
-        for item in sale_with_items.items:
-            # Acessar o nome do produto para garantir que está carregado
-            if item.product:
-                # Adicionar o nome do produto diretamente ao item para facilitar a serialização
-                item.product_name = item.product.nome
-        
         # Limpa o carrinho após a finalização
         cart_store.pop(session_id, None)
-        logger.info("Carrinho limpo após finalização")
+        CART_STORE_SIZE.set(len(cart_store))
         
         # Criar a resposta com a mensagem de sucesso
         sale_with_items.message = "Venda finalizada com sucesso!"
+        sale_with_items.low_stock_alerts = low_stock_alerts
         
+        record_checkout()
         return sale_with_items
         
+    except ProductNotFoundError as e:
+        db.rollback()
+        logger.warning("Produto com ID %s não encontrado", e.product_id)
+        record_checkout("product_not_found")
+        raise HTTPException(status_code=400, detail=str(e))
+    except InsufficientStockError as e:
+        db.rollback()
+        logger.warning(
+            "Estoque insuficiente para o produto %s. Estoque atual: %s, Quantidade solicitada: %s",
+            e.product_id, e.available, e.requested
+        )
+        record_checkout("insufficient_stock")
+        raise HTTPException(status_code=400, detail=str(e))
     except HTTPException as he:
-        logger.error(f"Erro HTTP: {str(he.detail)}")
+        logger.debug("Erro HTTP: %s", he.detail)
+        record_checkout(error_type)
         raise
     except Exception as e:
-        logger.error(f"Erro inesperado: {str(e)}", exc_info=True)
+        logger.exception("Erro inesperado: %s", e)
+        record_checkout("internal")
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao processar a venda: {str(e)}"
@@ -328,10 +385,10 @@ async def remove_item_from_cart(
 ) -> dict:
     """Remove um item específico do carrinho"""
     try:
-        logger.info(f"Removendo item do carrinho. Sessão: {session_id}, Produto: {product_id}")
+        logger.debug("Removendo item do carrinho. Sessão: %s, Produto: %s", session_id, product_id)
         
         if session_id not in cart_store or not cart_store.get(session_id, {}).get("items"):
-            logger.info("Carrinho não encontrado ou vazio")
+            logger.debug("Carrinho não encontrado ou vazio")
             return {
                 "status": "success", 
                 "message": "Carrinho não encontrado ou já está vazio",
@@ -346,27 +403,23 @@ async def remove_item_from_cart(
         ]
         
         if len(cart["items"]) == initial_count:
-            logger.info(f"Produto com ID {product_id} não encontrado no carrinho")
+            logger.debug("Produto com ID %s não encontrado no carrinho", product_id)
             return {
                 "status": "success",
                 "message": f"Produto {product_id} não encontrado no carrinho",
-                "items": cart["items"]
+                "items": [_item_payload(item) for item in cart["items"]]
             }
         
-        # Recalcular totais
-        cart["subtotal"] = sum(item["total_price"] for item in cart["items"])
-        cart["total"] = cart["subtotal"]  # Sem impostos por enquanto
-        
-        logger.info(f"Carrinho após remoção: {cart}")
+        _recalculate(cart)
         
         return {
             "status": "success", 
             "message": f"Produto {product_id} removido do carrinho",
-            "items": cart["items"]
+            "items": [_item_payload(item) for item in cart["items"]]
         }
         
     except Exception as e:
-        logger.error(f"Erro inesperado ao remover item do carrinho: {str(e)}", exc_info=True)
+        logger.exception("Erro inesperado ao remover item do carrinho: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao remover o item do carrinho: {str(e)}"
@@ -379,10 +432,10 @@ async def clear_cart(
 ) -> dict:
     """Remove todos os itens do carrinho"""
     try:
-        logger.info(f"Limpando carrinho. Sessão: {session_id}")
+        logger.debug("Limpando carrinho. Sessão: %s", session_id)
         
         if session_id not in cart_store:
-            logger.info("Carrinho não encontrado")
+            logger.debug("Carrinho não encontrado")
             return {
                 "status": "success",
                 "message": "Carrinho não encontrado ou já está vazio",
@@ -393,15 +446,9 @@ async def clear_cart(
         user_id = cart_store[session_id].get("user_id", current_user.id)
         
         # Cria um novo carrinho vazio
-        cart_store[session_id] = {
-            "items": [],
-            "created_at": datetime.utcnow(),
-            "user_id": user_id,
-            "subtotal": 0.0,
-            "total": 0.0
-        }
+        cart_store[session_id] = _new_cart(user_id)
         
-        logger.info("Carrinho limpo com sucesso")
+        logger.debug("Carrinho limpo com sucesso")
         return {
             "status": "success",
             "message": "Carrinho limpo com sucesso",
@@ -409,7 +456,7 @@ async def clear_cart(
         }
         
     except Exception as e:
-        logger.error(f"Erro inesperado ao limpar carrinho: {str(e)}", exc_info=True)
+        logger.exception("Erro inesperado ao limpar carrinho: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Erro ao limpar o carrinho: {str(e)}"
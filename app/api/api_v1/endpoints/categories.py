@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
 from typing import List, Optional, Any
 from sqlalchemy.orm import Session
 
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
+from app.core.conditional import conditional_list
 from app.core.database import get_db
 from app.models.category import Category
 
@@ -10,18 +11,23 @@ router = APIRouter()
 
 @router.get("/", response_model=List[CategoryResponse])
 async def list_categories(
+    request: Request,
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     search: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
     """Lista todas as categorias ativas"""
-    query = db.query(Category)
-    
+    filters = []
     if search:
-        query = query.filter(Category.name.ilike(f"%{search}%"))
+        filters.append(Category.name.ilike(f"%{search}%"))
+    
+    not_modified = conditional_list(request, response, db, Category, *filters)
+    if not_modified is not None:
+        return not_modified
         
-    return query.offset(skip).limit(limit).all()
+    return db.query(Category).filter(*filters).offset(skip).limit(limit).all()
 
 @router.get("/{category_id}", response_model=CategoryResponse)
 async def get_category(category_id: int, db: Session = Depends(get_db)):
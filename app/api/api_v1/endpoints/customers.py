@@ -1,15 +1,19 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from typing import List, Any
 from sqlalchemy.orm import Session
 from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 from app.models.customer import Customer
+from app.core.conditional import conditional_list
 from app.core.database import get_db
 
 router = APIRouter()
 
 @router.get("/", response_model=List[CustomerResponse])
-async def get_customers(db: Session = Depends(get_db)) -> Any:
+async def get_customers(request: Request, response: Response, db: Session = Depends(get_db)) -> Any:
     """Listar todos os clientes"""
+    not_modified = conditional_list(request, response, db, Customer, Customer.is_active == True)
+    if not_modified is not None:
+        return not_modified
     customers = db.query(Customer).filter(Customer.is_active == True).all()
     return customers
 
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from typing import List, Any
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeResponse
 from app.models.employee import Employee
+from app.core.conditional import conditional_list
 from app.core.database import get_db
 from app.core.security import get_password_hash
 
@@ -12,15 +13,23 @@ router = APIRouter()
 
 @router.get("/", response_model=List[EmployeeResponse])
 async def get_employees(
+    request: Request,
+    response: Response,
     show_inactive: bool = False,
     db: Session = Depends(get_db)
 ) -> Any:
     """Listar funcionários ativos ou todos (incluindo inativos), ordenados alfabeticamente"""
-    query = db.query(Employee)
+    filters = []
     
     # Filtrar apenas ativos se show_inactive for False
     if not show_inactive:
-        query = query.filter(Employee.is_active == True)
+        filters.append(Employee.is_active == True)
+    
+    not_modified = conditional_list(request, response, db, Employee, *filters)
+    if not_modified is not None:
+        return not_modified
+    
+    query = db.query(Employee).filter(*filters)
     
     # Ordenar por nome completo em ordem alfabética
     query = query.order_by(Employee.full_name.asc())
@@ -0,0 +1,79 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.security import OAuth2PasswordBearer
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.events import broker
+from app.core.metrics import EVENT_STREAM_CLIENTS
+from app.core.security import get_current_active_user, get_current_user
+
+router = APIRouter()
+
+# O EventSource do navegador não envia cabeçalhos: o token também é aceito na query
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login", auto_error=False)
+
+# Intervalo de reconexão sugerido ao EventSource (ms)
+RETRY_MS = 3000
+
+
+async def _authenticate(token: Optional[str]) -> None:
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não autenticado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    # Sessão curta só para validar o usuário: a conexão do pool não fica presa ao stream
+    with SessionLocal() as db:
+        user = await get_current_user(token, db)
+        await get_current_active_user(user)
+
+
+@router.get("/stream")
+async def stream_events(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None, description="Token JWT (para o EventSource, que não envia cabeçalhos)"),
+):
+    """Eventos em tempo real (Server-Sent Events) para os dashboards.
+
+    - `sale.completed`: venda concluída (id, total, forma de pagamento, itens);
+    - `stock.changed`: novo estoque dos produtos movimentados;
+    - `stock.low`: produtos que acabaram de chegar ao estoque mínimo;
+    - `products.changed`: ids dos produtos com preço/cadastro alterado em lote;
+    - `resync`: eventos podem ter sido perdidos; recarregue os dados completos.
+
+    O dashboard carrega os relatórios uma vez ao conectar (e a cada `resync`) e depois
+    só aplica os deltas. A conexão é encerrada após EVENTS_STREAM_MAX_SECONDS e o
+    EventSource reconecta sozinho."""
+    if not settings.EVENTS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Eventos em tempo real desativados")
+    await _authenticate(token or access_token)
+
+    async def stream():
+        queue = broker.subscribe()
+        EVENT_STREAM_CLIENTS.inc()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.EVENTS_STREAM_MAX_SECONDS
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    yield await asyncio.wait_for(queue.get(), min(settings.EVENTS_HEARTBEAT_SECONDS, remaining))
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+        finally:
+            broker.unsubscribe(queue)
+            EVENT_STREAM_CLIENTS.dec()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
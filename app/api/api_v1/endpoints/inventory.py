@@ -2,8 +2,8 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List, Any
 from sqlalchemy.orm import Session
 from app.schemas.inventory import InventoryCreate, InventoryResponse
-from app.models.inventory import Inventory
-from app.models.product import Product
+from app.models.inventory import Inventory, MovementType
+from app.services.stock import StockChange, apply_stock_changes, set_stock, ProductNotFoundError, InsufficientStockError
 from app.core.database import get_db
 
 router = APIRouter()
@@ -27,46 +27,55 @@ async def get_inventory_movement(movement_id: int, db: Session = Depends(get_db)
     
     return movement
 
+# Sentido de cada tipo de movimentação (ajuste define o estoque absoluto)
+INCOMING = {MovementType.PURCHASE, MovementType.RETURN}
+OUTGOING = {MovementType.SALE, MovementType.LOSS, MovementType.TRANSFER}
+
 @router.post("/", response_model=InventoryResponse, status_code=status.HTTP_201_CREATED)
-async def create_inventory_movement(movement_data: InventoryCreate, db: Session = Depends(get_db)) -> Any:
-    """Criar nova movimentação de inventário"""
-    # Verificar se o produto existe
-    product = db.query(Product).filter(Product.id == movement_data.product_id, Product.is_active == True).first()
-    if not product:
+def create_inventory_movement(movement_data: InventoryCreate, db: Session = Depends(get_db)) -> Any:
+    """Criar nova movimentação de inventário.
+
+    O estoque anterior/novo é calculado no banco; os valores enviados em
+    previous_stock e new_stock são ignorados."""
+    movement_type = MovementType(movement_data.movement_type.value)
+    try:
+        if movement_type == MovementType.ADJUSTMENT:
+            # Ajuste: `quantity` é o novo estoque do produto
+            movements = set_stock(
+                db,
+                {movement_data.product_id: movement_data.quantity},
+                reference_id=movement_data.reference_id,
+                reference_type=movement_data.reference_type,
+                notes=movement_data.notes,
+            )
+        else:
+            delta = movement_data.quantity if movement_type in INCOMING else -movement_data.quantity
+            movements = apply_stock_changes(db, [StockChange(
+                product_id=movement_data.product_id,
+                delta=delta,
+                movement_type=movement_type,
+                reference_id=movement_data.reference_id,
+                reference_type=movement_data.reference_type,
+                notes=movement_data.notes,
+            )])
+    except ProductNotFoundError:
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Produto não encontrado"
         )
-    
-    # Calcular estoque anterior e novo
-    previous_stock = product.current_stock
-    
-    # Criar movimentação
-    movement_dict = movement_data.model_dump()
-    movement_dict['previous_stock'] = previous_stock
-    
-    if movement_data.movement_type == "purchase":
-        movement_dict['new_stock'] = previous_stock + movement_data.quantity
-        # Atualizar estoque do produto
-        product.current_stock = movement_dict['new_stock']
-    elif movement_data.movement_type == "sale":
-        if previous_stock < movement_data.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Estoque insuficiente"
-            )
-        movement_dict['new_stock'] = previous_stock - movement_data.quantity
-        # Atualizar estoque do produto
-        product.current_stock = movement_dict['new_stock']
-    elif movement_data.movement_type == "adjustment":
-        movement_dict['new_stock'] = movement_data.quantity
-        # Atualizar estoque do produto
-        product.current_stock = movement_data.quantity
-    
-    new_movement = Inventory(**movement_dict)
-    
-    db.add(new_movement)
+    except InsufficientStockError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Estoque insuficiente"
+        )
+
+    if not movements:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A movimentação não altera o estoque"
+        )
+
     db.commit()
-    db.refresh(new_movement)
-    
-    return new_movement
+    return movements[0]
@@ -1,18 +1,28 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request, Response
 from typing import List, Any, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
+from sqlalchemy import select, update, case, func, literal, or_
+from starlette.concurrency import run_in_threadpool
 
-from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse, LowStockProduct, ProductBulkUpdate, ProductBulkUpdateResult
+from app.core.conditional import conditional_list
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.events import PRODUCTS_CHANGED, queue_event
+from app.core.security import get_current_active_user
 from app.models.product import Product
 from app.models.category import Category
+from app.models.change_log import record_changes
+from app.models.user import User
+from app.services.product_import import CSV, NDJSON, ImportReport, import_chunk, iter_lines, iter_records
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
+	request: Request,
+	response: Response,
 	skip: int = Query(0, ge=0, description="Número de registros para pular"),
 	limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
 	search: Optional[str] = Query(None, description="Termo de busca por nome ou código"),
@@ -22,24 +32,30 @@ async def get_products(
 	sort_order: str = Query("asc", description="Ordem de classificação: asc, desc"),
 	db: Session = Depends(get_db)
 ) -> Any:
-	query = select(Product)
+	filters = []
 	
 	# Filtra por status ativo/inativo
 	if not include_inactive:
-		query = query.where(Product.is_active == True)  # noqa: E712
+		filters.append(Product.is_active == True)  # noqa: E712
 	
 	# Outros filtros
 	if category_id is not None:
-		query = query.where(Product.category_id == category_id)
+		filters.append(Product.category_id == category_id)
 	if search:
 		like = f"%{search}%"
-		query = query.where(
+		filters.append(
 			or_(
 				Product.nome.ilike(like), 
 				Product.codigo.ilike(like)
 			)
 		)
 	
+	# 304 se o caixa já tem esta versão da lista
+	not_modified = conditional_list(request, response, db, Product, *filters)
+	if not_modified is not None:
+		return not_modified
+	query = select(Product).where(*filters)
+	
 	# Ordenação
 	if sort_by == "nome":
 		query = query.order_by(Product.nome.asc() if sort_order == "asc" else Product.nome.desc())
@@ -56,6 +72,39 @@ async def get_products(
 	return products
 
 
+# Declarada antes de /{product_id} para não ser capturada por ela
+@router.get("/low-stock", response_model=List[LowStockProduct])
+def get_low_stock_products(
+	skip: int = Query(0, ge=0, description="Número de registros para pular"),
+	limit: int = Query(100, ge=1, le=1000, description="Número máximo de registros"),
+	category_id: Optional[int] = Query(None, description="Filtrar por categoria"),
+	db: Session = Depends(get_db)
+) -> Any:
+	"""Produtos ativos com estoque igual ou abaixo do mínimo, do maior para o menor déficit.
+	Produtos vendidos por peso não controlam estoque e ficam de fora.
+
+	O filtro e a ordenação são os mesmos do índice parcial idx_products_low_stock,
+	então a consulta lê apenas os produtos em falta."""
+	deficit = Product.estoque_minimo - Product.estoque
+	query = select(
+		Product.id,
+		Product.codigo,
+		Product.nome,
+		Product.category_id,
+		Product.estoque,
+		Product.estoque_minimo,
+		deficit.label("deficit"),
+	).where(
+		Product.estoque <= Product.estoque_minimo,
+		Product.is_active == True,  # noqa: E712
+		Product.venda_por_peso == False,  # noqa: E712
+	)
+	if category_id is not None:
+		query = query.where(Product.category_id == category_id)
+	query = query.order_by(deficit.desc(), Product.id).offset(skip).limit(limit)
+	return [row._asdict() for row in db.execute(query)]
+
+
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(product_id: int, db: Session = Depends(get_db)) -> Any:
 	product = db.get(Product, product_id)
@@ -133,6 +182,138 @@ async def create_product(product_data: ProductCreate, db: Session = Depends(get_
         )
 
 
+# Content-Types aceitos por POST /products/import
+IMPORT_FORMATS = {
+	"text/csv": CSV,
+	"application/csv": CSV,
+	"application/x-ndjson": NDJSON,
+	"application/ndjson": NDJSON,
+	"application/jsonl": NDJSON,
+}
+
+
+@router.post("/import", status_code=status.HTTP_200_OK)
+async def import_products(
+	request: Request,
+	update_existing: bool = Query(True, description="Atualiza produtos com código já cadastrado (False: reporta como erro)"),
+	db: Session = Depends(get_db),
+	current_user: User = Depends(get_current_active_user)
+) -> dict:
+	"""Importa produtos de um CSV (com cabeçalho) ou NDJSON enviado como corpo da requisição.
+
+	As colunas/chaves são as de POST /products/ (codigo ou sku, nome ou name, preco_compra,
+	preco_venda, estoque, estoque_minimo, descricao, category_id, venda_por_peso). O arquivo
+	é processado em blocos à medida que chega; linhas inválidas não interrompem a importação
+	e voltam no relatório com o número da linha e os erros."""
+	content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+	format = IMPORT_FORMATS.get(content_type)
+	if format is None:
+		raise HTTPException(
+			status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+			detail="Envie o arquivo como text/csv ou application/x-ndjson"
+		)
+
+	report = ImportReport(max_errors=settings.PRODUCTS_IMPORT_MAX_ERRORS)
+	chunk = []
+	async for record in iter_records(iter_lines(request.stream()), format):
+		chunk.append(record)
+		if len(chunk) >= settings.PRODUCTS_IMPORT_CHUNK_SIZE:
+			await run_in_threadpool(import_chunk, db, chunk, update_existing, report)
+			chunk = []
+	if chunk:
+		await run_in_threadpool(import_chunk, db, chunk, update_existing, report)
+	return report.as_dict()
+
+
+# Ids por evento products.changed (o payload do NOTIFY é limitado a 8000 bytes)
+PRODUCT_EVENT_BATCH = 500
+
+
+def _percent(column, percent):
+	return func.round(column * (1 + percent / 100), 2)
+
+
+@router.patch("/bulk", response_model=ProductBulkUpdateResult)
+def bulk_update_products(
+	data: ProductBulkUpdate,
+	db: Session = Depends(get_db),
+	current_user: User = Depends(get_current_active_user)
+) -> Any:
+	"""Altera preços e atributos de vários produtos com um único UPDATE ... RETURNING.
+
+	- `items`: preço por código (ex.: tabela de preços do fornecedor);
+	- filtro (`ids`, `codigos`, `category_id`) com alterações comuns, ex.:
+	  `{"category_id": 3, "preco_venda_percent": 5}` sobe 5% o preço de venda da categoria.
+
+	Só os produtos cujos valores mudam são atualizados (last_updated avança para a
+	sincronização) e retornados. Se algum ficar com preço de venda menor ou igual ao de
+	compra, nada é alterado."""
+	statement = update(Product)
+	if data.items is not None:
+		by_code = {item.codigo: item for item in data.items}
+		values = {}
+		for name in ("preco_compra", "preco_venda"):
+			prices = {codigo: getattr(item, name) for codigo, item in by_code.items() if getattr(item, name) is not None}
+			if prices:
+				column = getattr(Product, name)
+				values[name] = case(prices, value=Product.codigo, else_=column)
+		statement = statement.where(Product.codigo.in_(by_code))
+	else:
+		values = {}
+		if data.preco_compra is not None:
+			values["preco_compra"] = literal(data.preco_compra, Product.preco_compra.type)
+		elif data.preco_compra_percent is not None:
+			values["preco_compra"] = _percent(Product.preco_compra, data.preco_compra_percent)
+		if data.preco_venda is not None:
+			values["preco_venda"] = literal(data.preco_venda, Product.preco_venda.type)
+		elif data.preco_venda_percent is not None:
+			values["preco_venda"] = _percent(Product.preco_venda, data.preco_venda_percent)
+		if data.estoque_minimo is not None:
+			values["estoque_minimo"] = literal(data.estoque_minimo)
+		if data.venda_por_peso is not None:
+			values["venda_por_peso"] = literal(data.venda_por_peso)
+		if data.new_category_id is not None:
+			if data.new_category_id and not db.get(Category, data.new_category_id):
+				raise HTTPException(
+					status_code=status.HTTP_400_BAD_REQUEST,
+					detail=f"Categoria com ID {data.new_category_id} não encontrada"
+				)
+			values["category_id"] = literal(data.new_category_id or None, Product.category_id.type)
+
+		if data.ids is not None:
+			statement = statement.where(Product.id.in_(data.ids))
+		if data.codigos is not None:
+			statement = statement.where(Product.codigo.in_(data.codigos))
+		if data.category_id is not None:
+			statement = statement.where(Product.category_id == data.category_id)
+		if not data.include_inactive:
+			statement = statement.where(Product.is_active == True)  # noqa: E712
+
+	# Linhas que já têm os valores pedidos não são tocadas nem entram no change_log
+	statement = statement.where(or_(*(getattr(Product, name).is_distinct_from(value) for name, value in values.items())))
+	returned = db.execute(
+		statement.values(**values)
+		.returning(Product.id, Product.codigo, Product.preco_compra, Product.preco_venda)
+		.execution_options(synchronize_session=False)
+	).all()
+
+	invalid = [row.codigo for row in returned if row.preco_venda <= row.preco_compra]
+	if invalid:
+		db.rollback()
+		raise HTTPException(
+			status_code=status.HTTP_400_BAD_REQUEST,
+			detail=f"Preço de venda deve ser maior que o preço de compra: {', '.join(invalid[:20])}"
+				+ (f" e mais {len(invalid) - 20}" if len(invalid) > 20 else "")
+		)
+
+	ids = [row.id for row in returned]
+	record_changes(db, Product.__tablename__, ids)
+	for start in range(0, len(ids), PRODUCT_EVENT_BATCH):
+		queue_event(db, PRODUCTS_CHANGED, {"ids": ids[start:start + PRODUCT_EVENT_BATCH]})
+	db.commit()
+	return {"updated": len(ids), "ids": ids}
+
+
 @router.put("/{product_id}", response_model=ProductResponse)
 async def update_product(product_id: int, product_data: ProductUpdate, db: Session = Depends(get_db)) -> Any:
 	# Busca o produto
@@ -1,150 +1,197 @@
+import asyncio
+import csv
+import io
 import logging
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+import time
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
 from typing import List, Any, Optional
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime, date, timedelta
-from decimal import Decimal
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.money import to_cents, cents_to_float, multiply
+from app.core.jobs import JOB_KINDS, JobResult, enqueue, job_kind, json_result
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.models.sale import Sale
 from app.models.sale_item import SaleItem
 from app.models.product import Product
 from app.models.category import Category
+from app.models.report_job import ReportJob, DONE, FAILED
+from app.schemas.report_job import ReportJobCreate, ReportJobResponse, DailyReportParams, DateRangeParams
+from app.services.counters import today_summary
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+def _category_names(db: Session, product_ids: set) -> dict:
+    """Categoria atual de cada produto vendido, em uma consulta (a categoria não é gravada no item)"""
+    if not product_ids:
+        return {}
+    rows = db.execute(
+        select(Product.id, Category.name)
+        .join(Category, Category.id == Product.category_id)
+        .where(Product.id.in_(product_ids))
+    )
+    return {row.id: row.name for row in rows}
+
+# Despesas fixas (exemplo para demonstração): MT 3,000.00 de salários
+TOTAL_EXPENSES_CENTS = 300000
+
+def _summarize_sales(db: Session, sales: List[Sale]) -> dict:
+    """Métricas comuns aos relatórios financeiros, em uma passada pelas vendas.
+
+    Os valores do banco são convertidos uma vez para centavos (int) e somados de forma
+    exata, sem acumular Decimal e int misturados; voltam para unidades só no resultado.
+
+    Itens sem custo gravado (cost_price_at_sale nulo) ficam fora do lucro bruto e da
+    margem bruta, em vez de entrarem com custo zero; a quantidade vai em lines_without_cost."""
+    category_names = _category_names(db, {item.product_id for sale in sales for item in sale.items})
+
+    total_revenue = 0
+    gross_profit = 0
+    # Receita dos itens com custo conhecido: base da margem bruta
+    costed_revenue = 0
+    lines_without_cost = 0
+    sales_by_user = {}
+    product_sales = {}
+    category_metrics = {}
+    payment_metrics = {}
+    for sale in sales:
+        sale_total = to_cents(sale.total_amount)
+        total_revenue += sale_total
+
+        # Vendas por usuário
+        user_name = sale.user.full_name if sale.user else "Usuário Desconhecido"
+        user_metrics = sales_by_user.setdefault(user_name, {"revenue": 0, "sales_count": 0})
+        user_metrics["revenue"] += sale_total
+        user_metrics["sales_count"] += 1
+
+        # Métricas por método de pagamento
+        payment_method = sale.payment_method or "Desconhecido"
+        payment = payment_metrics.setdefault(payment_method, {"revenue": 0, "count": 0})
+        payment["revenue"] += sale_total
+        payment["count"] += 1
+
+        for item in sale.items:
+            quantity = item.quantity or 0
+            line_revenue = multiply(to_cents(item.unit_price), quantity)
+            # Custo gravado na venda, não o preço de compra atual do produto
+            if item.cost_price_at_sale is None:
+                lines_without_cost += 1
+            else:
+                costed_revenue += line_revenue
+                gross_profit += line_revenue - multiply(to_cents(item.cost_price_at_sale), quantity)
+
+            product = product_sales.setdefault(
+                item.product_name_at_sale or "Produto Desconhecido", {"quantity": 0, "revenue": 0}
+            )
+            product["quantity"] += quantity
+            product["revenue"] += line_revenue
+
+            category = category_metrics.setdefault(
+                category_names.get(item.product_id, "Sem Categoria"), {"revenue": 0, "quantity": 0}
+            )
+            category["revenue"] += line_revenue
+            category["quantity"] += quantity
+
+    for metrics in (sales_by_user, product_sales, category_metrics, payment_metrics):
+        for values in metrics.values():
+            values["revenue"] = cents_to_float(values["revenue"])
+    # Quantidades somadas como Decimal (Numeric(10, 3)); no JSON viram número, não "3.000"
+    for metrics in (product_sales, category_metrics):
+        for values in metrics.values():
+            values["quantity"] = float(values["quantity"])
+
+    total_sales = len(sales)
+    net_profit = gross_profit - TOTAL_EXPENSES_CENTS
+    gross_margin = gross_profit / costed_revenue * 100 if costed_revenue > 0 else 0
+    net_margin = net_profit / total_revenue * 100 if total_revenue > 0 else 0
+    average_ticket = round(total_revenue / total_sales) if total_sales > 0 else 0
+
+    # Top 5 produtos mais vendidos
+    top_products = sorted(
+        [{"name": k, "quantity": v["quantity"], "revenue": v["revenue"]}
+         for k, v in product_sales.items()],
+        key=lambda x: x["quantity"],
+        reverse=True
+    )[:5]
+
+    total_expenses = cents_to_float(TOTAL_EXPENSES_CENTS)
+    # Análise de desempenho
+    performance_analysis = {
+        "gross_margin": {
+            "status": "CRÍTICO" if gross_margin == 0 else "NORMAL",
+            "analysis": "Margem bruta baixa (0.0%). Urgente revisar preços e custos." if gross_margin == 0
+                        else f"Margem bruta: {gross_margin:.1f}%"
+        },
+        "net_profit": {
+            "status": "CRÍTICO" if net_profit < 0 else "POSITIVO",
+            "analysis": "Prejuízo no período. Necessária ação imediata para reverter resultado." if net_profit < 0
+                        else f"Lucro líquido positivo: MT {cents_to_float(net_profit):,.2f}"
+        },
+        "expenses": {
+            "status": "POSITIVO" if total_expenses == 0 else "NORMAL",
+            "analysis": "Boa gestão de despesas (0.0% das vendas)" if total_expenses == 0
+                        else f"Despesas: MT {total_expenses:,.2f} ({TOTAL_EXPENSES_CENTS / total_revenue * 100:.1f}% das vendas)" if total_revenue > 0
+                        else f"Despesas: MT {total_expenses:,.2f} (sem vendas para calcular porcentagem)"
+        }
+    }
+
+    return {
+        "total_sales": total_sales,
+        "total_revenue": cents_to_float(total_revenue),
+        "gross_profit": cents_to_float(gross_profit),
+        "net_profit": cents_to_float(net_profit),
+        "gross_margin": gross_margin,
+        "net_margin": net_margin,
+        "lines_without_cost": lines_without_cost,
+        "average_ticket": cents_to_float(average_ticket),
+        "total_expenses": total_expenses,
+        "expenses_detail": {
+            "Salários Funcionários": total_expenses
+        },
+        "sales_by_user": sales_by_user,
+        "top_products": top_products,
+        "category_metrics": category_metrics,
+        "payment_metrics": payment_metrics,
+        "performance_analysis": performance_analysis,
+    }
+
+def build_daily_financial_report(db: Session, report_date: date) -> dict:
+    """Relatório financeiro diário com vendas, receitas, métricas por categoria, métodos de pagamento,
+    top produtos vendidos e análise de desempenho."""
+    # Buscar vendas do dia com items e usuário
+    sales = db.query(Sale).options(
+        selectinload(Sale.items),
+        joinedload(Sale.user)
+    ).filter(
+        Sale.created_at >= report_date,
+        Sale.created_at < report_date + timedelta(days=1),
+        Sale.status == "CONCLUIDA"
+    ).all()
+
+    return {
+        "date": report_date.isoformat(),
+        **_summarize_sales(db, sales),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @router.get("/financial/daily")
 async def get_daily_financial_report(
     report_date: date = Query(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
-    """Relatório financeiro diário com vendas, receitas, métricas por categoria, métodos de pagamento,
-    top produtos vendidos e análise de desempenho."""
+    """Relatório financeiro diário (para dias com muitas vendas, prefira POST /reports/jobs)"""
     try:
-        # Buscar vendas do dia com items e usuário
-        sales = db.query(Sale).options(
-            joinedload(Sale.items).joinedload(SaleItem.product).joinedload(Product.category),
-            joinedload(Sale.user)
-        ).filter(
-            Sale.created_at >= report_date,
-            Sale.created_at < report_date.replace(day=report_date.day + 1),
-            Sale.status == "CONCLUIDA"
-        ).all()
-        
-        total_sales = len(sales)
-        total_revenue = sum(sale.total_amount for sale in sales if sale.total_amount)
-        
-        # Calcular lucro bruto
-        gross_profit = 0
-        for sale in sales:
-            for item in sale.items:
-                cost_price = item.product.preco_compra if item.product else 0
-                gross_profit += (item.unit_price - cost_price) * item.quantity
-        
-        # Calcular despesas (exemplo fixo para demonstração)
-        total_expenses = Decimal('3000.00')  # MT 3,000.00 de despesas (salários)
-        
-        # Calcular lucro líquido
-        net_profit = gross_profit - total_expenses
-        
-        # Calcular margens
-        gross_margin = (gross_profit / total_revenue * 100) if total_revenue > 0 else 0
-        net_margin = (net_profit / total_revenue * 100) if total_revenue > 0 else 0
-        
-        # Ticket médio
-        average_ticket = total_revenue / total_sales if total_sales > 0 else 0
-        
-        # Vendas por usuário
-        sales_by_user = {}
-        for sale in sales:
-            user_name = sale.user.full_name if sale.user else "Usuário Desconhecido"
-            if user_name not in sales_by_user:
-                sales_by_user[user_name] = {"revenue": 0, "sales_count": 0}
-            sales_by_user[user_name]["revenue"] += sale.total_amount or 0
-            sales_by_user[user_name]["sales_count"] += 1
-        
-        # Top 5 produtos mais vendidos
-        product_sales = {}
-        for sale in sales:
-            for item in sale.items:
-                product_name = item.product.nome if item.product else "Produto Desconhecido"
-                if product_name not in product_sales:
-                    product_sales[product_name] = {"quantity": 0, "revenue": 0}
-                product_sales[product_name]["quantity"] += item.quantity or 0
-                product_sales[product_name]["revenue"] += item.unit_price * item.quantity if item.unit_price else 0
-        
-        # Ordenar por quantidade vendida e pegar top 5
-        top_products = sorted(
-            [{"name": k, "quantity": v["quantity"], "revenue": v["revenue"]} 
-             for k, v in product_sales.items()],
-            key=lambda x: x["quantity"],
-            reverse=True
-        )[:5]
-        
-        # Métricas por categoria
-        category_metrics = {}
-        for sale in sales:
-            for item in sale.items:
-                category_name = item.product.category.name if item.product and item.product.category else "Sem Categoria"
-                if category_name not in category_metrics:
-                    category_metrics[category_name] = {"revenue": 0, "quantity": 0}
-                category_metrics[category_name]["revenue"] += item.unit_price * item.quantity if item.unit_price else 0
-                category_metrics[category_name]["quantity"] += item.quantity or 0
-        
-        # Métricas por método de pagamento
-        payment_metrics = {}
-        for sale in sales:
-            payment_method = sale.payment_method or "Desconhecido"
-            if payment_method not in payment_metrics:
-                payment_metrics[payment_method] = {"revenue": 0, "count": 0}
-            payment_metrics[payment_method]["revenue"] += sale.total_amount or 0
-            payment_metrics[payment_method]["count"] += 1
-        
-        # Análise de desempenho
-        performance_analysis = {
-            "gross_margin": {
-                "status": "CRÍTICO" if gross_margin == 0 else "NORMAL",
-                "analysis": "Margem bruta baixa (0.0%). Urgente revisar preços e custos." if gross_margin == 0 
-                            else f"Margem bruta: {gross_margin:.1f}%"
-            },
-            "net_profit": {
-                "status": "CRÍTICO" if net_profit < 0 else "POSITIVO",
-                "analysis": "Prejuízo no período. Necessária ação imediata para reverter resultado." if net_profit < 0
-                            else f"Lucro líquido positivo: MT {net_profit:,.2f}"
-            },
-            "expenses": {
-                "status": "POSITIVO" if total_expenses == 0 else "NORMAL",
-                "analysis": "Boa gestão de despesas (0.0% das vendas)" if total_expenses == 0
-                            else f"Despesas: MT {total_expenses:,.2f} ({total_expenses/total_revenue*100:.1f}% das vendas)" if total_revenue > 0
-                            else f"Despesas: MT {total_expenses:,.2f} (sem vendas para calcular porcentagem)"
-            }
-        }
-        
-        return {
-            "date": report_date.isoformat(),
-            "total_sales": total_sales,
-            "total_revenue": float(total_revenue) if total_revenue else 0.0,
-            "gross_profit": float(gross_profit),
-            "net_profit": float(net_profit),
-            "gross_margin": gross_margin,
-            "net_margin": net_margin,
-            "average_ticket": float(average_ticket),
-            "total_expenses": total_expenses,
-            "expenses_detail": {
-                "Salários Funcionários": 3000.00
-            },
-            "sales_by_user": sales_by_user,
-            "top_products": top_products,
-            "category_metrics": category_metrics,
-            "payment_metrics": payment_metrics,
-            "performance_analysis": performance_analysis,
-            "timestamp": datetime.now().isoformat()
-        }
-        
+        return build_daily_financial_report(db, report_date)
     except Exception as e:
         logger.error(f"Error generating daily financial report: {e}", exc_info=True)
         raise HTTPException(
@@ -152,6 +199,58 @@ async def get_daily_financial_report(
             detail="An unexpected error occurred while generating the financial report."
         )
 
+@router.get("/today")
+async def get_today_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Faturamento, número de vendas, ticket médio e produto mais vendido de hoje (data local),
+    lidos dos contadores atualizados pelo checkout, sem recalcular o relatório diário"""
+    return today_summary(db)
+
+def build_financial_report_range(db: Session, start_date: date, end_date: date) -> dict:
+    """Relatório financeiro para um período específico com análise completa"""
+    # Buscar vendas no período com items e usuário
+    sales = db.query(Sale).options(
+        selectinload(Sale.items),
+        joinedload(Sale.user)
+    ).filter(
+        Sale.created_at >= start_date,
+        Sale.created_at <= end_date + timedelta(days=1),
+        Sale.status == "CONCLUIDA"
+    ).all()
+
+    # Métricas diárias
+    daily_revenue = {}
+    daily_count = {}
+    for sale in sales:
+        day = sale.created_at.date()
+        daily_revenue[day] = daily_revenue.get(day, 0) + to_cents(sale.total_amount)
+        daily_count[day] = daily_count.get(day, 0) + 1
+
+    daily_metrics = {}
+    current_date = start_date
+    while current_date <= end_date:
+        revenue = daily_revenue.get(current_date, 0)
+        count = daily_count.get(current_date, 0)
+        daily_metrics[current_date.isoformat()] = {
+            "sales_count": count,
+            "total_revenue": cents_to_float(revenue),
+            "average_sale_value": cents_to_float(round(revenue / count)) if count else 0.0
+        }
+        current_date = current_date + timedelta(days=1)
+
+    return {
+        "period": {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat()
+        },
+        **_summarize_sales(db, sales),
+        "daily_metrics": daily_metrics,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
 @router.get("/financial/range")
 async def get_financial_report_range(
     start_date: date = Query(...),
@@ -159,149 +258,160 @@ async def get_financial_report_range(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
-    """Relatório financeiro para um período específico com análise completa"""
+    """Relatório financeiro para um período (para períodos longos, prefira POST /reports/jobs)"""
     try:
-        # Buscar vendas no período com items e usuário
-        sales = db.query(Sale).options(
-            joinedload(Sale.items).joinedload(SaleItem.product).joinedload(Product.category),
-            joinedload(Sale.user)
-        ).filter(
-            Sale.created_at >= start_date,
-            Sale.created_at <= end_date.replace(day=end_date.day + 1),
-            Sale.status == "CONCLUIDA"
-        ).all()
-        
-        total_sales = len(sales)
-        total_revenue = sum(sale.total_amount for sale in sales if sale.total_amount)
-        
-        # Calcular lucro bruto
-        gross_profit = 0
-        for sale in sales:
-            for item in sale.items:
-                cost_price = item.product.preco_compra if item.product else 0
-                gross_profit += (item.unit_price - cost_price) * item.quantity
-        
-        # Calcular despesas (exemplo fixo para demonstração)
-        total_expenses = Decimal('3000.00')  # MT 3,000.00 de despesas (salários)
-        
-        # Calcular lucro líquido
-        net_profit = gross_profit - total_expenses
-        
-        # Calcular margens
-        gross_margin = (gross_profit / total_revenue * 100) if total_revenue > 0 else 0
-        net_margin = (net_profit / total_revenue * 100) if total_revenue > 0 else 0
-        
-        # Ticket médio
-        average_ticket = total_revenue / total_sales if total_sales > 0 else 0
-        
-        # Vendas por usuário
-        sales_by_user = {}
-        for sale in sales:
-            user_name = sale.user.full_name if sale.user else "Usuário Desconhecido"
-            if user_name not in sales_by_user:
-                sales_by_user[user_name] = {"revenue": 0, "sales_count": 0}
-            sales_by_user[user_name]["revenue"] += sale.total_amount or 0
-            sales_by_user[user_name]["sales_count"] += 1
-        
-        # Top 5 produtos mais vendidos
-        product_sales = {}
-        for sale in sales:
-            for item in sale.items:
-                product_name = item.product.nome if item.product else "Produto Desconhecido"
-                if product_name not in product_sales:
-                    product_sales[product_name] = {"quantity": 0, "revenue": 0}
-                product_sales[product_name]["quantity"] += item.quantity or 0
-                product_sales[product_name]["revenue"] += item.unit_price * item.quantity if item.unit_price else 0
-        
-        # Ordenar por quantidade vendida e pegar top 5
-        top_products = sorted(
-            [{"name": k, "quantity": v["quantity"], "revenue": v["revenue"]} 
-             for k, v in product_sales.items()],
-            key=lambda x: x["quantity"],
-            reverse=True
-        )[:5]
-        
-        # Métricas por categoria
-        category_metrics = {}
-        for sale in sales:
-            for item in sale.items:
-                category_name = item.product.category.name if item.product and item.product.category else "Sem Categoria"
-                if category_name not in category_metrics:
-                    category_metrics[category_name] = {"revenue": 0, "quantity": 0}
-                category_metrics[category_name]["revenue"] += item.unit_price * item.quantity if item.unit_price else 0
-                category_metrics[category_name]["quantity"] += item.quantity or 0
-        
-        # Métricas por método de pagamento
-        payment_metrics = {}
-        for sale in sales:
-            payment_method = sale.payment_method or "Desconhecido"
-            if payment_method not in payment_metrics:
-                payment_metrics[payment_method] = {"revenue": 0, "count": 0}
-            payment_metrics[payment_method]["revenue"] += sale.total_amount or 0
-            payment_metrics[payment_method]["count"] += 1
-        
-        # Análise de desempenho
-        performance_analysis = {
-            "gross_margin": {
-                "status": "CRÍTICO" if gross_margin == 0 else "NORMAL",
-                "analysis": "Margem bruta baixa (0.0%). Urgente revisar preços e custos." if gross_margin == 0 
-                            else f"Margem bruta: {gross_margin:.1f}%"
-            },
-            "net_profit": {
-                "status": "CRÍTICO" if net_profit < 0 else "POSITIVO",
-                "analysis": "Prejuízo no período. Necessária ação imediata para reverter resultado." if net_profit < 0
-                            else f"Lucro líquido positivo: MT {net_profit:,.2f}"
-            },
-            "expenses": {
-                "status": "POSITIVO" if total_expenses == 0 else "NORMAL",
-                "analysis": "Boa gestão de despesas (0.0% das vendas)" if total_expenses == 0
-                            else f"Despesas: MT {total_expenses:,.2f} ({total_expenses/total_revenue*100:.1f}% das vendas)" if total_revenue > 0
-                            else f"Despesas: MT {total_expenses:,.2f} (sem vendas para calcular porcentagem)"
-            }
-        }
-        
-        # Métricas diárias
-        daily_metrics = {}
-        current_date = start_date
-        while current_date <= end_date:
-            daily_sales = [s for s in sales if s.created_at.date() == current_date]
-            daily_revenue = sum(s.total_amount for s in daily_sales if s.total_amount)
-            
-            daily_metrics[current_date.isoformat()] = {
-                "sales_count": len(daily_sales),
-                "total_revenue": float(daily_revenue) if daily_revenue else 0.0,
-                "average_sale_value": float(daily_revenue / len(daily_sales)) if daily_sales else 0.0
-            }
-            current_date = current_date + timedelta(days=1)
-        
-        return {
-            "period": {
-                "start_date": start_date.isoformat(),
-                "end_date": end_date.isoformat()
-            },
-            "total_sales": total_sales,
-            "total_revenue": float(total_revenue) if total_revenue else 0.0,
-            "gross_profit": float(gross_profit),
-            "net_profit": float(net_profit),
-            "gross_margin": gross_margin,
-            "net_margin": net_margin,
-            "average_ticket": float(average_ticket),
-            "total_expenses": total_expenses,
-            "expenses_detail": {
-                "Salários Funcionários": 3000.00
-            },
-            "sales_by_user": sales_by_user,
-            "top_products": top_products,
-            "category_metrics": category_metrics,
-            "payment_metrics": payment_metrics,
-            "performance_analysis": performance_analysis,
-            "daily_metrics": daily_metrics,
-            "timestamp": datetime.now().isoformat()
-        }
-        
+        return build_financial_report_range(db, start_date, end_date)
     except Exception as e:
         logger.error(f"Error generating financial report range: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred while generating the financial report."
-        )
\ No newline at end of file
+        )
+
+
+# Jobs em segundo plano: relatórios de períodos longos e exportações não cabem no
+# timeout da requisição e disputariam os workers com o checkout
+
+@job_kind("financial_daily", DailyReportParams)
+def financial_daily_job(db: Session, params: DailyReportParams) -> JobResult:
+    report = build_daily_financial_report(db, params.report_date)
+    return json_result(report, f"relatorio_financeiro_{params.report_date.isoformat()}.json")
+
+
+@job_kind("financial_range", DateRangeParams)
+def financial_range_job(db: Session, params: DateRangeParams) -> JobResult:
+    report = build_financial_report_range(db, params.start_date, params.end_date)
+    filename = f"relatorio_financeiro_{params.start_date.isoformat()}_{params.end_date.isoformat()}.json"
+    return json_result(report, filename)
+
+
+@job_kind("sales_export", DateRangeParams)
+def sales_export_job(db: Session, params: DateRangeParams) -> JobResult:
+    """Itens vendidos no período em CSV, lidos do banco em lotes"""
+    rows = db.execute(
+        select(
+            Sale.sale_number, Sale.created_at, Sale.status, Sale.payment_method, User.full_name,
+            Product.codigo, SaleItem.product_name_at_sale, SaleItem.quantity, SaleItem.unit_price, SaleItem.total_price,
+        )
+        .join(SaleItem, SaleItem.sale_id == Sale.id)
+        .join(Product, Product.id == SaleItem.product_id)
+        .outerjoin(User, User.id == Sale.user_id)
+        .where(Sale.created_at >= params.start_date, Sale.created_at < params.end_date + timedelta(days=1))
+        .order_by(Sale.id, SaleItem.id)
+        .execution_options(yield_per=1000)
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([
+        "numero_venda", "data", "status", "pagamento", "vendedor",
+        "codigo_produto", "produto", "quantidade", "preco_unitario", "total",
+    ])
+    for row in rows:
+        writer.writerow([
+            row.sale_number, row.created_at.isoformat(), row.status.value,
+            row.payment_method.value if row.payment_method else "", row.full_name or "",
+            row.codigo, row.product_name_at_sale, row.quantity, row.unit_price, row.total_price,
+        ])
+
+    # BOM para o Excel reconhecer o UTF-8 (acentos nos nomes de produtos)
+    filename = f"vendas_{params.start_date.isoformat()}_{params.end_date.isoformat()}.csv"
+    return JobResult(buffer.getvalue().encode("utf-8-sig"), "text/csv; charset=utf-8", filename)
+
+
+def _job_payload(job: ReportJob) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "download_url": f"{settings.API_V1_STR}/reports/jobs/{job.id}/result" if job.status == DONE else None,
+    }
+
+
+def _get_job(db: Session, job_id: int, current_user: User) -> ReportJob:
+    job = db.get(ReportJob, job_id, populate_existing=True)
+    # Jobs de outros usuários aparecem como inexistentes
+    if job is None or (job.user_id != current_user.id and not current_user.is_superuser):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job não encontrado"
+        )
+    return job
+
+
+def _job_status(db: Session, job_id: int, current_user: User) -> dict:
+    try:
+        return _job_payload(_get_job(db, job_id, current_user))
+    finally:
+        # Encerra a transação: libera a conexão durante a espera e a próxima leitura vê o estado novo
+        db.rollback()
+
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(
+    job_in: ReportJobCreate,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Enfileira um relatório ou exportação e retorna o id para acompanhar o job"""
+    kind = JOB_KINDS.get(job_in.kind)
+    if kind is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Tipo de relatório desconhecido. Disponíveis: {', '.join(sorted(JOB_KINDS))}"
+        )
+    try:
+        params = kind.params_model(**job_in.params)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=jsonable_encoder(e.errors(include_url=False, include_context=False))
+        )
+
+    job = enqueue(db, job_in.kind, params, current_user.id)
+    response.headers["Location"] = f"{settings.API_V1_STR}/reports/jobs/{job.id}"
+    return _job_payload(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: int,
+    wait: float = Query(0, ge=0, description="Segundos aguardando a conclusão (long polling)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Estado do job. Com `wait`, responde assim que o job terminar ou quando o prazo acabar"""
+    deadline = time.monotonic() + min(wait, settings.JOBS_LONG_POLL_SECONDS)
+    while True:
+        payload = await run_in_threadpool(_job_status, db, job_id, current_user)
+        if payload["status"] in (DONE, FAILED) or time.monotonic() >= deadline:
+            return payload
+        # A espera não ocupa thread nem conexão do pool
+        await asyncio.sleep(0.5)
+
+
+@router.get("/jobs/{job_id}/result")
+def download_report_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Response:
+    """Download do resultado de um job concluído"""
+    job = _get_job(db, job_id, current_user)
+    if job.status != DONE:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Relatório ainda não está pronto (status: {job.status})"
+        )
+    return Response(
+        content=job.result,
+        media_type=job.content_type,
+        headers={"Content-Disposition": f'attachment; filename="{job.filename}"'},
+    )
@@ -1,20 +1,102 @@
 import logging
+from collections import defaultdict
 from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import List, Any, Optional
-from sqlalchemy.orm import Session, joinedload
+from typing import Dict, List, Any, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
 from datetime import datetime
 
 from app.schemas.sale import SaleResponse, CheckoutRequest, SaleStatus
-from app.models.sale import Sale
+from app.models.sale import Sale, generate_sale_number
 from app.core.database import get_db
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.models.sale_item import SaleItem
+from app.core.serialization import FastJSONResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=List[SaleResponse])
+# Apenas as colunas usadas na listagem: nada de hidratar Product/User completos
+SALE_LIST_COLUMNS = (
+    Sale.id,
+    Sale.sale_number,
+    Sale.status,
+    Sale.subtotal,
+    Sale.tax_amount,
+    Sale.discount_amount,
+    Sale.total_amount,
+    Sale.payment_method,
+    Sale.created_at,
+    Sale.user_id,
+    User.full_name.label("user_name"),
+)
+
+SALE_ITEM_LIST_COLUMNS = (
+    SaleItem.id,
+    SaleItem.sale_id,
+    SaleItem.product_id,
+    SaleItem.product_name_at_sale.label("product_name"),
+    SaleItem.quantity,
+    SaleItem.unit_price,
+    SaleItem.total_price,
+    SaleItem.is_weight_sale,
+    SaleItem.weight_in_kg,
+    SaleItem.custom_price,
+    SaleItem.created_at,
+)
+
+def _item_payload(item) -> dict:
+    """Item no formato de SaleItemResponse; Decimal e datetime ficam para o serializador"""
+    return {
+        "id": item.id,
+        "product_id": item.product_id,
+        "product_name": item.product_name or "Produto não encontrado",
+        "quantity": item.quantity or 0.0,
+        "unit_price": item.unit_price or 0.0,
+        "total_price": item.total_price or 0.0,
+        "is_weight_sale": bool(item.is_weight_sale),
+        "weight_in_kg": item.weight_in_kg or None,
+        "custom_price": item.custom_price or None,
+        "created_at": item.created_at
+    }
+
+def _sale_payload(sale, items: List[dict]) -> dict:
+    """Venda no formato de SaleResponse, montada em uma única passagem"""
+    return {
+        "id": sale.id,
+        "sale_number": sale.sale_number,
+        "status": sale.status,
+        "subtotal": sale.subtotal or 0.0,
+        "tax_amount": sale.tax_amount or 0.0,
+        "discount_amount": sale.discount_amount or 0.0,
+        "total_amount": sale.total_amount or 0.0,
+        "payment_method": sale.payment_method,
+        "created_at": sale.created_at,
+        "items": items,
+        "message": None,
+        "user_id": sale.user_id,
+        "user_name": sale.user_name or "Usuário Desconhecido"
+    }
+
+def _select_sales():
+    return select(*SALE_LIST_COLUMNS).outerjoin(User, User.id == Sale.user_id)
+
+def _load_items(db: Session, sale_ids: List[int]) -> Dict[int, List[dict]]:
+    """Carrega os itens de todas as vendas da página em uma única consulta"""
+    items = defaultdict(list)
+    if not sale_ids:
+        return items
+    rows = db.execute(
+        select(*SALE_ITEM_LIST_COLUMNS)
+        .where(SaleItem.sale_id.in_(sale_ids))
+        .order_by(SaleItem.sale_id, SaleItem.id)
+    ).all()
+    for row in rows:
+        items[row.sale_id].append(_item_payload(row))
+    return items
+
+@router.get("/", response_model=List[SaleResponse], response_class=FastJSONResponse)
 async def get_sales(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
@@ -23,52 +105,18 @@ async def get_sales(
 ) -> Any:
     """List all sales with their items and product details"""
     try:
-        # Carrega as vendas com seus itens, produtos e usuário relacionados
-        sales = db.query(Sale)\
-            .options(
-                joinedload(Sale.items)\
-                .joinedload(SaleItem.product),
-                joinedload(Sale.user)
-            )\
-            .filter(Sale.is_active == True)\
-            .order_by(Sale.created_at.desc())\
-            .offset(skip)\
-            .limit(limit)\
-            .all()
+        # Uma consulta para a página de vendas (LIMIT sem subquery) e outra para os itens
+        sales = db.execute(
+            _select_sales()
+            .where(Sale.is_active == True)
+            .order_by(Sale.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        ).all()
+        items = _load_items(db, [sale.id for sale in sales])
             
-        # Prepara a resposta incluindo os itens com detalhes do produto
-        result = []
-        for sale in sales:
-            sale_dict = {
-                "id": sale.id,
-                "sale_number": sale.sale_number,
-                "status": sale.status,
-                "subtotal": float(sale.subtotal) if sale.subtotal else 0.0,
-                "tax_amount": float(sale.tax_amount) if sale.tax_amount else 0.0,
-                "discount_amount": float(sale.discount_amount) if sale.discount_amount else 0.0,
-                "total_amount": float(sale.total_amount) if sale.total_amount else 0.0,
-                "payment_method": sale.payment_method,
-                "created_at": sale.created_at,
-                "user_id": sale.user_id,
-                "user_name": sale.user.full_name if sale.user else "Usuário Desconhecido",
-                "items": [
-                    {
-                        "id": item.id,
-                        "product_id": item.product_id,
-                        "product_name": item.product.nome if item.product else "Produto não encontrado",
-                        "quantity": float(item.quantity) if item.quantity else 0.0,
-                        "unit_price": float(item.unit_price) if item.unit_price else 0.0,
-                        "total_price": float(item.total_price) if item.total_price else 0.0,
-                        "is_weight_sale": bool(getattr(item, 'is_weight_sale', False)),
-                        "weight_in_kg": float(getattr(item, 'weight_in_kg', 0)) if getattr(item, 'weight_in_kg', None) else None,
-                        "custom_price": float(getattr(item, 'custom_price', 0)) if getattr(item, 'custom_price', None) else None,
-                        "created_at": item.created_at
-                    } for item in sale.items
-                ]
-            }
-            result.append(sale_dict)
-            
-        return result
+        # Serializa direto para JSON, sem revalidar pelo response_model
+        return FastJSONResponse([_sale_payload(sale, items[sale.id]) for sale in sales])
     except Exception as e:
         logger.error(f"Error fetching sales: {e}", exc_info=True)
         raise HTTPException(
@@ -76,7 +124,7 @@ async def get_sales(
             detail="An unexpected error occurred while fetching sales."
         )
 
-@router.get("/{sale_id}", response_model=SaleResponse)
+@router.get("/{sale_id}", response_model=SaleResponse, response_class=FastJSONResponse)
 async def get_sale(
     sale_id: int,
     db: Session = Depends(get_db),
@@ -84,49 +132,15 @@ async def get_sale(
 ) -> Any:
     """Get sale by ID with items and product details"""
     try:
-        # Carrega a venda com seus itens, produtos e usuário relacionados
-        sale = db.query(Sale)\
-            .options(
-                joinedload(Sale.items)\
-                .joinedload(SaleItem.product),
-                joinedload(Sale.user)
-            )\
-            .filter(Sale.id == sale_id, Sale.is_active == True)\
-            .first()
+        sale = db.execute(
+            _select_sales().where(Sale.id == sale_id, Sale.is_active == True)
+        ).first()
             
         if not sale:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sale not found")
         
-        # Prepara a resposta incluindo os itens com detalhes do produto
-        result = {
-            "id": sale.id,
-            "sale_number": sale.sale_number,
-            "status": sale.status,
-            "subtotal": float(sale.subtotal) if sale.subtotal else 0.0,
-            "tax_amount": float(sale.tax_amount) if sale.tax_amount else 0.0,
-            "discount_amount": float(sale.discount_amount) if sale.discount_amount else 0.0,
-            "total_amount": float(sale.total_amount) if sale.total_amount else 0.0,
-            "payment_method": sale.payment_method,
-            "created_at": sale.created_at,
-            "user_id": sale.user_id,
-            "user_name": sale.user.full_name if sale.user else "Usuário Desconhecido",
-            "items": [
-                {
-                    "id": item.id,
-                    "product_id": item.product_id,
-                    "product_name": item.product.nome if item.product else "Produto não encontrado",
-                    "quantity": float(item.quantity) if item.quantity else 0.0,
-                    "unit_price": float(item.unit_price) if item.unit_price else 0.0,
-                    "total_price": float(item.total_price) if item.total_price else 0.0,
-                    "is_weight_sale": bool(getattr(item, 'is_weight_sale', False)),
-                    "weight_in_kg": float(getattr(item, 'weight_in_kg', 0)) if getattr(item, 'weight_in_kg', None) else None,
-                    "custom_price": float(getattr(item, 'custom_price', 0)) if getattr(item, 'custom_price', None) else None,
-                    "created_at": item.created_at
-                } for item in sale.items
-            ]
-        }
-            
-        return result
+        items = _load_items(db, [sale.id])
+        return FastJSONResponse(_sale_payload(sale, items[sale.id]))
     except HTTPException:
         raise
     except Exception as e:
@@ -144,7 +158,7 @@ async def create_sale(
 ) -> Any:
     """Create a new sale"""
     try:
-        sale_number = f"V{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        sale_number = generate_sale_number()
         sale = Sale(
             sale_number=sale_number,
             status=SaleStatus.CONCLUIDA,
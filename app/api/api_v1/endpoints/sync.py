@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, Query, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Type, TypeVar, Generic
+from typing import List, Optional, Tuple, Type, TypeVar, Generic
 from datetime import datetime
 
 from app.core.database import get_db
 from app.core.security import get_current_active_user
+from app.core.serialization import FastJSONResponse
+from app.core.metrics import record_sync
 from app.models.user import User
 from app.models.product import Product
 from app.models.category import Category
@@ -13,10 +16,12 @@ from app.models.sale import Sale
 from app.models.sale_item import SaleItem
 from app.models.user import User
 from app.models.employee import Employee
+from app.models.change_log import ChangeLog, DELETE
+from app.services.stock import set_stock
 
-from app.schemas.sync import SyncResponse, SyncQuery
+from app.schemas.sync import SyncResponse, SyncQuery, Tombstone
 from app.schemas.product_sync import ProductSyncResponse
-from app.schemas.category import CategoryCreate
+from app.schemas.category_sync import CategorySyncResponse
 from app.schemas.customer_sync import CustomerSyncResponse
 from app.schemas.sale_sync import SaleSyncResponse
 from app.schemas.user_sync import UserSyncResponse
@@ -27,41 +32,130 @@ router = APIRouter()
 
 T = TypeVar('T')
 
+# Tamanho máximo de página na sincronização por sequência
+SYNC_PAGE_LIMIT = 5000
+
+def fetch_updated(
+    db: Session,
+    model: Type[T],
+    last_sync: Optional[datetime],
+    since_seq: Optional[int],
+    limit: int,
+    options: tuple = ()
+) -> Tuple[List[T], List[Tombstone], int, bool]:
+    """Busca registros alterados pelo change_log (since_seq) ou, para clientes antigos, por last_updated.
+
+    Registros desativados (is_active=False) ou removidos voltam apenas como tombstones.
+    Retorna (registros, tombstones, last_seq, has_more)."""
+    entity = model.__tablename__
+    query = db.query(model)
+    if options:
+        query = query.options(*options)
+
+    if since_seq is not None:
+        entries = db.query(ChangeLog.seq, ChangeLog.entity_id, ChangeLog.operation, ChangeLog.changed_at).filter(
+            ChangeLog.entity == entity,
+            ChangeLog.seq > since_seq
+        ).order_by(ChangeLog.seq).limit(limit + 1).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        last_seq = entries[-1].seq if entries else since_seq
+        # Última operação de cada registro dentro da página
+        latest = {entry.entity_id: entry for entry in entries}
+        records = query.filter(model.id.in_(latest)).order_by(model.id).all() if latest else []
+    else:
+        if last_sync is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe last_sync ou since_seq"
+            )
+        has_more = False
+        # A sequência é lida antes dos registros: alterações concorrentes são reenviadas na próxima página
+        last_seq = db.query(func.max(ChangeLog.seq)).filter(ChangeLog.entity == entity).scalar() or 0
+        records = query.filter(model.last_updated > last_sync).all()
+        latest = {
+            entry.entity_id: entry
+            for entry in db.query(ChangeLog.entity_id, ChangeLog.operation, ChangeLog.changed_at).filter(
+                ChangeLog.entity == entity,
+                ChangeLog.operation == DELETE,
+                ChangeLog.changed_at > last_sync
+            )
+        }
+
+    found = {record.id for record in records}
+    updated = [record for record in records if record.is_active]
+    tombstones = [
+        Tombstone(id=record.id, deleted_at=record.last_updated)
+        for record in records if not record.is_active
+    ]
+    # Registros removidos fisicamente só existem no change_log
+    tombstones.extend(
+        Tombstone(id=entity_id, deleted_at=entry.changed_at)
+        for entity_id, entry in latest.items()
+        if entity_id not in found and entry.operation == DELETE
+    )
+    record_sync(entity, "pull", "updated", len(updated))
+    record_sync(entity, "pull", "deleted", len(tombstones))
+    return updated, tombstones, last_seq, has_more
+
 def sync_table(db: Session, model: Type[T], records: List[T]) -> SyncResponse[T]:
-    """Função genérica para sincronizar registros de qualquer tabela"""
+    """Função genérica para sincronizar registros de qualquer tabela.
+
+    O estoque de produtos não é sobrescrito diretamente: a diferença passa pelo serviço
+    de estoque, que registra a movimentação e não perde vendas feitas no servidor
+    entre a leitura e a escrita."""
     synced = []
     conflicts = []
+    stock_targets = []
     
     for record in records:
+        data = record.dict()
+        stock = data.pop("estoque", None) if model is Product else None
         db_record = db.query(model).filter(model.id == record.id).first()
         
         if not db_record:
             # Novo registro
-            db_record = model(**record.dict())
+            db_record = model(**data)
             db.add(db_record)
             synced.append(record)
         else:
             # Registro existente - verificar timestamp
             if record.last_updated > db_record.last_updated:
                 # Atualizar registro no servidor
-                for key, value in record.dict().items():
+                for key, value in data.items():
                     setattr(db_record, key, value)
                 synced.append(record)
             else:
                 # Conflito - registro do servidor é mais recente
                 conflicts.append(record)
+                continue
+        # is_active ainda é None em registros novos (o padrão só é aplicado no flush)
+        if stock is not None and db_record.is_active is not False:
+            stock_targets.append((db_record, stock))
     
+    if stock_targets:
+        db.flush()  # IDs dos produtos novos
+        set_stock(
+            db,
+            {product.id: stock for product, stock in stock_targets},
+            reference_type="sync",
+            notes="Estoque enviado pela sincronização",
+        )
     db.commit()
+    record_sync(model.__tablename__, "push", "synced", len(synced))
+    record_sync(model.__tablename__, "push", "conflict", len(conflicts))
     return SyncResponse(synced_records=synced, conflicts=conflicts)
 
 @router.get("/products", response_model=SyncResponse[ProductSyncResponse])
 async def get_products_for_sync(
-    last_sync: datetime = Query(...),
+    last_sync: Optional[datetime] = Query(None),
+    since_seq: Optional[int] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=SYNC_PAGE_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    products = db.query(Product).filter(Product.last_updated > last_sync).all()
-    return SyncResponse(server_updated=products)
+    products, deleted, last_seq, has_more = fetch_updated(db, Product, last_sync, since_seq, limit)
+    return SyncResponse(server_updated=products, deleted=deleted, last_seq=last_seq, has_more=has_more)
 
 @router.post("/products", response_model=SyncResponse[ProductSyncResponse])
 async def sync_products(
@@ -71,18 +165,20 @@ async def sync_products(
 ):
     return sync_table(db, Product, products)
 
-@router.get("/categories", response_model=SyncResponse[CategoryCreate])
+@router.get("/categories", response_model=SyncResponse[CategorySyncResponse])
 async def get_categories_for_sync(
-    last_sync: datetime = Query(...),
+    last_sync: Optional[datetime] = Query(None),
+    since_seq: Optional[int] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=SYNC_PAGE_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    categories = db.query(Category).filter(Category.last_updated > last_sync).all()
-    return SyncResponse(server_updated=categories)
+    categories, deleted, last_seq, has_more = fetch_updated(db, Category, last_sync, since_seq, limit)
+    return SyncResponse(server_updated=categories, deleted=deleted, last_seq=last_seq, has_more=has_more)
 
-@router.post("/categories", response_model=SyncResponse[CategoryCreate])
+@router.post("/categories", response_model=SyncResponse[CategorySyncResponse])
 async def sync_categories(
-    categories: List[CategoryCreate],
+    categories: List[CategorySyncResponse],
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
@@ -90,12 +186,14 @@ async def sync_categories(
 
 @router.get("/customers", response_model=SyncResponse[CustomerSyncResponse])
 async def get_customers_for_sync(
-    last_sync: datetime = Query(...),
+    last_sync: Optional[datetime] = Query(None),
+    since_seq: Optional[int] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=SYNC_PAGE_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    customers = db.query(Customer).filter(Customer.last_updated > last_sync).all()
-    return SyncResponse(server_updated=customers)
+    customers, deleted, last_seq, has_more = fetch_updated(db, Customer, last_sync, since_seq, limit)
+    return SyncResponse(server_updated=customers, deleted=deleted, last_seq=last_seq, has_more=has_more)
 
 @router.post("/customers", response_model=SyncResponse[CustomerSyncResponse])
 async def sync_customers(
@@ -105,44 +203,62 @@ async def sync_customers(
 ):
     return sync_table(db, Customer, customers)
 
-@router.get("/sales", response_model=SyncResponse[SaleSyncResponse])
+@router.get("/sales", response_model=SyncResponse[SaleSyncResponse], response_class=FastJSONResponse)
 async def get_sales_for_sync(
-    last_sync: datetime = Query(...),
+    last_sync: Optional[datetime] = Query(None),
+    since_seq: Optional[int] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=SYNC_PAGE_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    from sqlalchemy.orm import joinedload
+    from sqlalchemy.orm import joinedload, selectinload
     
-    sales = db.query(Sale).options(joinedload(Sale.items), joinedload(Sale.user)).filter(Sale.last_updated > last_sync).all()
+    # selectinload carrega os itens em uma consulta separada, sem multiplicar as linhas das vendas
+    sales, deleted, last_seq, has_more = fetch_updated(
+        db, Sale, last_sync, since_seq, limit,
+        options=(selectinload(Sale.items), joinedload(Sale.user))
+    )
     
-    # Convert sale items to properly handle NULL values
-    converted_sales = []
-    for sale in sales:
-        sale_dict = sale.__dict__.copy()
-        if hasattr(sale, 'items'):
-            sale_dict['items'] = [
+    # Monta o payload de SaleSyncResponse em uma passagem e serializa direto com orjson
+    server_updated = [
+        {
+            "id": sale.id,
+            "last_updated": sale.last_updated,
+            "synced": bool(sale.synced),
+            "sale_number": sale.sale_number,
+            "status": sale.status,
+            "subtotal": sale.subtotal or 0.0,
+            "tax_amount": sale.tax_amount or 0.0,
+            "discount_amount": sale.discount_amount or 0.0,
+            "total_amount": sale.total_amount or 0.0,
+            "payment_method": sale.payment_method,
+            "customer_id": sale.customer_id,
+            "notes": sale.notes,
+            "user_id": sale.user.id if sale.user else None,
+            "user_name": sale.user.full_name if sale.user else "Usuário Desconhecido",
+            "items": [
                 {
-                    "id": item.id,
                     "product_id": item.product_id,
-                    "quantity": float(item.quantity) if item.quantity else 0.0,
-                    "unit_price": float(item.unit_price) if item.unit_price else 0.0,
-                    "total_price": float(item.total_price) if item.total_price else 0.0,
-                    "is_weight_sale": bool(getattr(item, 'is_weight_sale', False)),
-                    "weight_in_kg": float(getattr(item, 'weight_in_kg', 0)) if getattr(item, 'weight_in_kg', None) else None,
-                    "custom_price": float(getattr(item, 'custom_price', 0)) if getattr(item, 'custom_price', None) else None,
-                    "created_at": item.created_at
+                    "quantity": item.quantity or 0.0,
+                    "unit_price": item.unit_price or 0.0,
+                    "total_price": item.total_price or 0.0,
+                    "is_weight_sale": bool(item.is_weight_sale),
+                    "weight_in_kg": item.weight_in_kg or None,
+                    "custom_price": item.custom_price or None
                 } for item in sale.items
             ]
-        # Adicionar informações do usuário
-        if hasattr(sale, 'user') and sale.user:
-            sale_dict['user_id'] = sale.user.id
-            sale_dict['user_name'] = sale.user.full_name
-        else:
-            sale_dict['user_id'] = None
-            sale_dict['user_name'] = "Usuário Desconhecido"
-        converted_sales.append(sale_dict)
+        }
+        for sale in sales
+    ]
     
-    return SyncResponse(server_updated=converted_sales)
+    return FastJSONResponse({
+        "synced_records": [],
+        "conflicts": [],
+        "server_updated": server_updated,
+        "deleted": deleted,
+        "last_seq": last_seq,
+        "has_more": has_more
+    })
 
 @router.post("/sales", response_model=SyncResponse[SaleSyncResponse])
 async def sync_sales(
@@ -154,12 +270,14 @@ async def sync_sales(
 
 @router.get("/users", response_model=SyncResponse[UserSyncResponse])
 async def get_users_for_sync(
-    last_sync: datetime = Query(...),
+    last_sync: Optional[datetime] = Query(None),
+    since_seq: Optional[int] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=SYNC_PAGE_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    users = db.query(User).filter(User.last_updated > last_sync).all()
-    return SyncResponse(server_updated=users)
+    users, deleted, last_seq, has_more = fetch_updated(db, User, last_sync, since_seq, limit)
+    return SyncResponse(server_updated=users, deleted=deleted, last_seq=last_seq, has_more=has_more)
 
 @router.post("/users", response_model=SyncResponse[UserSyncResponse])
 async def sync_users(
@@ -171,12 +289,14 @@ async def sync_users(
 
 @router.get("/employees", response_model=SyncResponse[EmployeeSyncResponse])
 async def get_employees_for_sync(
-    last_sync: datetime = Query(...),
+    last_sync: Optional[datetime] = Query(None),
+    since_seq: Optional[int] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=SYNC_PAGE_LIMIT),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    employees = db.query(Employee).filter(Employee.last_updated > last_sync).all()
-    return SyncResponse(server_updated=employees)
+    employees, deleted, last_seq, has_more = fetch_updated(db, Employee, last_sync, since_seq, limit)
+    return SyncResponse(server_updated=employees, deleted=deleted, last_seq=last_seq, has_more=has_more)
 
 @router.post("/employees", response_model=SyncResponse[EmployeeSyncResponse])
 async def sync_employees(
@@ -0,0 +1,113 @@
+"""GET condicional (ETag fraco e Last-Modified) para as listagens do catálogo.
+
+Produtos, categorias, funcionários e clientes mudam pouco e são consultados o tempo
+todo pelos caixas. A versão de uma listagem combina:
+
+- o último seq do change_log da tabela (índice idx_change_log_entity_seq). O seq é
+  atribuído no commit, em ordem (ver app/models/change_log.py), então qualquer
+  alteração confirmada muda a versão, inclusive a de uma transação que começou antes
+  de outra já vista pelo caixa;
+- max(last_updated) e count(*) sobre o mesmo filtro da consulta, que cobrem linhas
+  gravadas sem passar pelo change_log (ex.: carga com --no-change-log).
+
+Sozinho, max(last_updated) não bastaria: last_updated recebe now(), o início da
+transação, e tem resolução de segundos no SQLite.
+
+Last-Modified vem do changed_at da última alteração (horário do commit). Só é
+enviado depois que o segundo dessa alteração terminou: com resolução de segundos,
+uma alteração no mesmo segundo seria invisível para If-Modified-Since. Clientes
+devem preferir If-None-Match.
+
+Uso no endpoint, antes da consulta da lista:
+
+    not_modified = conditional_list(request, response, db, Product, *filters)
+    if not_modified is not None:
+        return not_modified
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.change_log import ChangeLog
+
+# O cliente pode reutilizar a cópia, mas sempre revalida com o servidor
+CACHE_CONTROL = "private, no-cache"
+
+# Margem para diferenças de relógio entre os workers que gravam changed_at
+CLOCK_SKEW = timedelta(seconds=1)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Comparação fraca (RFC 9110): o prefixo W/ é ignorado
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Last-Modified tem resolução de segundos
+    return last_modified.replace(microsecond=0) <= since
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite devolve datetimes sem fuso; o servidor grava em UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def conditional_list(request: Request, response: Response, db: Session, model, *criteria) -> Optional[Response]:
+    """Define ETag e Last-Modified da listagem em `response` e retorna um 304 se o
+    cliente já tem esta versão (None: o endpoint segue e monta a lista)"""
+    last_change = db.execute(
+        select(ChangeLog.seq, ChangeLog.changed_at)
+        .where(ChangeLog.entity == model.__tablename__)
+        .order_by(ChangeLog.seq.desc())
+        .limit(1)
+    ).first()
+    last_updated, count = db.execute(
+        select(func.max(model.last_updated), func.count()).select_from(model).where(*criteria)
+    ).one()
+    last_updated = _utc(last_updated)
+    last_seq = last_change.seq if last_change else 0
+
+    # A query string entra no hash: paginação, ordenação e busca mudam o corpo
+    version = (
+        f"{request.url.path}?{request.url.query}|{last_seq}"
+        f"|{last_updated.isoformat() if last_updated else ''}|{count}"
+    )
+    etag = f'W/"{hashlib.sha1(version.encode()).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    last_modified = _utc(last_change.changed_at) if last_change else None
+    now = datetime.now(timezone.utc)
+    if last_modified is not None and last_modified.replace(microsecond=0) + timedelta(seconds=1) + CLOCK_SKEW > now:
+        # Alteração recente demais: outra no mesmo segundo não mudaria o Last-Modified
+        last_modified = None
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    response.headers.update(headers)
+
+    # If-None-Match tem precedência; If-Modified-Since só vale sem ele
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+    if not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
@@ -12,6 +12,7 @@ class Settings(BaseSettings):
     # Configurações da Aplicação
     APP_NAME: str = "PDV System Backend"
     API_V1_STR: str = "/api/v1"
+    TIMEZONE: str = "Africa/Maputo"  # Fuso da loja: define a virada do dia nos contadores
     
     # Configurações do Banco de Dados
     DATABASE_URL: str = ""
@@ -47,6 +48,81 @@ class Settings(BaseSettings):
     HOST: str = "0.0.0.0"
     PORT: int = 8000
     
+    # Compressão de respostas (br/zstd apenas se os pacotes estiverem instalados)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    # Instrumentação por requisição (Server-Timing, log estruturado, alerta de N+1)
+    INSTRUMENTATION_ENABLED: bool = True
+    INSTRUMENTATION_SERVER_TIMING: bool = True
+    INSTRUMENTATION_STATEMENT_THRESHOLD: int = 25  # Comandos SQL por requisição antes do alerta de N+1
+    
+    # Métricas Prometheus em /metrics
+    METRICS_ENABLED: bool = True
+    
+    # Probe de prontidão (/health/ready)
+    HEALTH_CACHE_SECONDS: float = 5.0
+    HEALTH_DB_TIMEOUT: float = 2.0  # Segundos
+    HEALTH_CHECK_MIGRATIONS: bool = True
+    
+    # Logging estruturado e assíncrono
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # Níveis por módulo, ex.: "app.api.api_v1.endpoints.cart=DEBUG,sqlalchemy.engine=WARNING"
+    LOG_FORMAT: str = "json"  # json ou text
+    LOG_DEBUG_SAMPLE_RATE: float = 0.1  # Fração dos eventos DEBUG emitidos
+    LOG_QUEUE_SIZE: int = 10000  # Eventos descartados quando a fila enche
+    
+    # Profiler por amostragem (endpoints /admin/profiling, apenas administradores)
+    PROFILING_ENABLED: bool = False
+    PROFILING_MAX_SECONDS: float = 120.0
+    
+    # Jobs de relatório em segundo plano (POST /reports/jobs)
+    JOBS_WORKER_IN_PROCESS: bool = True  # Runner em cada worker web; False = apenas `python -m app.worker` (o Procfile já define)
+    JOBS_POLL_INTERVAL: float = 1.0  # Segundos entre consultas à fila quando ociosa
+    JOBS_TIMEOUT_SECONDS: int = 900  # Job em execução há mais tempo é considerado abandonado
+    JOBS_MAX_ATTEMPTS: int = 2
+    JOBS_RESULT_TTL_HOURS: int = 24  # Jobs concluídos (e seus arquivos) são removidos depois disso
+    JOBS_LONG_POLL_SECONDS: float = 25.0  # Espera máxima de GET /reports/jobs/{id}?wait=
+    
+    # Eventos em tempo real para dashboards (GET /events/stream)
+    EVENTS_ENABLED: bool = True
+    EVENTS_CHANNEL: str = "pdv_events"  # Canal LISTEN/NOTIFY do PostgreSQL
+    EVENTS_QUEUE_SIZE: int = 256  # Eventos pendentes por conexão; acima disso o cliente recebe "resync"
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0  # Comentário SSE periódico para proxies não fecharem a conexão
+    EVENTS_STREAM_MAX_SECONDS: float = 300.0  # A conexão é encerrada e o EventSource reconecta
+    
+    # Contadores do dia (GET /reports/today), conferidos com as vendas periodicamente
+    COUNTERS_RECONCILE_SECONDS: float = 300.0
+    
+    # Importação de produtos (POST /products/import)
+    PRODUCTS_IMPORT_CHUNK_SIZE: int = 1000  # Linhas validadas e gravadas por transação
+    PRODUCTS_IMPORT_MAX_ERRORS: int = 1000  # Erros por linha listados na resposta (os demais só são contados)
+    
+    # Servidor (gunicorn_config.py). Vazios = derivados dos núcleos e da memória do container
+    WEB_CONCURRENCY: Optional[int] = None  # Número de workers
+    WORKER_THREADS: Optional[int] = None  # Threads por worker para endpoints síncronos (padrão: conexões do pool)
+    WORKER_MEMORY_MB: int = 150  # Memória estimada por worker, limita o número de workers
+    GUNICORN_TIMEOUT: int = 30  # Segundos sem heartbeat antes de o worker ser reiniciado
+    GUNICORN_GRACEFUL_TIMEOUT: int = 30  # Prazo para concluir requisições em andamento no deploy
+    GUNICORN_KEEPALIVE: int = 5
+    GUNICORN_MAX_REQUESTS: int = 1000  # Recicla o worker (0 = nunca)
+    GUNICORN_MAX_REQUESTS_JITTER: Optional[int] = None  # Padrão: 10% de GUNICORN_MAX_REQUESTS
+    
+    # Pool de conexões por worker
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Segundos esperando uma conexão livre
+    DB_POOL_RECYCLE: int = 1800  # Segundos
+    DB_MAX_CONNECTIONS: int = 0  # Conexões do Postgres disponíveis para a aplicação (0 = sem limite)
+    
+    @property
+    def worker_threads(self) -> int:
+        # Mais threads que conexões só criaria fila no pool, segurando threads ociosas
+        return self.WORKER_THREADS or self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW
+    
     # Método para converter a string de origens em lista
     @property
     def allowed_origins_list(self) -> List[str]:
@@ -6,10 +6,21 @@ from app.core.config import settings
 # URL do banco de dados
 DATABASE_URL = os.getenv("DATABASE_URL", settings.DATABASE_URL)
 
+# Pool por worker; o total de conexões no Postgres é workers * (pool_size + max_overflow)
+pool_options = {}
+if not DATABASE_URL.startswith("sqlite"):
+	pool_options = {
+		"pool_size": settings.DB_POOL_SIZE,
+		"max_overflow": settings.DB_MAX_OVERFLOW,
+		"pool_timeout": settings.DB_POOL_TIMEOUT,
+		"pool_recycle": settings.DB_POOL_RECYCLE,
+	}
+
 # Engine e sessão
 engine = create_engine(
 	DATABASE_URL,
 	pool_pre_ping=True,
+	**pool_options,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,213 @@
+"""Eventos em tempo real para os dashboards (venda concluída, estoque alterado,
+estoque baixo).
+
+O código de negócio enfileira eventos na sessão com `queue_event`; eles só são
+publicados se a transação for confirmada:
+
+- PostgreSQL: `pg_notify` dentro da própria transação (o banco só entrega no COMMIT)
+  e cada worker escuta o canal com LISTEN em uma conexão dedicada, então as conexões
+  SSE de qualquer worker recebem os eventos de todos os processos;
+- outros bancos (SQLite em desenvolvimento): entregues após o commit apenas às
+  conexões do próprio processo.
+
+O `broker` deste processo repassa cada evento, já formatado como SSE uma única vez,
+às filas das conexões abertas em /events/stream."""
+
+import asyncio
+import logging
+import select
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+import orjson
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import EVENTS_PUBLISHED
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+SALE_COMPLETED = "sale.completed"
+STOCK_CHANGED = "stock.changed"
+LOW_STOCK = "stock.low"
+PRODUCTS_CHANGED = "products.changed"
+
+_PENDING_EVENTS = "pending_events"
+
+# O NOTIFY aceita payloads de até 8000 bytes
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+# Enviado a um cliente que não acompanhou o ritmo dos eventos: deve recarregar tudo
+RESYNC_FRAME = b"event: resync\ndata: {}\n\n"
+
+
+def queue_event(db: Session, type: str, data: Dict[str, Any]) -> None:
+    """Agenda um evento para ser publicado quando a transação da sessão for confirmada"""
+    if not settings.EVENTS_ENABLED:
+        return
+    db.info.setdefault(_PENDING_EVENTS, []).append({
+        "type": type,
+        "ts": datetime.now(timezone.utc),
+        "data": data,
+    })
+
+
+def _payloads(events: List[dict]):
+    for pending in events:
+        payload = dumps(pending)
+        if len(payload) > NOTIFY_PAYLOAD_LIMIT:
+            # Quem gera eventos grandes (estoque de muitos produtos) deve dividi-los
+            logger.warning("Evento %s descartado: %d bytes", pending["type"], len(payload))
+            continue
+        EVENTS_PUBLISHED.labels(type=pending["type"]).inc()
+        yield pending["type"], payload
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_pending_events(session):
+    if not session.info.get(_PENDING_EVENTS) or session.get_bind().dialect.name != "postgresql":
+        return
+    events = session.info.pop(_PENDING_EVENTS)
+    connection = session.connection()
+    for _, payload in _payloads(events):
+        connection.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": settings.EVENTS_CHANNEL, "payload": payload.decode()},
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session):
+    # Só sobra algo aqui fora do PostgreSQL: entrega local, sem os outros workers
+    events = session.info.pop(_PENDING_EVENTS, None)
+    if events:
+        for type, payload in _payloads(events):
+            broker.publish(type, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_events(session):
+    session.info.pop(_PENDING_EVENTS, None)
+
+
+def sse_frame(type: str, payload: bytes) -> bytes:
+    return b"event: " + type.encode() + b"\ndata: " + payload + b"\n\n"
+
+
+class EventBroker:
+    """Distribui os eventos às conexões SSE deste processo.
+
+    `publish` pode ser chamado de qualquer thread (endpoints síncronos, listener do
+    PostgreSQL); a entrega às filas acontece no event loop."""
+
+    def __init__(self, queue_size: int = 256) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, type: str, payload: bytes) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._subscribers:
+            return
+        loop.call_soon_threadsafe(self._fanout, sse_frame(type, payload))
+
+    def _fanout(self, frame: bytes) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Cliente lento: descarta o atraso e pede que recarregue o estado completo
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_FRAME)
+
+
+broker = EventBroker(settings.EVENTS_QUEUE_SIZE)
+
+
+class PostgresListener:
+    """LISTEN no canal de eventos em uma conexão dedicada (fora do pool), em uma thread.
+
+    Reconecta sozinho se a conexão cair; eventos emitidos enquanto desconectado são
+    perdidos, por isso o dashboard recebe "resync" ao reconectar."""
+
+    def __init__(self, engine: Engine, channel: str, broker: EventBroker) -> None:
+        self.engine = engine
+        self.channel = channel
+        self.broker = broker
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="events-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _connect(self):
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        connection = self.engine.dialect.connect(*cargs, **cparams)
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return connection
+
+    def run_forever(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                logger.info("Escutando eventos no canal %s", self.channel)
+                backoff = 1.0
+                self.broker.publish("resync", b"{}")
+                while not self._stop.is_set():
+                    # Acorda periodicamente para checar o pedido de parada
+                    if not select.select([connection], [], [], 1.0)[0]:
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        self.broker.publish(orjson.loads(notify.payload)["type"], notify.payload.encode())
+            except Exception:
+                logger.exception("Erro no listener de eventos; reconectando em %.0fs", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+
+def start_event_stream(engine: Engine) -> Optional[PostgresListener]:
+    """Chamado no lifespan de cada worker: liga o broker ao event loop e, no PostgreSQL,
+    inicia o LISTEN"""
+    if not settings.EVENTS_ENABLED:
+        return None
+    broker.bind(asyncio.get_running_loop())
+    if engine.dialect.name != "postgresql":
+        return None
+    listener = PostgresListener(engine, settings.EVENTS_CHANNEL, broker)
+    listener.start()
+    return listener
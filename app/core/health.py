@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def _expected_heads() -> Optional[Tuple[str, ...]]:
+    """Heads das migrações presentes no código (None se o alembic não estiver configurado)"""
+    if not ALEMBIC_INI.exists():
+        return None
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return tuple(sorted(ScriptDirectory.from_config(config).get_heads()))
+
+
+class ReadinessChecker:
+    """Verificações de prontidão do worker, com resultado em cache por `cache_seconds`.
+
+    - database: SELECT 1 executado em uma thread separada com timeout, para que um
+      banco inacessível falhe rápido em vez de prender o probe;
+    - pool: falha quando todas as conexões do pool (incluindo overflow) estão em uso;
+    - migrations: revisão do banco igual ao head do Alembic no código."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        cache_seconds: float = 5.0,
+        db_timeout: float = 2.0,
+        check_migrations: bool = True,
+    ) -> None:
+        self.engine = engine
+        self.cache_seconds = cache_seconds
+        self.db_timeout = db_timeout
+        self.check_migrations = check_migrations
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readiness")
+        self._pending = None
+        self._cached: Optional[Dict[str, Any]] = None
+        self._cached_at = 0.0
+        self._expected_heads: Optional[Tuple[str, ...]] = None
+        self._heads_loaded = False
+
+    def expected_heads(self) -> Optional[Tuple[str, ...]]:
+        if not self._heads_loaded:
+            self._expected_heads = _expected_heads() if self.check_migrations else None
+            self._heads_loaded = True
+        return self._expected_heads
+
+    def _query_database(self) -> Tuple[float, Optional[Tuple[str, ...]]]:
+        start = time.perf_counter()
+        with self.engine.connect() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text(f"SET LOCAL statement_timeout = {int(self.db_timeout * 1000)}"))
+            conn.execute(text("SELECT 1"))
+            latency = time.perf_counter() - start
+            current_heads = None
+            if self.expected_heads() is not None:
+                from alembic.runtime.migration import MigrationContext
+                current_heads = tuple(sorted(MigrationContext.configure(conn).get_current_heads()))
+        return latency, current_heads
+
+    def _check_database(self) -> Tuple[Dict[str, Any], Optional[Tuple[str, ...]]]:
+        # Uma verificação presa (ex.: conexão pendurada) não é duplicada: reportamos timeout
+        if self._pending is None or self._pending.done():
+            self._pending = self._executor.submit(self._query_database)
+        try:
+            latency, current_heads = self._pending.result(timeout=self.db_timeout)
+        except FutureTimeoutError:
+            return {"ok": False, "error": f"timeout após {self.db_timeout}s"}, None
+        except Exception as e:
+            return {"ok": False, "error": str(e)}, None
+        return {"ok": True, "latency_ms": round(latency * 1000, 2)}, current_heads
+
+    def _check_pool(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        if not callable(getattr(pool, "size", None)):
+            return {"ok": True}
+        capacity = pool.size() + max(getattr(pool, "_max_overflow", 0), 0)
+        checked_out = pool.checkedout()
+        return {
+            "ok": checked_out < capacity,
+            "checked_out": checked_out,
+            "capacity": capacity,
+        }
+
+    def _check_migrations(self, current_heads: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        expected = self.expected_heads()
+        if expected is None:
+            return {"ok": True, "skipped": True}
+        if current_heads is None:
+            return {"ok": False, "error": "revisão do banco indisponível"}
+        return {
+            "ok": current_heads == expected,
+            "current": list(current_heads),
+            "head": list(expected),
+        }
+
+    def run_checks(self) -> Dict[str, Any]:
+        database, current_heads = self._check_database()
+        checks = {
+            "database": database,
+            "pool": self._check_pool(),
+            "migrations": self._check_migrations(current_heads),
+        }
+        return {
+            "status": "ready" if all(check["ok"] for check in checks.values()) else "not_ready",
+            "checks": checks,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def check(self) -> Dict[str, Any]:
+        """Resultado em cache; apenas uma requisição por vez executa as verificações"""
+        with self._lock:
+            if self._cached is None or time.monotonic() - self._cached_at >= self.cache_seconds:
+                self._cached = self.run_checks()
+                self._cached_at = time.monotonic()
+                if self._cached["status"] != "ready":
+                    logger.warning("Readiness falhou: %s", self._cached["checks"])
+            return self._cached
@@ -0,0 +1,159 @@
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Medições acumuladas durante uma requisição"""
+
+    __slots__ = ("start", "db_time", "statements", "rows", "timings", "statement_counts")
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.statements = 0
+        self.rows = 0
+        self.timings: Dict[str, float] = {}
+        self.statement_counts: Counter = Counter()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def add(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+
+# O contexto é copiado para o threadpool dos endpoints síncronos, então o mesmo
+# objeto é visto pela sessão do banco e pelo middleware
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def timed(name: str):
+    """Soma o tempo do bloco à métrica `name` da requisição atual (bcrypt, serialize, ...)"""
+    stats = _current_stats.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add(name, time.perf_counter() - start)
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """Template da rota atendida (ex.: /api/v1/products/{product_id}).
+
+    A rota guarda apenas o caminho relativo ao router em que foi declarada; o prefixo
+    é a parte do caminho da requisição que antecede o trecho casado pela rota."""
+    route = scope.get("route")
+    if route is None or not hasattr(route, "path_regex"):
+        return None
+    path = scope["path"]
+    for index in range(len(path)):
+        if path[index] == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + route.path
+    return route.path
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra tempo, quantidade de comandos e linhas de cada SQL executado na requisição"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        stats.db_time += time.perf_counter() - start
+        stats.statements += 1
+        stats.statement_counts[statement] += 1
+        # rowcount é -1 quando o driver não informa (ex.: SELECT no SQLite)
+        stats.rows += max(cursor.rowcount, 0)
+
+
+class InstrumentationMiddleware:
+    """Mede cada requisição HTTP e publica o resultado.
+
+    - Cabeçalho Server-Timing (total, db, bcrypt, serialize) visível no DevTools;
+    - uma linha de log estruturada (JSON) por requisição;
+    - aviso de possível N+1 quando o número de comandos SQL passa de `statement_threshold`."""
+
+    def __init__(self, app: ASGIApp, statement_threshold: int = 25, server_timing: bool = True) -> None:
+        self.app = app
+        self.statement_threshold = statement_threshold
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.append("Server-Timing", self.server_timing_header(stats))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            self.log(scope, status_code, stats)
+
+    @staticmethod
+    def server_timing_header(stats: RequestStats) -> str:
+        metrics = [
+            f"total;dur={stats.elapsed() * 1000:.1f}",
+            f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries"',
+        ]
+        metrics.extend(f"{name};dur={seconds * 1000:.1f}" for name, seconds in stats.timings.items())
+        return ", ".join(metrics)
+
+    def log(self, scope: Scope, status_code: int, stats: RequestStats) -> None:
+        # O template da rota agrupa melhor que o caminho com IDs
+        path = route_template(scope) or scope.get("path")
+        record = {
+            "method": scope.get("method"),
+            "path": path,
+            "status": status_code,
+            "total_ms": round(stats.elapsed() * 1000, 2),
+            "db_ms": round(stats.db_time * 1000, 2),
+            "statements": stats.statements,
+            "rows": stats.rows,
+        }
+        record.update({f"{name}_ms": round(seconds * 1000, 2) for name, seconds in stats.timings.items()})
+        logger.info("request", extra=record)
+
+        if stats.statements > self.statement_threshold:
+            statement, count = stats.statement_counts.most_common(1)[0]
+            logger.warning(
+                "Possível N+1 em %s %s: %d comandos SQL (mais repetido %dx): %s",
+                record["method"], path, stats.statements, count, " ".join(statement.split())[:300]
+            )
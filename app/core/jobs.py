@@ -0,0 +1,287 @@
+import importlib
+import logging
+import zlib
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Type
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select, text, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.metrics import record_job
+from app.core.serialization import dumps
+from app.models.report_job import ReportJob, QUEUED, RUNNING, DONE, FAILED
+
+logger = logging.getLogger(__name__)
+
+# Módulos que registram tipos de job (@job_kind) e tarefas periódicas (@periodic_task),
+# importados pelo processo dedicado
+JOB_MODULES = ("app.api.api_v1.endpoints.reports", "app.services.counters")
+
+# Intervalo entre as tarefas de manutenção (jobs abandonados e resultados expirados)
+MAINTENANCE_INTERVAL = 60.0
+
+
+@dataclass
+class JobResult:
+    content: bytes
+    content_type: str
+    filename: str
+
+
+@dataclass
+class JobKind:
+    handler: Callable[[Session, BaseModel], JobResult]
+    params_model: Type[BaseModel]
+
+
+@dataclass
+class PeriodicTask:
+    handler: Callable[[Session], None]
+    interval: float
+
+
+JOB_KINDS: Dict[str, JobKind] = {}
+PERIODIC_TASKS: Dict[str, PeriodicTask] = {}
+
+# Acorda o runner deste processo quando um job é enfileirado aqui (os demais dependem do polling)
+_wakeup = threading.Event()
+
+
+def job_kind(name: str, params_model: Type[BaseModel]):
+    """Registra a função que gera o resultado de um tipo de job"""
+    def decorator(handler):
+        JOB_KINDS[name] = JobKind(handler, params_model)
+        return handler
+    return decorator
+
+
+def periodic_task(name: str, interval: float):
+    """Registra uma função executada pelos runners a cada `interval` segundos (e ao iniciar).
+    Cada runner executa a sua cópia: a tarefa deve ser idempotente ou usar
+    try_task_lock para rodar em um runner por vez"""
+    def decorator(handler):
+        PERIODIC_TASKS[name] = PeriodicTask(handler, interval)
+        return handler
+    return decorator
+
+
+def try_task_lock(db: Session, name: str) -> bool:
+    """Advisory lock da tarefa `name` até o fim da transação atual (PostgreSQL).
+    False: outro runner está executando a tarefa agora. No SQLite (um único
+    escritor por vez) sempre retorna True"""
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": zlib.crc32(name.encode())}).scalar()
+
+
+def load_job_kinds() -> None:
+    for module in JOB_MODULES:
+        importlib.import_module(module)
+
+
+def json_result(content, filename: str) -> JobResult:
+    return JobResult(dumps(content), "application/json", filename)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def enqueue(db: Session, kind: str, params: BaseModel, user_id: int) -> ReportJob:
+    job = ReportJob(
+        kind=kind,
+        params=params.model_dump(mode="json"),
+        status=QUEUED,
+        user_id=user_id,
+        attempts=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _wakeup.set()
+    return job
+
+
+def claim_next(db: Session, worker: str) -> Optional[ReportJob]:
+    """Reserva o job mais antigo da fila.
+
+    No PostgreSQL, FOR UPDATE SKIP LOCKED faz runners concorrentes pegarem jobs diferentes
+    sem esperar uns pelos outros; o UPDATE condicional cobre bancos sem SKIP LOCKED (SQLite)."""
+    job_id = db.execute(
+        select(ReportJob.id)
+        .where(ReportJob.status == QUEUED)
+        .order_by(ReportJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar()
+    if job_id is None:
+        db.rollback()
+        return None
+
+    claimed = db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == QUEUED)
+        .values(status=RUNNING, attempts=ReportJob.attempts + 1, worker=worker, started_at=_now(), error=None)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return None
+    return db.get(ReportJob, job_id)
+
+
+def _finish(db: Session, job_id: int, attempt: int, **values) -> bool:
+    """Grava o desfecho apenas se o job ainda pertence a esta tentativa (não foi reenfileirado)"""
+    finished = db.execute(
+        update(ReportJob)
+        .where(ReportJob.id == job_id, ReportJob.status == RUNNING, ReportJob.attempts == attempt)
+        .values(finished_at=_now(), **values)
+    ).rowcount
+    db.commit()
+    return bool(finished)
+
+
+def run_job(db: Session, job: ReportJob, statement_timeout: int) -> None:
+    job_id, name, params, attempt = job.id, job.kind, job.params, job.attempts
+    start = time.perf_counter()
+    try:
+        kind = JOB_KINDS.get(name)
+        if kind is None:
+            raise ValueError(f"Tipo de job desconhecido: {name}")
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text(f"SET LOCAL statement_timeout = {statement_timeout * 1000}"))
+        result = kind.handler(db, kind.params_model(**params))
+        db.rollback()
+        outcome = DONE
+        finished = _finish(
+            db, job_id, attempt, status=DONE,
+            result=result.content, content_type=result.content_type, filename=result.filename,
+        )
+    except Exception as e:
+        db.rollback()
+        logger.exception("Job %s (%s) falhou", job_id, name)
+        outcome = FAILED
+        finished = _finish(db, job_id, attempt, status=FAILED, error=str(e)[:1000])
+
+    duration = time.perf_counter() - start
+    record_job(name, outcome, duration)
+    if finished:
+        logger.info("Job %s (%s) %s em %.1fs", job_id, name, outcome, duration,
+                    extra={"job_id": job_id, "job_kind": name, "job_status": outcome})
+    else:
+        logger.warning("Job %s (%s) foi reenfileirado durante a execução; resultado descartado", job_id, name)
+
+
+def recover_stale(db: Session, timeout_seconds: int, max_attempts: int) -> None:
+    """Jobs em execução há mais de `timeout_seconds` (worker morto no deploy, por exemplo)
+    voltam para a fila enquanto houver tentativas; depois disso, falham"""
+    stale = (ReportJob.status == RUNNING) & (ReportJob.started_at < _now() - timedelta(seconds=timeout_seconds))
+    requeued = db.execute(
+        update(ReportJob).where(stale, ReportJob.attempts < max_attempts).values(status=QUEUED, worker=None)
+    ).rowcount
+    failed = db.execute(
+        update(ReportJob).where(stale, ReportJob.attempts >= max_attempts)
+        .values(status=FAILED, error="Tempo limite excedido", finished_at=_now())
+    ).rowcount
+    db.commit()
+    if requeued or failed:
+        logger.warning("Jobs abandonados: %d reenfileirados, %d marcados como falha", requeued, failed)
+
+
+def purge_expired(db: Session, ttl_hours: int) -> None:
+    purged = db.execute(
+        delete(ReportJob).where(
+            ReportJob.status.in_([DONE, FAILED]),
+            ReportJob.finished_at < _now() - timedelta(hours=ttl_hours),
+        )
+    ).rowcount
+    db.commit()
+    if purged:
+        logger.info("%d jobs expirados removidos", purged)
+
+
+class JobRunner:
+    """Executa os jobs da fila, um por vez, em uma thread própria.
+
+    Pode rodar dentro de cada worker web (JOBS_WORKER_IN_PROCESS) ou em um processo
+    dedicado (`python -m app.worker`), que tira os relatórios pesados da disputa por
+    CPU com o checkout. Vários runners podem consumir a mesma fila."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        poll_interval: float = 1.0,
+        timeout_seconds: int = 900,
+        max_attempts: int = 2,
+        result_ttl_hours: int = 24,
+    ) -> None:
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.timeout_seconds = timeout_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl_hours = result_ttl_hours
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_maintenance = 0.0
+        self._last_periodic: Dict[str, float] = {}
+
+    @property
+    def worker_name(self) -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="job-runner", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Um job em andamento não é interrompido: se não terminar, volta para a fila por timeout"""
+        self._stop.set()
+        _wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _maintenance(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._last_maintenance >= MAINTENANCE_INTERVAL:
+            self._last_maintenance = now
+            recover_stale(db, self.timeout_seconds, self.max_attempts)
+            purge_expired(db, self.result_ttl_hours)
+
+        for name, task in PERIODIC_TASKS.items():
+            last = self._last_periodic.get(name)
+            if last is not None and now - last < task.interval:
+                continue
+            self._last_periodic[name] = now
+            try:
+                task.handler(db)
+            except Exception:
+                db.rollback()
+                logger.exception("Tarefa periódica %s falhou", name)
+
+    def run_once(self) -> bool:
+        """Processa no máximo um job; retorna False se a fila estava vazia"""
+        with self.session_factory() as db:
+            self._maintenance(db)
+            job = claim_next(db, self.worker_name)
+            if job is None:
+                return False
+            run_job(db, job, self.timeout_seconds)
+            return True
+
+    def run_forever(self) -> None:
+        logger.info("Runner de jobs iniciado (%s)", self.worker_name)
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception:
+                # Banco indisponível, por exemplo: tenta de novo no próximo ciclo
+                logger.exception("Erro no runner de jobs")
+            _wakeup.wait(self.poll_interval)
+            _wakeup.clear()
@@ -0,0 +1,149 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Atributos padrão do LogRecord; o resto veio de `extra=` e é emitido como campo estruturado
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def parse_levels(value: str) -> Dict[str, int]:
+    """Converte "app.api=WARNING,sqlalchemy.engine=INFO" em {logger: nível}"""
+    levels = {}
+    for part in value.split(","):
+        name, _, level = part.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = logging.getLevelName(level.strip().upper())
+    return levels
+
+
+class StructuredFormatter(logging.Formatter):
+    """Uma linha por evento: JSON, ou texto com os campos extras em chave=valor"""
+
+    def __init__(self, json_format: bool = True) -> None:
+        super().__init__()
+        self.json_format = json_format
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+        if self.json_format:
+            payload = {
+                "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+                "level": record.levelname,
+                "logger": record.name,
+                "pid": record.process,
+                "msg": record.getMessage(),
+            }
+            payload.update(fields)
+            if record.exc_text:
+                payload["exc"] = record.exc_text
+            return json.dumps(payload, default=str, ensure_ascii=False)
+
+        timestamp = datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S")
+        line = f"{timestamp} {record.levelname} [{record.name}] {record.getMessage()}"
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """Deixa passar apenas uma fração dos eventos DEBUG (os mais frequentes); INFO+ sempre passa"""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Enfileira o registro e deixa formatação e escrita para uma thread separada.
+
+    A fila é limitada: quando cheia, o evento é descartado em vez de bloquear a requisição.
+    O listener é (re)iniciado no primeiro log de cada processo, pois threads não
+    sobrevivem ao fork dos workers do gunicorn."""
+
+    def __init__(self, handlers, maxsize: int = 10000) -> None:
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.handlers = handlers
+        self.listener: Optional[QueueListener] = None
+        self.pid: Optional[int] = None
+        self.dropped = 0
+
+    def start(self) -> None:
+        # Após o fork a fila herdada pode conter registros do processo pai
+        self.queue = queue.Queue(maxsize=self.queue.maxsize)
+        self.listener = QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+        self.pid = os.getpid()
+
+    def stop(self) -> None:
+        if self.listener is not None and self.pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Só a interpolação da mensagem acontece aqui (os argumentos podem mudar depois);
+        # a formatação do JSON fica com o listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.pid != os.getpid():
+            self.start()
+        super().emit(record)
+
+
+_queue_handler: Optional[AsyncQueueHandler] = None
+
+
+def setup_logging(
+    level: str = "INFO",
+    module_levels: str = "",
+    json_format: bool = True,
+    debug_sample_rate: float = 1.0,
+    queue_size: int = 10000,
+) -> None:
+    """Configura o logging raiz (idempotente)"""
+    global _queue_handler
+    root = logging.getLogger()
+    if _queue_handler is not None:
+        root.removeHandler(_queue_handler)
+        _queue_handler.stop()
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(StructuredFormatter(json_format))
+
+    _queue_handler = AsyncQueueHandler([stream], maxsize=queue_size)
+    _queue_handler.addFilter(SamplingFilter(debug_sample_rate))
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level.upper())
+
+    for name, module_level in parse_levels(module_levels).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    atexit.register(_queue_handler.stop)
@@ -0,0 +1,164 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.instrumentation import route_template
+
+# Com vários workers do gunicorn, cada processo grava suas métricas em arquivos no
+# diretório PROMETHEUS_MULTIPROC_DIR e o /metrics agrega todos. A variável precisa estar
+# definida antes da importação do prometheus_client (ver gunicorn_config.py e start.sh).
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# Buckets pensados para o PDV: checkout e busca na casa dos milissegundos, relatórios em segundos
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Conexões do pool em uso",
+    multiprocess_mode="livesum",
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Tamanho configurado do pool de conexões",
+    multiprocess_mode="livesum",
+)
+CART_STORE_SIZE = Gauge(
+    "cart_store_size",
+    "Carrinhos abertos em memória",
+    multiprocess_mode="livesum",
+)
+CHECKOUTS = Counter(
+    "checkout_total",
+    "Checkouts por resultado e tipo de erro",
+    ["outcome", "error"],
+)
+SYNC_RECORDS = Counter(
+    "sync_records_total",
+    "Registros processados pela sincronização",
+    ["entity", "direction", "kind"],
+)
+REPORT_JOBS = Counter(
+    "report_jobs_total",
+    "Jobs de relatório concluídos por tipo e resultado",
+    ["kind", "status"],
+)
+REPORT_JOB_DURATION = Histogram(
+    "report_job_duration_seconds",
+    "Duração da execução dos jobs de relatório",
+    ["kind"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0),
+)
+
+EVENT_STREAM_CLIENTS = Gauge(
+    "event_stream_clients",
+    "Conexões SSE abertas em /events/stream",
+    multiprocess_mode="livesum",
+)
+EVENTS_PUBLISHED = Counter(
+    "events_published_total",
+    "Eventos em tempo real publicados por tipo",
+    ["type"],
+)
+
+
+def instrument_pool(engine: Engine) -> None:
+    """Acompanha as conexões em uso pelos eventos de checkout/checkin do pool"""
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        DB_POOL_SIZE.set(size())
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+def record_checkout(error: str = None) -> None:
+    if error is None:
+        CHECKOUTS.labels(outcome="success", error="none").inc()
+    else:
+        CHECKOUTS.labels(outcome="failure", error=error).inc()
+
+
+def record_sync(entity: str, direction: str, kind: str, count: int) -> None:
+    if count:
+        SYNC_RECORDS.labels(entity=entity, direction=direction, kind=kind).inc(count)
+
+
+def record_job(kind: str, status: str, seconds: float) -> None:
+    REPORT_JOBS.labels(kind=kind, status=status).inc()
+    REPORT_JOB_DURATION.labels(kind=kind).observe(seconds)
+
+
+class PrometheusMiddleware:
+    """Histograma de latência por rota (template, não o caminho com IDs) e gauge de requisições em andamento"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # Caminhos sem rota (404, varreduras) ficam agrupados para não explodir a cardinalidade
+            route = route_template(scope) or "unmatched"
+            REQUEST_LATENCY.labels(method=method, route=route, status=str(status_code)).observe(
+                time.perf_counter() - start
+            )
+
+
+def metrics_endpoint(request: Request) -> Response:
+    """Exposição no formato texto do Prometheus (agregando os workers em modo multiprocesso)"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
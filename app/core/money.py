@@ -0,0 +1,76 @@
+"""Valores monetários em centavos (int).
+
+Somas e multiplicações em centavos são exatas e baratas, sem os desvios de float nem
+o custo de Decimal em laços quentes (carrinho, agregações de relatório). A conversão
+acontece só nas bordas: Decimal para as colunas Numeric(10, 2) e float (em unidades)
+para o JSON, que o orjson serializa nativamente."""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Annotated, Optional, Union
+
+from pydantic import BeforeValidator
+
+Number = Union[int, float, str, Decimal]
+
+_ONE = Decimal(1)
+
+
+def _decimal(value: Number) -> Decimal:
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        # repr dá a menor representação decimal do float (0.1 -> "0.1", não 0.1000000000000000055)
+        return Decimal(repr(value))
+    if isinstance(value, str):
+        return Decimal(value.replace(",", "."))
+    return Decimal(value)
+
+
+def to_cents(value: Optional[Number]) -> int:
+    """Valor em unidades (MT) para centavos, arredondando meio centavo para cima"""
+    if value is None:
+        return 0
+    if isinstance(value, int):
+        return value * 100
+    return int(_decimal(value).scaleb(2).quantize(_ONE, rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    """Centavos para Decimal com duas casas (colunas Numeric)"""
+    return Decimal(cents).scaleb(-2)
+
+
+def cents_to_float(cents: int) -> float:
+    """Centavos para unidades no JSON; a divisão por 100 é arredondada corretamente,
+    então 1234 vira exatamente 12.34 na serialização"""
+    return cents / 100
+
+
+def multiply(cents: int, quantity: Number) -> int:
+    """Preço unitário vezes quantidade (fracionária nas vendas por peso), em centavos"""
+    if isinstance(quantity, int):
+        return cents * quantity
+    if isinstance(quantity, float) and quantity.is_integer():
+        return cents * int(quantity)
+    return int((cents * _decimal(quantity)).quantize(_ONE, rounding=ROUND_HALF_UP))
+
+
+def divide(cents: int, quantity: Number) -> int:
+    """Total dividido pela quantidade (preço por kg a partir do preço da pesagem)"""
+    quantity = _decimal(quantity)
+    if not quantity:
+        return 0
+    return int((cents / quantity).quantize(_ONE, rounding=ROUND_HALF_UP))
+
+
+def _round_units(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float, str, Decimal)):
+        return cents_to_float(to_cents(value))
+    return value
+
+
+# Campo monetário dos schemas: aceita Decimal, float ou texto e sai como float com no
+# máximo duas casas (sem 30.000000000000004 nas respostas)
+Money = Annotated[float, BeforeValidator(_round_units)]
@@ -0,0 +1,25 @@
+from functools import lru_cache
+
+from app.core.instrumentation import timed
+
+
+@lru_cache(maxsize=None)
+def get_crypt_context():
+    """Contexto bcrypt único da aplicação, criado no primeiro uso.
+
+    O passlib só é importado quando uma senha é gerada ou verificada, o que tira
+    sua importação e configuração da inicialização dos workers."""
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def get_password_hash(password: str) -> str:
+    """Generate password hash"""
+    with timed("bcrypt"):
+        return get_crypt_context().hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash"""
+    with timed("bcrypt"):
+        return get_crypt_context().verify(plain_password, hashed_password)
@@ -0,0 +1,177 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Pilhas cuja folha está nestes módulos são threads ociosas (threadpool esperando
+# trabalho, event loop no select) e não entram no perfil
+IDLE_MODULES = ("threading.py", "selectors.py", "queue.py")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+def _collapse(frame, thread_name: str) -> Optional[str]:
+    """Pilha no formato "collapsed" (raiz;...;folha), aceito por flamegraph.pl e speedscope"""
+    if frame.f_code.co_filename.endswith(IDLE_MODULES):
+        return None
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Profiler por amostragem das pilhas de todas as threads do worker.
+
+    Dois modos, ambos iniciados por um administrador:
+    - worker: amostra o processo por `seconds`;
+    - route: amostra enquanto as próximas `requests` requisições da rota estão em andamento.
+    Desarmado, o único custo é uma checagem de atributo no middleware."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.samples: Counter = Counter()
+        self.mode: Optional[str] = None
+        self.route: Optional[str] = None
+        self.route_regex = None
+        self.requests_target = 0
+        self.requests_started = 0
+        self.requests_done = 0
+        self.active_requests = 0
+        self.interval = 0.005
+        self.deadline = 0.0
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _ensure_idle(self) -> None:
+        if self.running:
+            raise RuntimeError("Já existe uma sessão de profiling em andamento neste worker")
+
+    def _start(self, mode: str, interval: float, max_seconds: float) -> None:
+        self.samples = Counter()
+        self.mode = mode
+        self.interval = interval
+        self.deadline = time.monotonic() + max_seconds
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def start_worker(self, seconds: float, interval: float) -> None:
+        with self._lock:
+            self._ensure_idle()
+            self.route = None
+            self.route_regex = None
+            self._start("worker", interval, seconds)
+
+    def arm_route(self, route: str, requests: int, interval: float, max_seconds: float) -> None:
+        with self._lock:
+            self._ensure_idle()
+            self.route = route
+            self.route_regex = compile_path(route)[0]
+            self.requests_target = requests
+            self.requests_started = 0
+            self.requests_done = 0
+            self.active_requests = 0
+            self._start("route", interval, max_seconds)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def matches(self, path: str) -> bool:
+        """Reserva uma das N requisições da sessão por rota, se o caminho casar"""
+        if self.route_regex is None or not self.route_regex.match(path):
+            return False
+        with self._lock:
+            if self.requests_started >= self.requests_target or not self.running:
+                return False
+            self.requests_started += 1
+            self.active_requests += 1
+            return True
+
+    def request_finished(self) -> None:
+        with self._lock:
+            self.active_requests -= 1
+            self.requests_done += 1
+            if self.requests_done >= self.requests_target:
+                self._stop.set()
+
+    def _sample(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = _collapse(frame, names.get(thread_id, str(thread_id)))
+            if stack:
+                self.samples[stack] += 1
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set() and time.monotonic() < self.deadline:
+                # No modo rota, só amostra enquanto há requisição da rota em andamento
+                if self.mode == "worker" or self.active_requests > 0:
+                    self._sample()
+                self._stop.wait(self.interval)
+        finally:
+            self.finished_at = datetime.now(timezone.utc)
+            self.route_regex = None
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "running": self.running,
+            "mode": self.mode,
+            "route": self.route,
+            "requests_target": self.requests_target if self.mode == "route" else None,
+            "requests_done": self.requests_done if self.mode == "route" else None,
+            "interval_ms": round(self.interval * 1000, 2),
+            "samples": sum(self.samples.values()),
+            "stacks": len(self.samples),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# Um profiler por processo (cada worker do gunicorn tem o seu)
+profiler = SamplingProfiler()
+
+
+class ProfilingMiddleware:
+    """Marca as requisições da rota sob profiling para o amostrador"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if profiler.route_regex is None or scope["type"] != "http" or not profiler.matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.request_finished()
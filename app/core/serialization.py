@@ -0,0 +1,34 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+from app.core.instrumentation import timed
+
+
+def _default(value: Any) -> Any:
+    """Tipos que o orjson não serializa nativamente"""
+    if isinstance(value, Decimal):
+        # Mesmo formato numérico que as respostas validadas pelo Pydantic (float)
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serializa para JSON em bytes; datetime, date, UUID e Enum são tratados nativamente"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """Resposta JSON serializada com orjson.
+
+    Retornar esta resposta diretamente de um endpoint evita a revalidação pelo
+    response_model, que continua declarado apenas para a documentação OpenAPI."""
+
+    def render(self, content: Any) -> bytes:
+        with timed("serialize"):
+            return dumps(content)
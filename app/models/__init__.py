@@ -7,6 +7,9 @@ from .sale_item import SaleItem
 from .customer import Customer
 from .employee import Employee
 from .inventory import Inventory
+from .change_log import ChangeLog, ChangeLogCounter
+from .report_job import ReportJob
+from .daily_counter import DailySalesCounter, DailyProductSales
 
 __all__ = [
     "User",
@@ -16,5 +19,10 @@ __all__ = [
     "SaleItem",
     "Customer",
     "Employee",
-    "Inventory"
+    "Inventory",
+    "ChangeLog",
+    "ChangeLogCounter",
+    "ReportJob",
+    "DailySalesCounter",
+    "DailyProductSales"
 ]
@@ -1,10 +1,12 @@
-from sqlalchemy import Column, String, Text
+from sqlalchemy import Column, String, Text, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 class Category(BaseModel):
     """Modelo para categorias de produtos"""
     __tablename__ = "categories"
+    # Sincronização incremental: WHERE last_updated > :ultimo_sync
+    __table_args__ = (Index("idx_categories_last_updated", "last_updated"),)
     
     name = Column(String(100), unique=True, index=True, nullable=False)
     description = Column(Text, nullable=True)
@@ -0,0 +1,128 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, Index, event, inspect, insert, update
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from sqlalchemy.sql import func
+from .base import Base
+
+# Operações registradas no log de alterações
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+# Tabelas expostas pela sincronização cujas alterações são registradas
+TRACKED_TABLES = {"products", "categories", "customers", "sales", "users", "employees"}
+
+# Chave em Session.info com as alterações aguardando o commit
+_PENDING_CHANGES = "pending_changes"
+
+class ChangeLog(Base):
+    """Log de alterações com sequência global e monotônica usado pela sincronização.
+
+    A sequência é atribuída no commit (ver `_assign_change_seqs`), não no flush: uma
+    transação longa que registrou alterações cedo não pode receber um seq menor que o
+    de transações confirmadas antes dela, senão um cliente que já avançou last_seq
+    nunca receberia essas alterações."""
+    __tablename__ = "change_log"
+
+    # Valor explícito vindo de change_log_counter; no SQLite apenas INTEGER PRIMARY KEY é autoincremento
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_change_log_entity_seq", "entity", "seq"),
+    )
+
+    def __repr__(self):
+        return f"<ChangeLog(seq={self.seq}, entity={self.entity}, entity_id={self.entity_id}, operation={self.operation})>"
+
+
+class ChangeLogCounter(Base):
+    """Linha única com o último seq atribuído ao change_log"""
+    __tablename__ = "change_log_counter"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
+
+
+def reserve_seqs(connection, count: int) -> int:
+    """Reserva `count` números de sequência e retorna o primeiro.
+
+    O UPDATE bloqueia a linha do contador até o fim da transação: as transações
+    recebem seqs na ordem em que confirmam, então quem lê o seq N já confirmado
+    também enxerga todos os menores."""
+    counter = ChangeLogCounter.__table__
+    value = connection.execute(
+        update(counter).where(counter.c.id == 1).values(value=counter.c.value + count).returning(counter.c.value)
+    ).scalar()
+    if value is None:
+        # Banco criado sem a migração (create_all): a linha ainda não existe
+        connection.execute(insert(counter).values(id=1, value=count))
+        value = count
+    return value - count + 1
+
+
+def record_changes(db: Session, entity: str, entity_ids, operation: str = UPDATE) -> None:
+    """Registra alterações feitas fora do ORM (UPDATE/INSERT em lote) na mesma transação"""
+    rows = [{"entity": entity, "entity_id": entity_id, "operation": operation} for entity_id in entity_ids]
+    if rows:
+        db.info.setdefault(_PENDING_CHANGES, []).extend(rows)
+
+
+def _dirty_operation(obj) -> str:
+    """Exclusão lógica (is_active passando para False) é registrada como delete"""
+    attrs = inspect(obj).attrs
+    if "is_active" in attrs.keys():
+        history = attrs.is_active.history
+        if False in history.added and True in history.deleted:
+            return DELETE
+    return UPDATE
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush_changes(session, flush_context):
+    """Alimenta o change_log com os inserts, updates e exclusões de cada flush"""
+    rows = []
+    for obj in session.new:
+        entity = getattr(type(obj), "__tablename__", None)
+        if entity in TRACKED_TABLES:
+            rows.append({"entity": entity, "entity_id": obj.id, "operation": INSERT})
+    for obj in session.dirty:
+        entity = getattr(type(obj), "__tablename__", None)
+        if entity in TRACKED_TABLES and session.is_modified(obj, include_collections=False):
+            rows.append({"entity": entity, "entity_id": obj.id, "operation": _dirty_operation(obj)})
+    for obj in session.deleted:
+        entity = getattr(type(obj), "__tablename__", None)
+        if entity in TRACKED_TABLES:
+            rows.append({"entity": entity, "entity_id": obj.id, "operation": DELETE})
+
+    if rows:
+        session.info.setdefault(_PENDING_CHANGES, []).extend(rows)
+
+
+@event.listens_for(Session, "before_commit")
+def _assign_change_seqs(session):
+    """Grava as alterações da transação com seqs reservados no próprio commit.
+
+    O contador fica bloqueado só entre este ponto e o COMMIT, o que serializa
+    apenas o fim das transações que alteraram tabelas sincronizadas."""
+    # O commit ainda faria um flush depois deste evento; as alterações dele precisam entrar aqui
+    session.flush()
+    rows = session.info.pop(_PENDING_CHANGES, None)
+    if not rows:
+        return
+    connection = session.connection()
+    first = reserve_seqs(connection, len(rows))
+    # Horário do commit (o now() do banco é o início da transação), na ordem dos seqs
+    changed_at = datetime.now(timezone.utc)
+    for offset, row in enumerate(rows):
+        row["seq"] = first + offset
+        row["changed_at"] = changed_at
+    connection.execute(ChangeLog.__table__.insert(), rows)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_changes(session):
+    session.info.pop(_PENDING_CHANGES, None)
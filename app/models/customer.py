@@ -1,10 +1,12 @@
-from sqlalchemy import Column, String, Text, Boolean, Date
+from sqlalchemy import Column, String, Text, Boolean, Date, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 class Customer(BaseModel):
     """Modelo para clientes do sistema"""
     __tablename__ = "customers"
+    # Sincronização incremental: WHERE last_updated > :ultimo_sync
+    __table_args__ = (Index("idx_customers_last_updated", "last_updated"),)
     
     name = Column(String(200), nullable=False, index=True)
     email = Column(String(100), unique=True, index=True, nullable=True)
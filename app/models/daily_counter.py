@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from .base import Base
+
+class DailySalesCounter(Base):
+    """Totais do dia (data local) incrementados pelo checkout (ver app/services/counters.py)"""
+    __tablename__ = "daily_sales_counters"
+
+    day = Column(Date, primary_key=True)
+    revenue_cents = Column(BigInteger, nullable=False, default=0)
+    sales_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<DailySalesCounter(day={self.day}, sales_count={self.sales_count})>"
+
+
+class DailyProductSales(Base):
+    """Quantidade e receita de cada produto no dia, para o produto mais vendido"""
+    __tablename__ = "daily_product_sales"
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id"), primary_key=True)
+    product_name = Column(String(200), nullable=True)
+    quantity = Column(Numeric(14, 3), nullable=False, default=0)
+    revenue_cents = Column(BigInteger, nullable=False, default=0)
+
+    __table_args__ = (
+        # Produto mais vendido do dia: uma leitura no topo do índice
+        Index("idx_daily_product_sales_day_quantity", "day", quantity.desc()),
+    )
+
+    def __repr__(self):
+        return f"<DailyProductSales(day={self.day}, product_id={self.product_id}, quantity={self.quantity})>"
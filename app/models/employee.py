@@ -1,5 +1,5 @@
 import sqlalchemy as sa
-from sqlalchemy import Column, String, Boolean, Numeric, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, String, Boolean, Numeric, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 from .user import User  # Importamos o User para o relacionamento
@@ -7,6 +7,8 @@ from .user import User  # Importamos o User para o relacionamento
 class Employee(BaseModel):
     """Modelo simplificado para funcionários do sistema"""
     __tablename__ = "employees"
+    # Sincronização incremental: WHERE last_updated > :ultimo_sync
+    __table_args__ = (Index("idx_employees_last_updated", "last_updated"),)
     
     # Informações básicas
     full_name = Column(String(200), nullable=False, index=True)
@@ -22,7 +24,7 @@ class Employee(BaseModel):
     is_active = Column(Boolean, default=True, nullable=False)
     
     # Sincronização
-    last_updated = Column(DateTime(timezone=True), server_default=sa.text('now()'), nullable=False)
+    last_updated = Column(DateTime(timezone=True), server_default=sa.text('now()'), onupdate=sa.func.now(), nullable=False)
     synced = Column(Boolean, default=False, nullable=False)
     
     # Relacionamentos
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Enum
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from .base import BaseModel
@@ -33,6 +33,11 @@ class Inventory(BaseModel):
     # Relacionamentos
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     
+    __table_args__ = (
+        # Histórico de estoque de um produto (uma linha por venda desde o ledger de estoque)
+        Index("idx_inventory_movements_product_id", "product_id", "id"),
+    )
+    
     # Relacionamentos
     product = relationship("Product", back_populates="inventory_movements")
     
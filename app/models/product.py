@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -35,5 +35,18 @@ class Product(BaseModel):
                             foreign_keys='SaleItem.product_id')
     inventory_movements = relationship("Inventory", back_populates="product")
     
+    # Índice parcial só com os produtos abaixo do mínimo, ordenado pelo déficit:
+    # GET /products/low-stock lê as primeiras entradas sem varrer o catálogo
+    __table_args__ = (
+        Index(
+            "idx_products_low_stock",
+            (estoque_minimo - estoque).desc(),
+            "id",
+            postgresql_where=(estoque <= estoque_minimo) & (is_active == True) & (venda_por_peso == False),
+            sqlite_where=(estoque <= estoque_minimo) & (is_active == True) & (venda_por_peso == False),
+        ),
+        Index("idx_products_last_updated", "last_updated"),
+    )
+    
     def __repr__(self):
         return f"<Product(nome={self.nome}, codigo={self.codigo}>"
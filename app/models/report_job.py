@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, LargeBinary, JSON, ForeignKey, Index
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func
+from .base import Base
+
+# Estados de um job de relatório
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+class ReportJob(Base):
+    """Fila de relatórios e exportações executados fora da requisição (ver app/core/jobs.py)"""
+    __tablename__ = "report_jobs"
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    params = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default=QUEUED)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    # Tentativa atual; usada também para ignorar o resultado de uma execução que foi reenfileirada
+    attempts = Column(Integer, nullable=False, default=0)
+    worker = Column(String(100), nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Resultado pronto para download (carregado só no download, não na consulta de status)
+    result = deferred(Column(LargeBinary, nullable=True))
+    content_type = Column(String(100), nullable=True)
+    filename = Column(String(255), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("idx_report_jobs_status_id", "status", "id"),
+        Index("idx_report_jobs_user_id", "user_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<ReportJob(id={self.id}, kind={self.kind}, status={self.status})>"
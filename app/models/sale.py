@@ -1,8 +1,14 @@
-from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, ForeignKey, Enum
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Numeric, Integer, Boolean, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 from app.schemas.sale import SaleStatus, PaymentMethod
 
+def generate_sale_number() -> str:
+    """Número da venda: data/hora + sufixo aleatório (vendas no mesmo segundo não colidem)"""
+    return f"V{datetime.now().strftime('%Y%m%d%H%M%S')}{uuid.uuid4().hex[:6].upper()}"
+
 class Sale(BaseModel):
     """Modelo para vendas do sistema"""
     __tablename__ = "sales"
@@ -45,3 +51,17 @@ class Sale(BaseModel):
         self.subtotal = sum(item.total_price for item in self.items)
         self.tax_amount = self.subtotal * 0.10  # 10% de imposto
         self.total_amount = self.subtotal + self.tax_amount - self.discount_amount
+
+
+# Índices declarados fora da classe porque created_at/is_active vêm do BaseModel
+# Relatórios: status fixo + intervalo de datas
+Index("idx_sales_status_created_at", Sale.status, Sale.created_at)
+# Sincronização incremental
+Index("idx_sales_last_updated", Sale.last_updated)
+# Listagem de vendas: apenas ativas, mais recentes primeiro
+Index(
+    "idx_sales_active_created_at",
+    Sale.created_at.desc(),
+    postgresql_where=Sale.is_active == True,
+    sqlite_where=Sale.is_active == True,
+)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Numeric, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, String, Numeric, Integer, ForeignKey, Boolean, Index, event, select
 from sqlalchemy.orm import relationship
-from sqlalchemy.ext.hybrid import hybrid_property
 from .base import BaseModel
+from .product import Product
 
 class SaleItem(BaseModel):
     """Modelo para itens individuais de cada venda"""
@@ -18,17 +18,31 @@ class SaleItem(BaseModel):
     weight_in_kg = Column(Numeric(10, 3), nullable=True)
     custom_price = Column(Numeric(10, 2), nullable=True)
     
+    # Cópia do produto no momento da venda: relatórios e listagens não dependem do
+    # nome e do custo atuais (que mudam) nem precisam de JOIN com products
+    product_name_at_sale = Column(String(200), nullable=True)
+    cost_price_at_sale = Column(Numeric(10, 2), nullable=True)
+    
     # Relacionamentos
     sale_id = Column(Integer, ForeignKey("sales.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     
+    __table_args__ = (
+        # Itens de várias vendas carregados em lote (listagem, joinedload), na ordem de inserção
+        Index("idx_sale_items_sale_id", "sale_id", "id"),
+        Index("idx_sale_items_product_id", "product_id"),
+        Index("idx_sale_items_last_updated", "last_updated"),
+    )
+    
     # Relacionamentos
     sale = relationship("Sale", back_populates="items")
     product = relationship("Product", back_populates="sale_items")
     
-    # Propriedade virtual para o nome do produto
-    @hybrid_property
+    # Nome gravado na venda; o produto atual só é consultado em itens sem a cópia
+    @property
     def product_name(self):
+        if self.product_name_at_sale is not None:
+            return self.product_name_at_sale
         return self.product.nome if self.product else None
     
     @product_name.setter
@@ -38,3 +52,18 @@ class SaleItem(BaseModel):
     
     def __repr__(self):
         return f"<SaleItem(product_id={self.product_id}, quantity={self.quantity}, total={self.total_price})>"
+
+
+@event.listens_for(SaleItem, "before_insert")
+def _snapshot_product(mapper, connection, target):
+    """Itens criados pelo ORM (scripts, sincronização) sem a cópia do produto a recebem aqui.
+    O checkout insere em lote com os valores já preenchidos, sem passar por este evento."""
+    if target.product_name_at_sale is not None or target.product_id is None:
+        return
+    row = connection.execute(
+        select(Product.nome.label("nome"), Product.preco_compra.label("preco_compra")).where(Product.id == target.product_id)
+    ).first()
+    if row is not None:
+        target.product_name_at_sale = row.nome
+        if target.cost_price_at_sale is None:
+            target.cost_price_at_sale = row.preco_compra
@@ -1,19 +1,9 @@
-from sqlalchemy import Column, String, Boolean, Enum, Numeric, ForeignKey
+from sqlalchemy import Column, String, Boolean, Enum, Numeric, ForeignKey, Index
 from sqlalchemy.orm import relationship
 import enum
-from passlib.context import CryptContext
 from .base import BaseModel
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    """Generate password hash"""
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+# Contexto bcrypt compartilhado; reexportado aqui para os scripts que importam deste módulo
+from app.core.passwords import get_password_hash, verify_password
 
 class UserRole(str, enum.Enum):
     ADMIN = "admin"
@@ -24,6 +14,8 @@ class UserRole(str, enum.Enum):
 class User(BaseModel):
     """Modelo para usuários do sistema"""
     __tablename__ = "users"
+    # Sincronização incremental: WHERE last_updated > :ultimo_sync
+    __table_args__ = (Index("idx_users_last_updated", "last_updated"),)
     
     username = Column(String(50), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=True)
@@ -0,0 +1,13 @@
+from typing import Optional
+from pydantic import Field
+from .base import BaseCreate
+
+class CategorySyncResponse(BaseCreate):
+    """Schema específico para resposta de sincronização de categorias"""
+    id: Optional[int] = None
+    name: str = Field(..., min_length=1, max_length=100)
+    description: Optional[str] = None
+    color: Optional[str] = Field(None, max_length=7, pattern=r"^#[0-9A-Fa-f]{6}$")
+
+    class Config:
+        from_attributes = True
@@ -5,6 +5,7 @@ from .base import BaseCreate
 
 class CustomerSyncResponse(BaseCreate):
     """Schema específico para resposta de sincronização de clientes"""
+    id: Optional[int] = None
     name: str = Field(..., min_length=1, max_length=200)
     email: Optional[EmailStr] = None
     phone: Optional[str] = Field(None, max_length=20)
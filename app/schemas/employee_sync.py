@@ -6,6 +6,7 @@ from .base import BaseCreate
 
 class EmployeeSyncResponse(BaseCreate):
     """Schema específico para resposta de sincronização de funcionários"""
+    id: Optional[int] = None
     full_name: str = Field(..., min_length=1, max_length=200)
     username: str = Field(..., min_length=3, max_length=50)
     salary: Optional[Decimal] = Field(None, ge=0)
@@ -13,9 +13,10 @@ class MovementType(str, Enum):
 
 class InventoryCreate(BaseCreate):
     movement_type: MovementType
-    quantity: int
-    previous_stock: int
-    new_stock: int
+    quantity: int = Field(..., ge=0)  # Em ajustes, o novo estoque do produto
+    # Calculados pelo servidor; aceitos apenas por compatibilidade com clientes antigos
+    previous_stock: Optional[int] = None
+    new_stock: Optional[int] = None
     reference_id: Optional[str] = Field(None, max_length=100)
     reference_type: Optional[str] = Field(None, max_length=50)
     notes: Optional[str] = None
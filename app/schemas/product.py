@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator, model_validator
-from typing import Optional, Dict, Any, Union
+from typing import Optional, Dict, Any, List, Union
 from decimal import Decimal
 from datetime import datetime
 from .base import BaseResponse, BaseCreate, BaseUpdate
@@ -36,6 +36,10 @@ class ProductCreate(BaseCreate):
             raise ValueError('Preço de venda deve ser maior que o preço de compra')
         return v
 
+class ProductImportRow(ProductCreate):
+    """Linha de POST /products/import: mesmos campos do cadastro, sem os de sincronização"""
+    last_updated: Optional[datetime] = None
+
 class ProductUpdate(BaseUpdate):
     # Código e identificação
     codigo: Optional[str] = Field(None, min_length=1, max_length=50, alias="sku")
@@ -62,6 +66,73 @@ class ProductUpdate(BaseUpdate):
         populate_by_name = True
         from_attributes = True
 
+class ProductPriceItem(BaseModel):
+    """Novos preços de um produto em PATCH /products/bulk"""
+    codigo: str = Field(..., min_length=1, max_length=50, alias="sku")
+    preco_compra: Optional[Decimal] = Field(None, ge=0, alias="cost_price")
+    preco_venda: Optional[Decimal] = Field(None, ge=0, alias="sale_price")
+
+    class Config:
+        populate_by_name = True
+
+    @model_validator(mode='after')
+    def algum_preco(self):
+        if self.preco_compra is None and self.preco_venda is None:
+            raise ValueError('Informe preco_compra e/ou preco_venda')
+        return self
+
+class ProductBulkUpdate(BaseModel):
+    """Alteração em lote: `items` (preço por código) ou filtro + alterações comuns"""
+    # Preços por código
+    items: Optional[List[ProductPriceItem]] = Field(None, min_length=1, max_length=10000)
+    
+    # Filtro
+    ids: Optional[List[int]] = Field(None, min_length=1)
+    codigos: Optional[List[str]] = Field(None, min_length=1, alias="skus")
+    category_id: Optional[int] = None
+    include_inactive: bool = False
+    
+    # Alterações aplicadas a todos os produtos do filtro
+    preco_compra_percent: Optional[Decimal] = Field(None, gt=-100, description="Ex.: 5 = +5%, -10 = -10%")
+    preco_venda_percent: Optional[Decimal] = Field(None, gt=-100, description="Ex.: 5 = +5%, -10 = -10%")
+    preco_compra: Optional[Decimal] = Field(None, ge=0, alias="cost_price")
+    preco_venda: Optional[Decimal] = Field(None, ge=0, alias="sale_price")
+    estoque_minimo: Optional[int] = Field(None, ge=0, alias="min_stock")
+    new_category_id: Optional[int] = Field(None, description="Move os produtos para esta categoria (0 = sem categoria)")
+    venda_por_peso: Optional[bool] = None
+
+    class Config:
+        populate_by_name = True
+
+    @model_validator(mode='after')
+    def modo_valido(self):
+        filtro = self.ids is not None or self.codigos is not None or self.category_id is not None
+        alteracoes = any(
+            getattr(self, name) is not None
+            for name in ('preco_compra_percent', 'preco_venda_percent', 'preco_compra', 'preco_venda',
+                         'estoque_minimo', 'new_category_id', 'venda_por_peso')
+        )
+        if self.items is not None:
+            if filtro or alteracoes:
+                raise ValueError('Use items sozinho ou filtro com alterações, não os dois')
+            if len({item.codigo for item in self.items}) != len(self.items):
+                raise ValueError('Código repetido em items')
+            return self
+        if not filtro:
+            raise ValueError('Informe ids, codigos ou category_id para selecionar os produtos')
+        if not alteracoes:
+            raise ValueError('Nenhuma alteração informada')
+        if self.preco_compra is not None and self.preco_compra_percent is not None:
+            raise ValueError('Use preco_compra ou preco_compra_percent, não os dois')
+        if self.preco_venda is not None and self.preco_venda_percent is not None:
+            raise ValueError('Use preco_venda ou preco_venda_percent, não os dois')
+        return self
+
+class ProductBulkUpdateResult(BaseModel):
+    """Produtos efetivamente alterados (os que já tinham os valores pedidos ficam de fora)"""
+    updated: int
+    ids: List[int]
+
 class ProductResponse(BaseResponse):
     # Identificação
     id: int
@@ -143,6 +214,25 @@ class ProductResponse(BaseResponse):
         from_attributes = True
         populate_by_name = True
 
+class LowStockProduct(BaseModel):
+    """Produto com estoque igual ou abaixo do mínimo"""
+    id: int
+    codigo: str
+    nome: str
+    category_id: Optional[int] = None
+    estoque: int
+    estoque_minimo: int
+    deficit: int = Field(..., description="estoque_minimo - estoque")
+
+class LowStockAlert(BaseModel):
+    """Produto que passou para o nível mínimo de estoque nesta operação"""
+    product_id: int
+    estoque: int
+    estoque_minimo: int
+
+    class Config:
+        from_attributes = True
+
 def format_decimal(value) -> str:
     """Formata um valor decimal para string com 2 casas decimais"""
     if value is None:
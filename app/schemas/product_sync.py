@@ -6,6 +6,7 @@ from .base import BaseCreate
 
 class ProductSyncResponse(BaseCreate):
     """Schema específico para resposta de sincronização de produtos, sem validação de preço"""
+    id: Optional[int] = None
     # Código e identificação
     codigo: str = Field(..., min_length=1, max_length=50, alias="sku")
     
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+class ProfileRouteRequest(BaseModel):
+    """Amostrar as próximas `requests` requisições de uma rota neste worker"""
+    route: str = Field(..., description="Template da rota, ex.: /api/v1/reports/financial/range")
+    requests: int = Field(10, ge=1, le=1000)
+    interval_ms: float = Field(5.0, ge=1.0, le=1000.0)
+
+class ProfileWorkerRequest(BaseModel):
+    """Amostrar todas as threads deste worker por `seconds`"""
+    seconds: float = Field(10.0, gt=0)
+    interval_ms: float = Field(5.0, ge=1.0, le=1000.0)
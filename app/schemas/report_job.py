@@ -0,0 +1,36 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+class ReportJobCreate(BaseModel):
+    """Pedido de relatório/exportação processado em segundo plano"""
+    kind: str = Field(..., description="financial_daily, financial_range ou sales_export")
+    params: Dict[str, Any] = Field(default_factory=dict)
+
+class ReportJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str = Field(..., description="queued, running, done ou failed")
+    params: Dict[str, Any]
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+# Parâmetros de cada tipo de job
+
+class DailyReportParams(BaseModel):
+    report_date: date
+
+class DateRangeParams(BaseModel):
+    start_date: date
+    end_date: date
+
+    @model_validator(mode="after")
+    def check_range(self):
+        if self.end_date < self.start_date:
+            raise ValueError("end_date deve ser igual ou posterior a start_date")
+        return self
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
+from app.core.money import Money
+from .product import LowStockAlert
 
 class SaleStatus(str, Enum):
     """Status possíveis de uma venda"""
@@ -46,18 +48,18 @@ class CartItemCreate(BaseModel):
 class CartItemResponse(CartItemCreate):
     """Resposta para itens do carrinho"""
     name: str = Field(..., alias="nome")
-    unit_price: float
-    total_price: float
+    unit_price: Money
+    total_price: Money
     is_weight_sale: bool = False  # Adicionado para o frontend saber se é venda por peso
     weight_in_kg: Optional[float] = None
-    custom_price: Optional[float] = None
+    custom_price: Optional[Money] = None
 
 class CartResponse(BaseModel):
     """Resposta com o carrinho de compras"""
     items: List[CartItemResponse] = []
-    subtotal: float = 0.0
-    tax_amount: float = 0.0
-    total: float = 0.0
+    subtotal: Money = 0.0
+    tax_amount: Money = 0.0
+    total: Money = 0.0
 
 class CheckoutRequest(BaseModel):
     """Dados para finalizar a venda"""
@@ -87,11 +89,11 @@ class SaleItemResponse(BaseModel):
     product_id: int
     product_name: str
     quantity: float
-    unit_price: float
-    total_price: float
+    unit_price: Money
+    total_price: Money
     is_weight_sale: bool = False
     weight_in_kg: Optional[float] = None
-    custom_price: Optional[float] = None
+    custom_price: Optional[Money] = None
     created_at: datetime
     
     class Config:
@@ -114,16 +116,18 @@ class SaleResponse(BaseModel):
     id: int
     sale_number: str
     status: SaleStatus
-    subtotal: float
-    tax_amount: float
-    discount_amount: float
-    total_amount: float
+    subtotal: Money
+    tax_amount: Money
+    discount_amount: Money
+    total_amount: Money
     payment_method: str
     created_at: datetime
     items: List[SaleItemResponse] = []
     message: Optional[str] = None
     user_id: Optional[int] = None
     user_name: Optional[str] = None
+    # Produtos que atingiram o estoque mínimo com esta venda (apenas no checkout)
+    low_stock_alerts: List[LowStockAlert] = []
     
     class Config:
         from_attributes = True
@@ -20,6 +20,7 @@ class SaleItemSyncResponse(BaseModel):
 
 class SaleSyncResponse(BaseCreate):
     """Schema específico para resposta de sincronização de vendas"""
+    id: Optional[int] = None
     sale_number: str
     status: SaleStatus = SaleStatus.PENDENTE
     subtotal: float
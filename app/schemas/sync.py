@@ -5,11 +5,20 @@ from pydantic.generics import GenericModel
 
 T = TypeVar('T')
 
+class Tombstone(BaseModel):
+    """Registro excluído (ou desativado) no servidor que o cliente deve remover"""
+    id: int
+    deleted_at: datetime
+
 class SyncResponse(GenericModel, Generic[T]):
     """Resposta genérica para endpoints de sincronização"""
     synced_records: List[T] = []
     conflicts: List[T] = []
     server_updated: List[T] = []
+    deleted: List[Tombstone] = []
+    # Paginação pelo change_log: maior sequência incluída na resposta
+    last_seq: Optional[int] = None
+    has_more: bool = False
 
 class SyncBase(BaseModel):
     """Campos base para todos os modelos sincronizáveis"""
@@ -18,4 +27,5 @@ class SyncBase(BaseModel):
 
 class SyncQuery(BaseModel):
     """Parâmetros para consulta de sincronização"""
-    last_sync: datetime
\ No newline at end of file
+    last_sync: Optional[datetime] = None
+    since_seq: Optional[int] = None
\ No newline at end of file
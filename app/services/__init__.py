@@ -0,0 +1 @@
+# Regras de negócio compartilhadas entre endpoints (checkout, inventário, sincronização)
@@ -0,0 +1,237 @@
+"""Contadores de vendas do dia para GET /reports/today.
+
+O checkout incrementa, na mesma transação da venda, a linha do dia em
+daily_sales_counters e as linhas dos produtos vendidos em daily_product_sales, com
+upsert atômico no banco (vale para todos os workers). O dia é a data local da loja
+(settings.TIMEZONE): a virada acontece na meia-noite local sem nenhum reset, porque
+a venda seguinte já cai em uma nova linha.
+
+Vendas alteradas fora do checkout (cancelamentos, sincronização offline) são
+corrigidas pela reconciliação periódica, que recalcula hoje e ontem a partir de
+sales e sale_items e aplica só a diferença, sem bloquear o checkout durante as somas."""
+
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.jobs import periodic_task, try_task_lock
+from app.core.money import to_cents, cents_to_float
+from app.models.daily_counter import DailySalesCounter, DailyProductSales
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.schemas.sale import SaleStatus
+
+logger = logging.getLogger(__name__)
+
+# INSERT ... ON CONFLICT de cada banco suportado
+_UPSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+RECONCILE_TASK = "reconcile_daily_counters"
+
+_counters = DailySalesCounter.__table__
+_products = DailyProductSales.__table__
+
+
+def local_today() -> date:
+    return datetime.now(ZoneInfo(settings.TIMEZONE)).date()
+
+
+def day_bounds(day: date) -> Tuple[datetime, datetime]:
+    """Início e fim (exclusivo) do dia local, em UTC, para filtrar created_at"""
+    tz = ZoneInfo(settings.TIMEZONE)
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def _upsert(db: Session):
+    return _UPSERT[db.get_bind().dialect.name]
+
+
+def record_sale(
+    db: Session,
+    revenue_cents: int,
+    items: Iterable[Tuple[int, Optional[str], float, int]],
+    day: Optional[date] = None,
+) -> None:
+    """Soma uma venda aos contadores do dia. `items`: (product_id, nome, quantidade, total em centavos).
+    Não faz commit: deve rodar na transação da venda, o mais perto possível do commit,
+    porque a linha do dia fica bloqueada até lá."""
+    day = day or local_today()
+    upsert = _upsert(db)
+
+    statement = upsert(_counters).values(day=day, revenue_cents=revenue_cents, sales_count=1)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[_counters.c.day],
+        set_={
+            "revenue_cents": _counters.c.revenue_cents + statement.excluded.revenue_cents,
+            "sales_count": _counters.c.sales_count + 1,
+            "updated_at": func.now(),
+        },
+    ))
+
+    per_product: Dict[int, dict] = {}
+    for product_id, name, quantity, total_cents in items:
+        row = per_product.setdefault(product_id, {
+            "day": day, "product_id": product_id, "product_name": name, "quantity": 0, "revenue_cents": 0,
+        })
+        row["quantity"] += quantity
+        row["revenue_cents"] += total_cents
+    if not per_product:
+        return
+
+    # Ordem fixa de product_id: checkouts concorrentes bloqueiam as linhas na mesma ordem
+    statement = upsert(_products).values([per_product[product_id] for product_id in sorted(per_product)])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[_products.c.day, _products.c.product_id],
+        set_={
+            "quantity": _products.c.quantity + statement.excluded.quantity,
+            "revenue_cents": _products.c.revenue_cents + statement.excluded.revenue_cents,
+            "product_name": statement.excluded.product_name,
+        },
+    ))
+
+
+def reconcile_day(db: Session, day: date) -> None:
+    """Corrige os contadores do dia a partir das vendas concluídas. Não faz commit.
+
+    Cada consulta lê as somas das vendas e os contadores atuais no mesmo snapshot, e só
+    a diferença é aplicada, com o upsert incremental do checkout. Assim nenhuma linha
+    fica bloqueada durante as somas, e vendas confirmadas entre a leitura e a escrita
+    continuam contadas. Duas reconciliações simultâneas aplicariam a diferença duas
+    vezes: reconcile_recent_days roda em um runner por vez."""
+    start, end = day_bounds(day)
+    upsert = _upsert(db)
+    completed = (Sale.status == SaleStatus.CONCLUIDA, Sale.created_at >= start, Sale.created_at < end)
+    counted = _counters.c.day == day
+
+    totals = db.execute(select(
+        select(func.coalesce(func.sum(Sale.total_amount), 0)).where(*completed).scalar_subquery().label("revenue"),
+        select(func.count(Sale.id)).where(*completed).scalar_subquery().label("sales_count"),
+        select(_counters.c.revenue_cents).where(counted).scalar_subquery().label("counted_revenue"),
+        select(_counters.c.sales_count).where(counted).scalar_subquery().label("counted_sales"),
+    )).one()
+    revenue_delta = to_cents(totals.revenue) - (totals.counted_revenue or 0)
+    sales_delta = totals.sales_count - (totals.counted_sales or 0)
+    if revenue_delta or sales_delta:
+        statement = upsert(_counters).values(day=day, revenue_cents=revenue_delta, sales_count=sales_delta)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[_counters.c.day],
+            set_={
+                "revenue_cents": _counters.c.revenue_cents + statement.excluded.revenue_cents,
+                "sales_count": _counters.c.sales_count + statement.excluded.sales_count,
+                "updated_at": func.now(),
+            },
+        ))
+
+    # Itens vendidos e contadores dos produtos lado a lado, somados por produto
+    rows = union_all(
+        select(
+            SaleItem.product_id,
+            SaleItem.product_name_at_sale.label("product_name"),
+            SaleItem.quantity.label("quantity"),
+            SaleItem.total_price.label("revenue"),
+            literal(0, _products.c.quantity.type).label("counted_quantity"),
+            literal(0, _products.c.revenue_cents.type).label("counted_revenue"),
+        )
+        .join(Sale, Sale.id == SaleItem.sale_id)
+        .where(*completed),
+        select(
+            _products.c.product_id,
+            _products.c.product_name,
+            literal(0, SaleItem.quantity.type),
+            literal(0, SaleItem.total_price.type),
+            _products.c.quantity,
+            _products.c.revenue_cents,
+        ).where(_products.c.day == day),
+    ).subquery()
+    products = db.execute(
+        select(
+            rows.c.product_id,
+            func.max(rows.c.product_name).label("product_name"),
+            func.sum(rows.c.quantity).label("quantity"),
+            func.sum(rows.c.revenue).label("revenue"),
+            func.sum(rows.c.counted_quantity).label("counted_quantity"),
+            func.sum(rows.c.counted_revenue).label("counted_revenue"),
+        )
+        .group_by(rows.c.product_id)
+        # Mesma ordem de product_id do checkout: as linhas são bloqueadas na mesma ordem
+        .order_by(rows.c.product_id)
+    ).all()
+    corrections = []
+    for row in products:
+        quantity_delta = row.quantity - row.counted_quantity
+        revenue_delta = to_cents(row.revenue) - row.counted_revenue
+        if quantity_delta or revenue_delta:
+            corrections.append({
+                "day": day,
+                "product_id": row.product_id,
+                "product_name": row.product_name,
+                "quantity": quantity_delta,
+                "revenue_cents": revenue_delta,
+            })
+    if not corrections:
+        return
+    statement = upsert(_products).values(corrections)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[_products.c.day, _products.c.product_id],
+        set_={
+            "quantity": _products.c.quantity + statement.excluded.quantity,
+            "revenue_cents": _products.c.revenue_cents + statement.excluded.revenue_cents,
+        },
+    ))
+    # Produtos que deixaram de ter vendas no dia (cancelamentos)
+    db.execute(delete(_products).where(
+        _products.c.day == day, _products.c.quantity == 0, _products.c.revenue_cents == 0
+    ))
+
+
+@periodic_task(RECONCILE_TASK, settings.COUNTERS_RECONCILE_SECONDS)
+def reconcile_recent_days(db: Session) -> None:
+    """Ontem também: vendas perto da meia-noite e sincronizações atrasadas.
+    Os dois dias vão em uma transação, com o advisory lock da tarefa: com vários
+    runners (workers web e app.worker), os demais pulam a rodada"""
+    if not try_task_lock(db, RECONCILE_TASK):
+        db.rollback()
+        return
+    today = local_today()
+    for day in (today - timedelta(days=1), today):
+        reconcile_day(db, day)
+    db.commit()
+
+
+def today_summary(db: Session) -> dict:
+    """Indicadores do dia atual: duas leituras por chave primária/índice"""
+    day = local_today()
+    counters = db.execute(
+        select(_counters.c.revenue_cents, _counters.c.sales_count, _counters.c.updated_at)
+        .where(_counters.c.day == day)
+    ).first()
+    top = db.execute(
+        select(_products.c.product_id, _products.c.product_name, _products.c.quantity, _products.c.revenue_cents)
+        .where(_products.c.day == day)
+        .order_by(_products.c.quantity.desc())
+        .limit(1)
+    ).first()
+
+    revenue_cents = counters.revenue_cents if counters else 0
+    sales_count = counters.sales_count if counters else 0
+    return {
+        "date": day.isoformat(),
+        "revenue": cents_to_float(revenue_cents),
+        "sales_count": sales_count,
+        "average_ticket": cents_to_float(round(revenue_cents / sales_count)) if sales_count else 0.0,
+        "top_product": {
+            "product_id": top.product_id,
+            "name": top.product_name,
+            "quantity": float(top.quantity),
+            "revenue": cents_to_float(top.revenue_cents),
+        } if top else None,
+        "updated_at": counters.updated_at if counters else None,
+    }
@@ -0,0 +1,210 @@
+"""Importação de produtos em lote (POST /products/import).
+
+O arquivo (CSV com cabeçalho ou NDJSON, um objeto por linha) é lido do corpo da
+requisição à medida que chega e processado em blocos de
+settings.PRODUCTS_IMPORT_CHUNK_SIZE linhas. Para cada bloco:
+
+- as linhas são validadas com o schema de POST /products/ (ProductImportRow);
+- uma consulta traz os produtos já cadastrados com os códigos do bloco e outra
+  confere as categorias;
+- produtos novos entram com um único INSERT em lote e os existentes são
+  atualizados com um UPDATE em lote por chave primária;
+- o bloco é confirmado com um commit próprio, então um erro de banco perde só
+  aquele bloco.
+
+O estoque de produtos existentes passa por `set_stock` (ajuste registrado no
+histórico de movimentações), como qualquer outra alteração de estoque."""
+
+import codecs
+import csv
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.change_log import INSERT, UPDATE, record_changes
+from app.models.inventory import MovementType
+from app.models.product import Product
+from app.schemas.product import ProductImportRow
+from app.services.stock import set_stock
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+# Campos do produto gravados pela importação (além de codigo)
+_FIELDS = ("nome", "descricao", "preco_compra", "preco_venda", "estoque", "estoque_minimo", "category_id", "venda_por_peso")
+
+
+@dataclass
+class ImportReport:
+    """Resultado da importação; `errors` guarda no máximo `max_errors` linhas"""
+    max_errors: int
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def add_error(self, line: int, codigo: Optional[str], messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "codigo": codigo, "errors": messages})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Linhas (número, texto) de um corpo UTF-8 recebido em pedaços, sem carregá-lo inteiro"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    number = 0
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            number += 1
+            yield number, line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield number + 1, pending.rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterator[Tuple[int, str]], format: str) -> AsyncIterator[Tuple[int, Any]]:
+    """Registros (linha inicial, dict ou mensagem de erro) do arquivo CSV ou NDJSON"""
+    if format == NDJSON:
+        async for number, line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                yield number, "JSON inválido"
+                continue
+            yield number, record if isinstance(record, dict) else "A linha deve ser um objeto JSON"
+        return
+
+    header = None
+    buffer: List[str] = []
+    start = 0
+    async for number, line in lines:
+        if not buffer:
+            start = number
+        buffer.append(line)
+        # Campo entre aspas com quebra de linha: o registro continua na próxima linha
+        if sum(part.count('"') for part in buffer) % 2:
+            continue
+        text = "\n".join(buffer)
+        buffer = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start, f"Esperadas {len(header)} colunas, encontradas {len(values)}"
+            continue
+        # Célula vazia equivale a campo ausente (usa o padrão do schema)
+        yield start, {name: value for name, value in zip(header, values) if value != ""}
+    if buffer:
+        yield start, "Aspas não fechadas no fim do arquivo"
+
+
+def _validate(record: Any) -> Tuple[Optional[ProductImportRow], Optional[str], List[str]]:
+    if isinstance(record, str):
+        return None, None, [record]
+    codigo = record.get("codigo", record.get("sku"))
+    try:
+        return ProductImportRow.model_validate(record), codigo, []
+    except ValidationError as e:
+        messages = [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+            for error in e.errors()
+        ]
+        return None, codigo, messages
+
+
+def import_chunk(db: Session, records: List[Tuple[int, Any]], update_existing: bool, report: ImportReport) -> None:
+    """Valida e grava um bloco de registros, com commit próprio"""
+    report.rows += len(records)
+    valid: Dict[str, Tuple[int, ProductImportRow]] = {}
+    for line, record in records:
+        product, codigo, messages = _validate(record)
+        if product is not None and product.codigo in valid:
+            messages = [f"Código repetido no arquivo (linha {valid[product.codigo][0]})"]
+        if messages:
+            report.add_error(line, codigo, messages)
+            continue
+        valid[product.codigo] = (line, product)
+    if not valid:
+        return
+
+    existing = {
+        row.codigo: row
+        for row in db.execute(
+            select(Product.id, Product.codigo, Product.is_active).where(Product.codigo.in_(valid))
+        )
+    }
+    category_ids = {product.category_id for _, product in valid.values() if product.category_id}
+    categories = set(db.scalars(select(Category.id).where(Category.id.in_(category_ids)))) if category_ids else set()
+
+    new_rows, update_rows, stock_targets, lines = [], [], {}, []
+    for codigo, (line, product) in valid.items():
+        if product.category_id and product.category_id not in categories:
+            report.add_error(line, codigo, [f"Categoria com ID {product.category_id} não encontrada"])
+            continue
+        current = existing.get(codigo)
+        if current is None:
+            # Produto novo: colunas ausentes no arquivo recebem o padrão do schema
+            values = {name: getattr(product, name) for name in _FIELDS}
+            values["category_id"] = values["category_id"] or None
+            new_rows.append({"codigo": codigo, **values})
+        elif not update_existing:
+            report.add_error(line, codigo, ["Já existe um produto com este código"])
+            continue
+        else:
+            # Produto existente: só as colunas presentes na linha são alteradas
+            values = {name: getattr(product, name) for name in _FIELDS if name in product.model_fields_set}
+            if "category_id" in values:
+                values["category_id"] = values["category_id"] or None
+            # Estoque de produtos existentes só muda pelo histórico de movimentações
+            estoque = values.pop("estoque", None)
+            update_rows.append({"id": current.id, **values})
+            if current.is_active and estoque is not None:
+                stock_targets[current.id] = estoque
+        lines.append((line, codigo))
+
+    if not new_rows and not update_rows:
+        return
+    try:
+        if new_rows:
+            created_ids = list(db.scalars(insert(Product).returning(Product.id), new_rows))
+            record_changes(db, Product.__tablename__, created_ids, INSERT)
+        if update_rows:
+            db.execute(update(Product), update_rows)
+            record_changes(db, Product.__tablename__, [row["id"] for row in update_rows], UPDATE)
+        set_stock(db, stock_targets, MovementType.ADJUSTMENT, reference_type="import", notes="Importação de produtos")
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.exception("Erro ao gravar bloco da importação de produtos")
+        for line, codigo in lines:
+            report.add_error(line, codigo, [f"Erro ao gravar o bloco: {e.__class__.__name__}"])
+        return
+    report.created += len(new_rows)
+    report.updated += len(update_rows)
@@ -0,0 +1,203 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.events import LOW_STOCK, STOCK_CHANGED, queue_event
+from app.models.change_log import record_changes
+from app.models.inventory import Inventory, MovementType
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+# Chave em Session.info com os alertas de estoque baixo aguardando o commit
+_PENDING_ALERTS = "low_stock_alerts"
+
+# Produtos por evento stock.changed (o payload do NOTIFY é limitado a 8000 bytes)
+STOCK_EVENT_BATCH = 100
+
+
+@dataclass
+class StockChange:
+    """Movimentação de estoque: `delta` positivo entra, negativo sai"""
+    product_id: int
+    delta: int
+    movement_type: MovementType
+    reference_id: Optional[str] = None
+    reference_type: Optional[str] = None
+    notes: Optional[str] = None
+
+
+@dataclass
+class LowStockAlert:
+    """Produto que cruzou o estoque mínimo (estava acima e ficou igual ou abaixo)"""
+    product_id: int
+    estoque: int
+    estoque_minimo: int
+
+
+class StockError(Exception):
+    pass
+
+
+class ProductNotFoundError(StockError):
+    def __init__(self, product_id: int) -> None:
+        super().__init__(f"Produto com ID {product_id} não encontrado")
+        self.product_id = product_id
+
+
+class InsufficientStockError(StockError):
+    def __init__(self, product_id: int, name: str, available: int, requested: int) -> None:
+        super().__init__(f"Estoque insuficiente para o produto {name}")
+        self.product_id = product_id
+        self.name = name
+        self.available = available
+        self.requested = requested
+
+
+def _raise_for_missing(db: Session, missing: List[int], deltas: Dict[int, int]) -> None:
+    """Descobre por que o UPDATE não alcançou os produtos (inexistente/inativo ou estoque insuficiente)"""
+    rows = {
+        row.id: row
+        for row in db.execute(
+            select(Product.id, Product.nome, Product.estoque).where(
+                Product.id.in_(missing), Product.is_active == True
+            )
+        )
+    }
+    for product_id in missing:
+        row = rows.get(product_id)
+        if row is None:
+            raise ProductNotFoundError(product_id)
+        raise InsufficientStockError(product_id, row.nome, row.estoque, -deltas[product_id])
+
+
+def apply_stock_changes(db: Session, changes: List[StockChange], allow_negative: bool = False) -> List[Inventory]:
+    """Aplica as movimentações com um único UPDATE atômico e registra o histórico.
+
+    O estoque é alterado no banco (current_stock = current_stock + delta), não por
+    leitura/escrita na aplicação, então checkouts concorrentes não perdem atualizações.
+    A condição current_stock + delta >= 0 faz parte do WHERE: um produto sem estoque
+    suficiente simplesmente não é atualizado e a função levanta InsufficientStockError
+    (o chamador deve fazer rollback). As linhas de inventory_movements e do change_log
+    são inseridas em lote na mesma transação. Não faz commit."""
+    changes = [change for change in changes if change.delta]
+    if not changes:
+        return []
+
+    deltas: Dict[int, int] = {}
+    for change in changes:
+        deltas[change.product_id] = deltas.get(change.product_id, 0) + change.delta
+
+    delta = case(deltas, value=Product.id, else_=0)
+    statement = (
+        update(Product)
+        .where(Product.id.in_(deltas), Product.is_active == True)
+        .values(estoque=Product.estoque + delta)
+        .returning(Product.id, Product.estoque, Product.estoque_minimo, Product.venda_por_peso)
+        .execution_options(synchronize_session="fetch")
+    )
+    if not allow_negative:
+        statement = statement.where(Product.estoque + delta >= 0)
+    returned = db.execute(statement).all()
+    new_stock = {row.id: row.estoque for row in returned}
+
+    missing = [product_id for product_id in deltas if product_id not in new_stock]
+    if missing:
+        _raise_for_missing(db, missing, deltas)
+
+    # Estoque anterior de cada movimentação, na ordem recebida
+    stock = {product_id: new_stock[product_id] - total for product_id, total in deltas.items()}
+    rows = []
+    for change in changes:
+        previous = stock[change.product_id]
+        stock[change.product_id] = previous + change.delta
+        rows.append({
+            "product_id": change.product_id,
+            "movement_type": change.movement_type,
+            "quantity": abs(change.delta),
+            "previous_stock": previous,
+            "new_stock": previous + change.delta,
+            "reference_id": change.reference_id,
+            "reference_type": change.reference_type,
+            "notes": change.notes,
+        })
+    movements = list(db.scalars(insert(Inventory).returning(Inventory), rows))
+    record_changes(db, Product.__tablename__, list(deltas))
+
+    # Produtos vendidos por peso não controlam estoque (ficam em 0/0) e não geram alerta
+    alerts = [
+        LowStockAlert(row.id, row.estoque, row.estoque_minimo)
+        for row in returned
+        if not row.venda_por_peso and row.estoque <= row.estoque_minimo < row.estoque - deltas[row.id]
+    ]
+    if alerts:
+        db.info.setdefault(_PENDING_ALERTS, []).extend(alerts)
+        # Só os produtos que cruzaram o mínimo nesta transação, entregues após o commit
+        payload = [{"product_id": alert.product_id, "estoque": alert.estoque, "estoque_minimo": alert.estoque_minimo} for alert in alerts]
+        for start in range(0, len(payload), STOCK_EVENT_BATCH):
+            queue_event(db, LOW_STOCK, {"products": payload[start:start + STOCK_EVENT_BATCH]})
+
+    products = [
+        {"id": row.id, "estoque": row.estoque, "estoque_minimo": row.estoque_minimo}
+        for row in returned
+    ]
+    for start in range(0, len(products), STOCK_EVENT_BATCH):
+        queue_event(db, STOCK_CHANGED, {"products": products[start:start + STOCK_EVENT_BATCH]})
+    return movements
+
+
+def pending_low_stock_alerts(db: Session) -> List[LowStockAlert]:
+    """Alertas gerados na transação atual (ainda não confirmados)"""
+    return list(db.info.get(_PENDING_ALERTS, ()))
+
+
+@event.listens_for(Session, "after_commit")
+def _log_low_stock_alerts(session):
+    alerts = session.info.pop(_PENDING_ALERTS, None)
+    if not alerts:
+        return
+    logger.warning(
+        "Estoque baixo: %s", ", ".join(f"produto {alert.product_id} ({alert.estoque}/{alert.estoque_minimo})" for alert in alerts),
+        extra={"low_stock_product_ids": [alert.product_id for alert in alerts]},
+    )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_low_stock_alerts(session):
+    session.info.pop(_PENDING_ALERTS, None)
+
+
+def set_stock(
+    db: Session,
+    targets: Dict[int, int],
+    movement_type: MovementType = MovementType.ADJUSTMENT,
+    reference_id: Optional[str] = None,
+    reference_type: Optional[str] = None,
+    notes: Optional[str] = None,
+) -> List[Inventory]:
+    """Ajusta o estoque para valores absolutos (contagem, sincronização) registrando a diferença.
+
+    As linhas são bloqueadas (FOR UPDATE) antes da leitura para que o delta calculado
+    não seja invalidado por um checkout concorrente."""
+    if not targets:
+        return []
+    current = {
+        row.id: row.estoque
+        for row in db.execute(
+            select(Product.id, Product.estoque)
+            .where(Product.id.in_(targets), Product.is_active == True)
+            .with_for_update()
+        )
+    }
+    for product_id in targets:
+        if product_id not in current:
+            raise ProductNotFoundError(product_id)
+
+    changes = [
+        StockChange(product_id, target - current[product_id], movement_type, reference_id, reference_type, notes)
+        for product_id, target in targets.items()
+    ]
+    return apply_stock_changes(db, changes, allow_negative=True)
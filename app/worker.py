@@ -0,0 +1,52 @@
+"""Processo dedicado aos jobs de relatório em segundo plano.
+
+Uso: python -m app.worker
+
+Com JOBS_WORKER_IN_PROCESS=False os workers web apenas enfileiram, e os relatórios
+pesados rodam aqui, sem competir por CPU e threads com o checkout.
+
+O Procfile sobe este processo (`worker`) e já define JOBS_WORKER_IN_PROCESS=False no
+`web`. Em implantações só com o serviço web (railway.toml, Dockerfile) o padrão True
+mantém os jobs nos workers web; para usar este processo nelas, crie um serviço com
+`python -m app.worker` e defina JOBS_WORKER_IN_PROCESS=False no serviço web."""
+import logging
+import signal
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.jobs import JobRunner, load_job_kinds
+from app.core.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    setup_logging(
+        level=settings.LOG_LEVEL,
+        module_levels=settings.LOG_LEVELS,
+        json_format=settings.LOG_FORMAT == "json",
+        debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+        queue_size=settings.LOG_QUEUE_SIZE,
+    )
+    load_job_kinds()
+
+    runner = JobRunner(
+        SessionLocal,
+        poll_interval=settings.JOBS_POLL_INTERVAL,
+        timeout_seconds=settings.JOBS_TIMEOUT_SECONDS,
+        max_attempts=settings.JOBS_MAX_ATTEMPTS,
+        result_ttl_hours=settings.JOBS_RESULT_TTL_HOURS,
+    )
+
+    def handle_signal(signum, frame):
+        # Termina o job em andamento e sai
+        logger.info("Sinal %s recebido, encerrando o runner de jobs", signum)
+        runner.stop(timeout=0)
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    runner.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,103 @@
-# Configuração otimizada do Gunicorn para o Railway
+# Configuração do Gunicorn: workers, timeouts e reciclagem derivados dos núcleos e da
+# memória do container, com substituição pelas variáveis de Settings (app/core/config.py)
+import math
 import os
+import shutil
+import tempfile
 import multiprocessing
 
+from app.core.config import settings
+
+# Métricas Prometheus em modo multiprocesso: cada worker grava em arquivos neste diretório
+# e o /metrics agrega todos. Precisa estar definido antes de a aplicação ser carregada e é
+# limpo a cada inicialização para não somar processos antigos.
+prometheus_multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "pdv_prometheus")
+)
+shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def detect_cpus():
+    """Núcleos disponíveis ao processo, respeitando a cota de CPU do cgroup (containers)"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+
+    quota = period = None
+    cpu_max = _read("/sys/fs/cgroup/cpu.max")  # cgroup v2: "<quota> <period>" ou "max <period>"
+    if cpu_max and not cpu_max.startswith("max"):
+        quota, period = (int(value) for value in cpu_max.split())
+    else:
+        v1_quota = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us")
+        v1_period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+        if v1_quota and v1_period and int(v1_quota) > 0:
+            quota, period = int(v1_quota), int(v1_period)
+
+    if quota and period:
+        cpus = min(cpus, math.ceil(quota / period))
+    return max(cpus, 1)
+
+
+def detect_memory_mb():
+    """Limite de memória do cgroup ou, sem limite, a memória total da máquina (None se desconhecida)"""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        value = _read(path)
+        # cgroup v1 sem limite reporta um valor próximo de 2^63
+        if value and value.isdigit() and int(value) < 1 << 60:
+            return int(value) // (1024 * 1024)
+
+    meminfo = _read("/proc/meminfo")
+    if meminfo:
+        for line in meminfo.splitlines():
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1]) // 1024
+    return None
+
+
+def compute_workers(cpus, memory_mb):
+    """2 * núcleos + 1, limitado pela memória e pelo orçamento de conexões do Postgres"""
+    if settings.WEB_CONCURRENCY:
+        return settings.WEB_CONCURRENCY
+
+    count = 2 * cpus + 1
+    if memory_mb:
+        # Reserva 25% para o processo mestre, picos de relatório e o sistema
+        count = min(count, int(memory_mb * 0.75) // settings.WORKER_MEMORY_MB)
+    if settings.DB_MAX_CONNECTIONS:
+        count = min(count, settings.DB_MAX_CONNECTIONS // (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW))
+    return max(count, 1)
+
+
+cpus = detect_cpus()
+memory_mb = detect_memory_mb()
+
 # Configurações básicas
-bind = "0.0.0.0:8000"
-workers = 2  # Reduzido para 2 workers para economizar recursos
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = compute_workers(cpus, memory_mb)
 worker_class = 'uvicorn.workers.UvicornWorker'
+# O UvicornWorker ignora a opção `threads` do gunicorn: o threadpool dos endpoints
+# síncronos é ajustado no lifespan da aplicação (ver main.py). Só para o log abaixo.
+worker_threads = settings.worker_threads
 
-# Timeout e keepalive
-timeout = 30  # Reduzido para 30 segundos
-keepalive = 2
+# Timeouts e keepalive
+timeout = settings.GUNICORN_TIMEOUT
+# No deploy o mestre envia SIGTERM: o uvicorn para de aceitar conexões e espera as
+# requisições em andamento (ex.: checkouts) terminarem; após graceful_timeout o worker
+# recebe SIGKILL. O checkout é uma única transação, então um worker morto no meio dele
+# não deixa venda parcial. O tempo de drenagem da plataforma
+# (RAILWAY_DEPLOYMENT_DRAINING_SECONDS) deve ser maior que este valor.
+graceful_timeout = settings.GUNICORN_GRACEFUL_TIMEOUT
+keepalive = settings.GUNICORN_KEEPALIVE
 
 # Configurações de log
 accesslog = '-'
@@ -20,9 +108,14 @@ capture_output = True
 # Formato do log de acesso
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" "%(M)s ms"'
 
-# Configurações de desempenho
-max_requests = 1000
-max_requests_jitter = 50
+# Reciclagem dos workers (limita crescimento de memória); o jitter evita que todos
+# reiniciem ao mesmo tempo
+max_requests = settings.GUNICORN_MAX_REQUESTS
+max_requests_jitter = (
+    settings.GUNICORN_MAX_REQUESTS_JITTER
+    if settings.GUNICORN_MAX_REQUESTS_JITTER is not None
+    else max_requests // 10
+)
 worker_connections = 1000
 
 # Configurações de segurança
@@ -41,4 +134,32 @@ if os.getenv('ENVIRONMENT') == 'development':
     loglevel = 'debug'
 
 # Configuração de diretório temporário
-worker_tmp_dir = '/dev/shm' if os.path.exists('/dev/shm') else None
\ No newline at end of file
+worker_tmp_dir = '/dev/shm' if os.path.exists('/dev/shm') else None
+
+
+def when_ready(server):
+    connections = workers * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+    server.log.info(
+        "Gunicorn: %d workers x %d threads (CPUs: %d, memória: %s MB, conexões máximas: %d, "
+        "timeout: %ds, graceful: %ds, max_requests: %d±%d)",
+        workers, worker_threads, cpus, memory_mb or "?", connections,
+        timeout, graceful_timeout, max_requests, max_requests_jitter,
+    )
+
+
+def post_fork(server, worker):
+    """Descarta as conexões herdadas do mestre (preload_app) sem fechá-las: o socket é
+    compartilhado com o processo pai e cada worker precisa abrir as suas"""
+    from app.core.database import engine
+    engine.dispose(close=False)
+
+
+def worker_abort(worker):
+    # SIGABRT: o worker passou de `timeout` sem heartbeat (event loop bloqueado)
+    worker.log.warning("Worker %s abortado por timeout (%ds)", worker.pid, timeout)
+
+
+def child_exit(server, worker):
+    """Remove os gauges do worker encerrado da agregação do /metrics"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,17 +1,68 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.logging_config import setup_logging
+from app.core.instrumentation import InstrumentationMiddleware, instrument_engine
+from app.core.database import engine
+from app.core.metrics import PrometheusMiddleware, instrument_pool, metrics_endpoint
+from app.core.health import ReadinessChecker
+from app.core.profiler import ProfilingMiddleware
+from app.core.jobs import JobRunner
+from app.core.events import start_event_stream
+from app.core.database import SessionLocal
+from starlette.concurrency import run_in_threadpool
+from anyio import to_thread
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Logging estruturado com handler assíncrono (fila) e níveis por módulo
+setup_logging(
+    level=settings.LOG_LEVEL,
+    module_levels=settings.LOG_LEVELS,
+    json_format=settings.LOG_FORMAT == "json",
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
+    queue_size=settings.LOG_QUEUE_SIZE,
+)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Endpoints síncronos rodam neste threadpool; o tamanho acompanha o pool de conexões
+    to_thread.current_default_thread_limiter().total_tokens = settings.worker_threads
+
+    # Runner de jobs de relatório neste worker (iniciado após o fork do gunicorn)
+    job_runner = None
+    if settings.JOBS_WORKER_IN_PROCESS:
+        job_runner = JobRunner(
+            SessionLocal,
+            poll_interval=settings.JOBS_POLL_INTERVAL,
+            timeout_seconds=settings.JOBS_TIMEOUT_SECONDS,
+            max_attempts=settings.JOBS_MAX_ATTEMPTS,
+            result_ttl_hours=settings.JOBS_RESULT_TTL_HOURS,
+        )
+        job_runner.start()
+
+    # Eventos em tempo real: broker ligado a este event loop e LISTEN no PostgreSQL
+    events_listener = start_event_stream(engine)
+    yield
+    if events_listener is not None:
+        events_listener.stop()
+    if job_runner is not None:
+        job_runner.stop()
+    # Executado após o uvicorn esperar as requisições em andamento (SIGTERM do deploy)
+    engine.dispose()
+
+
 # Cria a aplicação FastAPI sem redirecionamentos automáticos
 app = FastAPI(
     title=settings.APP_NAME,
+    lifespan=lifespan,
     version="1.0.0",
     description="Backend do Sistema PDV",
     docs_url="/docs",
@@ -50,10 +101,39 @@ app.add_middleware(
     max_age=600,  # Tempo de cache para preflight requests (em segundos)
 )
 
+# Compressão negociada das respostas (sync e relatórios são JSON grandes e repetitivos)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
+
+# Instrumentação por requisição (adicionada por último para envolver os demais middlewares)
+if settings.INSTRUMENTATION_ENABLED:
+    instrument_engine(engine)
+    app.add_middleware(
+        InstrumentationMiddleware,
+        statement_threshold=settings.INSTRUMENTATION_STATEMENT_THRESHOLD,
+        server_timing=settings.INSTRUMENTATION_SERVER_TIMING,
+    )
+
+# Métricas Prometheus (/metrics agrega os workers do gunicorn em modo multiprocesso)
+if settings.METRICS_ENABLED:
+    instrument_pool(engine)
+    app.add_middleware(PrometheusMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+# Profiling sob demanda (desarmado, o middleware só faz uma checagem de atributo)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 # Global Exception Handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.exception("Unhandled exception: %s", exc)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -65,19 +145,17 @@ async def global_exception_handler(request: Request, exc: Exception):
 # Request Validation Error Handler
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    logger.error(f"Validation error: {exc.errors()}")
+    logger.warning("Validation error: %s", exc.errors())
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-        content={"detail": exc.errors(), "body": exc.body},
+        # jsonable_encoder: erros de validadores trazem a exceção original em "ctx"
+        content=jsonable_encoder({"detail": exc.errors(), "body": exc.body}),
     )
 
-try:
-    # Tenta importar e incluir as rotas da API
-    from app.api.api_v1.api import api_router
-    app.include_router(api_router, prefix=settings.API_V1_STR)
-    logger.info("✅ Rotas da API carregadas com sucesso!")
-except Exception as e:
-    logger.error(f"⚠️ Aviso ao carregar rotas da API: {e}", exc_info=True)
+# Rotas da API. Um erro de importação derruba a inicialização: um worker sem rotas
+# passaria no health check e responderia 404 a todas as requisições.
+from app.api.api_v1.api import api_router
+app.include_router(api_router, prefix=settings.API_V1_STR)
 
 # Rota raiz simplificada
 @app.get("/")
@@ -89,22 +167,30 @@ async def root():
         "version": "1.0.0"
     }
 
-# Rota de saúde simplificada
+readiness_checker = ReadinessChecker(
+    engine,
+    cache_seconds=settings.HEALTH_CACHE_SECONDS,
+    db_timeout=settings.HEALTH_DB_TIMEOUT,
+    check_migrations=settings.HEALTH_CHECK_MIGRATIONS,
+)
+
+# Liveness: o processo está respondendo (não consulta dependências)
+@app.get("/health/live")
 @app.get("/health")
 async def health_check():
-    try:
-        # Adicione verificações de saúde aqui (banco de dados, etc.)
-        return {
-            "status": "healthy",
-            "environment": settings.ENVIRONMENT,
-            "timestamp": "2025-08-27T04:30:00Z"
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={"status": "unhealthy", "error": str(e)}
-        )
+    return {
+        "status": "healthy",
+        "environment": settings.ENVIRONMENT,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+# Readiness: o worker consegue atender um checkout (banco, pool e migrações)
+@app.get("/health/ready")
+async def readiness_check():
+    result = await run_in_threadpool(readiness_checker.check)
+    if result["status"] != "ready":
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=result)
+    return result
 
 # Para execução local
 if __name__ == "__main__":
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos caminhos críticos do PDV (login, carrinho, checkout, busca, vendas,
+relatórios e sincronização).
+
+Mede latência p50/p95/p99 e vazão de cada cenário com N clientes concorrentes e grava
+o resultado em JSON, que pode ser comparado com uma execução anterior.
+
+Executar contra um servidor em execução (recomendado, ex.: gunicorn com a configuração
+de produção):
+    python scripts/populate_database.py --scale --products 1000 --sales 10000 --cashiers 10
+    python scripts/benchmark.py --base-url http://localhost:8000 --output bench.json
+
+Sem --base-url a aplicação é executada no próprio processo (útil apenas como teste rápido:
+as consultas síncronas bloqueiam o event loop e a concorrência fica serializada).
+
+Comparar com uma execução anterior (sai com código 1 se algum p95 piorar além do limite):
+    python scripts/benchmark.py --base-url http://localhost:8000 --compare baseline.json
+
+Requer httpx (pip install httpx).
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+# Adicionar o diretório raiz ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+API = "/api/v1"
+SEARCH_TERMS = ["Produto", "BENCH-0001", "00042", "Benchmark 0", "zzz"]
+
+
+def percentile(sorted_values, pct):
+    """Percentil por posição mais próxima (valores já ordenados)"""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    latencies_ms = sorted(value * 1000 for value in latencies)
+    count = len(latencies_ms)
+    return {
+        "requests": count + errors,
+        "errors": errors,
+        "throughput_rps": round((count + errors) / elapsed, 2) if elapsed > 0 else None,
+        "mean_ms": round(sum(latencies_ms) / count, 3) if count else None,
+        "p50_ms": round(percentile(latencies_ms, 50), 3) if count else None,
+        "p95_ms": round(percentile(latencies_ms, 95), 3) if count else None,
+        "p99_ms": round(percentile(latencies_ms, 99), 3) if count else None,
+        "max_ms": round(latencies_ms[-1], 3) if count else None,
+    }
+
+
+class Benchmark:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.tokens = []
+        self.product_ids = []
+
+    async def login(self, username: str) -> httpx.Response:
+        return await self.client.post(
+            f"{API}/auth/login",
+            data={"username": username, "password": self.args.password}
+        )
+
+    def headers(self, session_id: str = None) -> dict:
+        headers = {"Authorization": f"Bearer {self.rng.choice(self.tokens)}"}
+        if session_id:
+            headers["X-Session-ID"] = session_id
+        return headers
+
+    async def prepare(self):
+        """Autentica os caixas e escolhe produtos vendáveis por unidade"""
+        for i in range(1, self.args.cashiers + 1):
+            response = await self.login(f"caixa{i:03d}")
+            if response.status_code == 200:
+                self.tokens.append(response.json()["access_token"])
+        if not self.tokens:
+            raise SystemExit("Nenhum caixa autenticado. Popule o banco com scripts/populate_database.py --scale")
+
+        response = await self.client.get(f"{API}/products/", params={"search": "BENCH-", "limit": 1000})
+        response.raise_for_status()
+        self.product_ids = [p["id"] for p in response.json() if not p["venda_por_peso"] and p["estoque"] > 100]
+        if not self.product_ids:
+            raise SystemExit("Nenhum produto de benchmark encontrado")
+
+    # Cenários: cada chamada retorna a resposta cujo tempo é medido
+
+    async def scenario_login(self):
+        return await self.login(f"caixa{self.rng.randint(1, self.args.cashiers):03d}")
+
+    async def scenario_cart_add(self):
+        return await self.client.post(
+            f"{API}/cart/add",
+            json={"product_id": self.rng.choice(self.product_ids), "quantity": 1},
+            headers=self.headers(f"bench-{uuid.uuid4().hex}")
+        )
+
+    async def scenario_checkout(self):
+        # Os itens são adicionados antes; apenas o checkout é medido
+        session_id = f"bench-{uuid.uuid4().hex}"
+        headers = self.headers(session_id)
+        for product_id in self.rng.sample(self.product_ids, k=min(3, len(self.product_ids))):
+            await self.client.post(f"{API}/cart/add", json={"product_id": product_id, "quantity": 1}, headers=headers)
+        start = time.perf_counter()
+        response = await self.client.post(f"{API}/cart/checkout", json={"payment_method": "DINHEIRO"}, headers=headers)
+        return response, time.perf_counter() - start
+
+    async def scenario_products_search(self):
+        return await self.client.get(f"{API}/products/", params={"search": self.rng.choice(SEARCH_TERMS)})
+
+    async def scenario_sales_list(self):
+        return await self.client.get(f"{API}/sales/", params={"limit": 100}, headers=self.headers())
+
+    async def scenario_financial_range(self):
+        end = date.today()
+        start = end - timedelta(days=self.args.report_days)
+        return await self.client.get(
+            f"{API}/reports/financial/range",
+            params={"start_date": start.isoformat(), "end_date": end.isoformat()},
+            headers=self.headers()
+        )
+
+    def sync_scenario(self, entity: str):
+        async def scenario():
+            return await self.client.get(f"{API}/sync/{entity}", params={"since_seq": 0, "limit": 500}, headers=self.headers())
+        return scenario
+
+    def scenarios(self):
+        scenarios = {
+            "auth_login": self.scenario_login,
+            "cart_add": self.scenario_cart_add,
+            "cart_checkout": self.scenario_checkout,
+            "products_search": self.scenario_products_search,
+            "sales_list": self.scenario_sales_list,
+            "reports_financial_range": self.scenario_financial_range,
+        }
+        for entity in ("products", "categories", "customers", "sales", "users", "employees"):
+            scenarios[f"sync_{entity}"] = self.sync_scenario(entity)
+        if self.args.only:
+            scenarios = {name: fn for name, fn in scenarios.items() if name in self.args.only}
+        return scenarios
+
+    async def run_scenario(self, scenario):
+        latencies = []
+        errors = 0
+        remaining = self.args.requests
+
+        async def worker():
+            nonlocal remaining, errors
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                try:
+                    result = await scenario()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if isinstance(result, tuple):
+                    response, elapsed = result
+                else:
+                    response, elapsed = result, time.perf_counter() - start
+                if response.status_code >= 400:
+                    errors += 1
+                else:
+                    latencies.append(elapsed)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        return summarize(latencies, errors, time.perf_counter() - start)
+
+    async def run(self):
+        await self.prepare()
+        results = {}
+        for name, scenario in self.scenarios().items():
+            # Aquecimento (conexões, caches de consulta) fora da medição
+            for _ in range(min(self.args.warmup, self.args.requests)):
+                try:
+                    await scenario()
+                except httpx.HTTPError:
+                    pass
+            results[name] = await self.run_scenario(scenario)
+            summary = results[name]
+            print(
+                f"{name:<26} p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms "
+                f"p99={summary['p99_ms']}ms rps={summary['throughput_rps']} erros={summary['errors']}",
+                file=sys.stderr
+            )
+        return results
+
+
+def compare(results: dict, baseline_path: str, threshold: float) -> list:
+    """Lista os cenários cujo p95 piorou mais que `threshold` (fração) em relação à base"""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    for name, summary in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("p95_ms") or not summary.get("p95_ms"):
+            continue
+        ratio = summary["p95_ms"] / previous["p95_ms"]
+        summary["p95_vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark dos caminhos críticos do PDV")
+    parser.add_argument("--base-url", help="URL do servidor (sem ela, a aplicação roda no próprio processo)")
+    parser.add_argument("--concurrency", type=int, default=10, help="Clientes concorrentes por cenário")
+    parser.add_argument("--requests", type=int, default=200, help="Requisições medidas por cenário")
+    parser.add_argument("--warmup", type=int, default=10, help="Requisições de aquecimento por cenário")
+    parser.add_argument("--cashiers", type=int, default=10, help="Caixas criados pelo populate (caixa001..)")
+    parser.add_argument("--password", default="bench123", help="Senha dos caixas")
+    parser.add_argument("--report-days", type=int, default=30, help="Período do relatório financeiro")
+    parser.add_argument("--only", nargs="*", help="Executar apenas os cenários informados")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador aleatório")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Piora tolerada do p95 (fração)")
+    return parser.parse_args()
+
+
+async def main_async(args):
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+    async with client:
+        return await Benchmark(client, args).run()
+
+
+def main():
+    args = parse_args()
+    results = asyncio.run(main_async(args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url or "in-process",
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+    regressions = compare(results, args.compare, args.threshold) if args.compare else []
+    report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if regressions:
+        print(f"❌ Regressões de p95 acima de {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
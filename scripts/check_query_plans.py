@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Auditoria de índices: roda EXPLAIN nas consultas quentes da API e falha se alguma
+delas cair em varredura sequencial nas tabelas grandes.
+
+Deve ser executado contra um banco populado (ex.: scripts/generate_synthetic_data.py),
+já que em tabelas quase vazias o planejador prefere, corretamente, a varredura completa.
+Os parâmetros (datas, IDs) são tirados dos próprios dados para refletir o uso real.
+
+    python scripts/check_query_plans.py
+    python scripts/check_query_plans.py --verbose
+    python scripts/check_query_plans.py --disable-seqscan   # banco pequeno: só acusa falta de índice
+
+PostgreSQL: EXPLAIN (FORMAT JSON), procurando nós "Seq Scan".
+SQLite: EXPLAIN QUERY PLAN, procurando "SCAN <tabela>" sem índice.
+Sai com código 1 se alguma consulta fizer varredura sequencial em tabela verificada.
+"""
+
+import sys
+import os
+import argparse
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, List, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import joinedload
+
+from app.core.database import engine
+from app.models.category import Category
+from app.models.change_log import ChangeLog
+from app.models.customer import Customer
+from app.models.employee import Employee
+from app.models.inventory import Inventory
+from app.models.product import Product
+from app.models.report_job import ReportJob, QUEUED
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.models.user import User
+from app.schemas.sale import SaleStatus
+
+
+@dataclass
+class HotQuery:
+    name: str
+    build: Callable[["Samples"], object]
+    # Tabelas em que varredura sequencial é considerada regressão
+    tables: Tuple[str, ...]
+
+
+@dataclass
+class Samples:
+    """Valores reais do banco usados como parâmetros das consultas"""
+    last_sale_at: datetime
+    sale_ids: List[int]
+    product_id: int
+    last_updated: datetime
+
+
+def load_samples(conn: Connection) -> Samples:
+    last_sale_at = conn.execute(select(func.max(Sale.created_at))).scalar() or datetime.now()
+    sale_ids = list(conn.execute(select(Sale.id).order_by(Sale.id.desc()).limit(100)).scalars()) or [0]
+    product_id = conn.execute(select(func.max(SaleItem.product_id))).scalar() or 0
+    last_updated = conn.execute(select(func.max(Product.last_updated))).scalar() or datetime.now()
+    return Samples(last_sale_at, sale_ids, product_id, last_updated)
+
+
+def _day(samples: Samples) -> Tuple[datetime, datetime]:
+    start = samples.last_sale_at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=1)
+
+
+def _sync_query(model):
+    # fetch_updated (clientes antigos, por last_updated): uma hora antes da última alteração
+    return lambda samples: select(model).where(model.last_updated > samples.last_updated - timedelta(hours=1))
+
+
+HOT_QUERIES = [
+    HotQuery(
+        "reports.financial_daily",
+        lambda s: select(Sale).options(joinedload(Sale.items)).where(
+            Sale.created_at >= _day(s)[0], Sale.created_at < _day(s)[1], Sale.status == SaleStatus.CONCLUIDA
+        ),
+        ("sales", "sale_items"),
+    ),
+    HotQuery(
+        "sales.list",
+        lambda s: select(Sale.id, Sale.sale_number, Sale.created_at)
+        .where(Sale.is_active == True)  # noqa: E712
+        .order_by(Sale.created_at.desc())
+        .limit(100),
+        ("sales",),
+    ),
+    HotQuery(
+        "sales.items_batch",
+        lambda s: select(SaleItem).where(SaleItem.sale_id.in_(s.sale_ids)).order_by(SaleItem.sale_id, SaleItem.id),
+        ("sale_items",),
+    ),
+    HotQuery(
+        "sale_items.by_product",
+        lambda s: select(SaleItem.id).where(SaleItem.product_id == s.product_id),
+        ("sale_items",),
+    ),
+    HotQuery(
+        "products.low_stock",
+        lambda s: select(Product.id)
+        .where(Product.estoque <= Product.estoque_minimo, Product.is_active == True)  # noqa: E712
+        .order_by((Product.estoque_minimo - Product.estoque).desc(), Product.id)
+        .limit(100),
+        ("products",),
+    ),
+    HotQuery(
+        "inventory.by_product",
+        lambda s: select(Inventory).where(Inventory.product_id == s.product_id).order_by(Inventory.id),
+        ("inventory_movements",),
+    ),
+    HotQuery(
+        "sync.change_log",
+        lambda s: select(ChangeLog.seq, ChangeLog.entity_id)
+        .where(ChangeLog.entity == "products", ChangeLog.seq > 0)
+        .order_by(ChangeLog.seq)
+        .limit(501),
+        ("change_log",),
+    ),
+    HotQuery(
+        "report_jobs.claim",
+        lambda s: select(ReportJob.id).where(ReportJob.status == QUEUED).order_by(ReportJob.id).limit(1),
+        ("report_jobs",),
+    ),
+] + [
+    HotQuery(f"sync.{model.__tablename__}.last_updated", _sync_query(model), (model.__tablename__,))
+    for model in (Product, Category, Customer, Sale, User, Employee)
+]
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _walk_postgres(node, found):
+    found.append(node)
+    for child in node.get("Plans", []):
+        _walk_postgres(child, found)
+    return found
+
+
+def explain_postgres(conn: Connection, sql: str, tables) -> Tuple[List[str], List[str]]:
+    """Retorna (tabelas com Seq Scan, resumo do plano)"""
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+    nodes = _walk_postgres(plan[0]["Plan"], [])
+    seq_scans = [n["Relation Name"] for n in nodes if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in tables]
+    summary = [
+        f"{n['Node Type']}" + (f" {n['Index Name']}" if "Index Name" in n else "") + (f" on {n['Relation Name']}" if "Relation Name" in n else "")
+        for n in nodes
+    ]
+    return seq_scans, summary
+
+
+def explain_sqlite(conn: Connection, sql: str, tables) -> Tuple[List[str], List[str]]:
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    details = [row[3] for row in rows]
+    seq_scans = []
+    for detail in details:
+        words = detail.split()
+        # "SCAN sales" é varredura completa; "SCAN sales USING INDEX ..." e "SEARCH ..." usam índice
+        if words[:1] == ["SCAN"] and len(words) > 1 and words[1] in tables and "USING" not in words:
+            seq_scans.append(words[1])
+    return seq_scans, details
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica se as consultas quentes usam índices")
+    parser.add_argument("--only", nargs="*", help="Verificar apenas as consultas informadas")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar o plano de todas as consultas")
+    parser.add_argument(
+        "--disable-seqscan", action="store_true",
+        help="PostgreSQL: SET enable_seqscan = off (em bancos pequenos, acusa apenas índices inexistentes)"
+    )
+    parser.add_argument("--skip-analyze", action="store_true", help="PostgreSQL: não executar ANALYZE antes")
+    args = parser.parse_args()
+
+    dialect = engine.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        print(f"Banco não suportado: {dialect}")
+        sys.exit(2)
+    explain = explain_postgres if dialect == "postgresql" else explain_sqlite
+
+    queries = [q for q in HOT_QUERIES if not args.only or q.name in args.only]
+    failures = []
+    with engine.connect() as conn:
+        if dialect == "postgresql":
+            if not args.skip_analyze:
+                # Estatísticas atualizadas após cargas em lote, senão o planejador decide com dados velhos
+                conn.exec_driver_sql("ANALYZE")
+            if args.disable_seqscan:
+                conn.exec_driver_sql("SET enable_seqscan = off")
+        samples = load_samples(conn)
+
+        for query in queries:
+            seq_scans, summary = explain(conn, compile_sql(query.build(samples)), query.tables)
+            status = "FALHA" if seq_scans else "OK"
+            detail = f" (varredura sequencial em {', '.join(sorted(set(seq_scans)))})" if seq_scans else ""
+            print(f"{status:5}  {query.name}{detail}")
+            if seq_scans or args.verbose:
+                for line in summary:
+                    print(f"         {line}")
+            if seq_scans:
+                failures.append(query.name)
+
+    print(f"\n{len(queries) - len(failures)}/{len(queries)} consultas usando índices")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Gerador de dados sintéticos em volume para testes de carga e de relatórios.
+
+Gera caixas, clientes, produtos, vendas e itens de venda de forma determinística
+(mesma semente + mesma data final = mesmos dados num banco vazio) e carrega em lote:
+COPY no PostgreSQL e INSERT com executemany nos demais bancos. Os IDs são atribuídos
+pelo gerador, o que permite ligar itens às vendas sem ida e volta ao banco; no fim as
+sequências do PostgreSQL são ajustadas.
+
+Exemplos:
+    # ~2M vendas / ~6M itens em um ano
+    python scripts/generate_synthetic_data.py --sales 2000000 --products 5000 --cashiers 40
+
+    # Distribuições configuráveis
+    python scripts/generate_synthetic_data.py --sales 100000 --days 30 \\
+        --payment-weights DINHEIRO=60,MPESA=30,CARTAO_POS=10 --weight-fraction 0.25 --items-mean 4
+
+Os caixas usam os mesmos nomes do benchmark (caixa001, ...) e a senha --password, então
+scripts/benchmark.py pode ser executado sobre o banco gerado.
+"""
+
+import sys
+import os
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate
+
+# Adicionar o diretório raiz ao path para importar os módulos
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, select, text
+from app.core.database import engine
+from app.models.base import Base
+from app.models.category import Category
+from app.models.change_log import ChangeLog, INSERT, reserve_seqs
+from app.models.customer import Customer
+from app.models.product import Product
+from app.models.sale import Sale
+from app.models.sale_item import SaleItem
+from app.models.user import User, UserRole, get_password_hash
+from app.schemas.sale import SaleStatus, PaymentMethod
+
+PRODUCT_PREFIX = "SYN-"
+SALE_PREFIX = "SYN"
+
+DEFAULT_PAYMENT_WEIGHTS = "DINHEIRO=45,MPESA=25,EMOLA=10,CARTAO_POS=12,TRANSFERENCIA=4,MILLENNIUM=2,BCI=2"
+
+# Movimento ao longo do dia (loja aberta das 7h às 21h, picos no almoço e no fim da tarde)
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 0, 0, 3, 5, 6, 7, 8, 10, 9, 6, 5, 6, 8, 10, 9, 6, 3, 0, 0]
+# Segunda a domingo
+WEEKDAY_WEIGHTS = [0.9, 0.9, 0.95, 1.0, 1.2, 1.4, 0.8]
+
+CATEGORY_NAMES = ["Bebidas", "Alimentos", "Limpeza", "Higiene", "Mercearia", "Hortifruti", "Talho", "Padaria"]
+
+CENT = Decimal("0.01")
+GRAM = Decimal("0.001")
+
+
+def parse_weights(value: str) -> dict:
+    """Converte "DINHEIRO=45,MPESA=25" em {PaymentMethod: peso}"""
+    weights = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        try:
+            weights[PaymentMethod[name.strip().upper()]] = float(weight)
+        except (KeyError, ValueError):
+            raise argparse.ArgumentTypeError(f"Peso de pagamento inválido: {part!r}")
+    if not weights or sum(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError("Informe ao menos um método de pagamento com peso positivo")
+    return weights
+
+
+class BulkLoader:
+    """Carrega linhas (tuplas na ordem de `columns`) em lote.
+
+    COPY FROM STDIN no PostgreSQL (psycopg2); executemany do SQLAlchemy nos demais."""
+
+    def __init__(self, engine, method: str = "auto"):
+        self.engine = engine
+        is_postgres = engine.dialect.name == "postgresql"
+        if method == "copy" and not is_postgres:
+            raise SystemExit("COPY só está disponível no PostgreSQL")
+        self.use_copy = is_postgres and method in ("auto", "copy")
+
+    def load(self, conn, model, columns, rows) -> None:
+        if not rows:
+            return
+        table = model.__table__
+        if self.use_copy:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([self._copy_value(value) for value in row])
+            buffer.seek(0)
+            cursor = conn.connection.cursor()
+            try:
+                cursor.copy_expert(
+                    f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                    buffer
+                )
+            finally:
+                cursor.close()
+        else:
+            keys = [table.c[column].key for column in columns]
+            conn.execute(table.insert(), [dict(zip(keys, row)) for row in rows])
+
+    @staticmethod
+    def _copy_value(value):
+        # No CSV do COPY, campo vazio sem aspas é NULL
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            return "t" if value else "f"
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+
+def reset_sequences(conn, models) -> None:
+    """Após inserir IDs explícitos, avança as sequências do PostgreSQL"""
+    if conn.dialect.name != "postgresql":
+        return
+    for model in models:
+        name = model.__table__.name
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {name}), 1))"
+        ))
+
+
+def next_id(conn, model) -> int:
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def zipf_cum_weights(count: int, exponent: float) -> list:
+    """Pesos acumulados de popularidade: poucos produtos concentram a maior parte das vendas"""
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+def distribute(total: int, weights: list) -> list:
+    """Divide `total` proporcionalmente aos pesos, sem perder unidades no arredondamento"""
+    weight_sum = sum(weights)
+    exact = [total * w / weight_sum for w in weights]
+    counts = [int(value) for value in exact]
+    remainders = sorted(range(len(weights)), key=lambda i: exact[i] - counts[i], reverse=True)
+    for i in remainders[:total - sum(counts)]:
+        counts[i] += 1
+    return counts
+
+
+class SyntheticDataGenerator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.loader = BulkLoader(engine, args.method)
+        self.end_date = args.end_date
+        self.hours = list(range(24))
+        self.hour_cum_weights = list(accumulate(HOUR_WEIGHTS))
+        self.payment_methods = list(args.payment_weights)
+        self.payment_cum_weights = list(accumulate(args.payment_weights.values()))
+
+    def timestamp(self, day: date) -> datetime:
+        hour = self.rng.choices(self.hours, cum_weights=self.hour_cum_weights)[0]
+        return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc) + timedelta(
+            seconds=self.rng.randrange(3600)
+        )
+
+    def log_changes(self, conn, entity: str, ids) -> None:
+        if self.args.change_log:
+            ids = list(ids)
+            if not ids:
+                return
+            first = reserve_seqs(conn, len(ids))
+            self.loader.load(conn, ChangeLog, ("seq", "entity", "entity_id", "operation"),
+                             [(first + offset, entity, entity_id, INSERT) for offset, entity_id in enumerate(ids)])
+
+    def ensure_categories(self, conn) -> list:
+        existing = set(conn.execute(select(Category.name)).scalars())
+        missing = [name for name in CATEGORY_NAMES if name not in existing]
+        if missing:
+            start = next_id(conn, Category)
+            now = datetime.now(timezone.utc)
+            ids = range(start, start + len(missing))
+            self.loader.load(conn, Category, ("id", "name", "created_at", "updated_at", "last_updated", "is_active", "synced"),
+                             [(i, name, now, now, now, True, False) for i, name in zip(ids, missing)])
+            self.log_changes(conn, "categories", ids)
+        return list(conn.execute(select(Category.id).where(Category.is_active == True)).scalars())
+
+    def ensure_cashiers(self, conn) -> list:
+        usernames = [f"caixa{i:03d}" for i in range(1, self.args.cashiers + 1)]
+        existing = set(conn.execute(select(User.username).where(User.username.in_(usernames))).scalars())
+        missing = [username for username in usernames if username not in existing]
+        if missing:
+            # Um único hash bcrypt para todos os caixas
+            hashed_password = get_password_hash(self.args.password)
+            start = next_id(conn, User)
+            now = datetime.now(timezone.utc)
+            ids = range(start, start + len(missing))
+            self.loader.load(
+                conn, User,
+                ("id", "username", "full_name", "hashed_password", "role", "is_superuser",
+                 "created_at", "updated_at", "last_updated", "is_active", "synced"),
+                [(i, username, f"Caixa {username[5:]}", hashed_password, UserRole.CASHIER.name, False,
+                  now, now, now, True, False) for i, username in zip(ids, missing)]
+            )
+            self.log_changes(conn, "users", ids)
+        return list(conn.execute(select(User.id).where(User.username.in_(usernames))).scalars())
+
+    def ensure_customers(self, conn) -> list:
+        existing = conn.execute(select(func.count()).where(Customer.name.like("Cliente Sintético %"))).scalar()
+        if existing < self.args.customers:
+            start = next_id(conn, Customer)
+            now = datetime.now(timezone.utc)
+            rows = []
+            for n in range(existing, self.args.customers):
+                rows.append((start + len(rows), f"Cliente Sintético {n:06d}", f"84{self.rng.randrange(10**7):07d}",
+                             "Maputo", self.rng.random() < 0.05, now, now, now, True, False))
+            self.loader.load(conn, Customer,
+                             ("id", "name", "phone", "city", "is_vip", "created_at", "updated_at",
+                              "last_updated", "is_active", "synced"), rows)
+            self.log_changes(conn, "customers", [row[0] for row in rows])
+        return list(conn.execute(select(Customer.id).where(Customer.name.like("Cliente Sintético %"))).scalars())
+
+    def ensure_products(self, conn, category_ids: list) -> list:
+        existing = conn.execute(select(func.count()).where(Product.codigo.like(f"{PRODUCT_PREFIX}%"))).scalar()
+        if existing < self.args.products:
+            start = next_id(conn, Product)
+            now = datetime.now(timezone.utc)
+            rows = []
+            for n in range(existing, self.args.products):
+                cost = Decimal(self.rng.randint(50, 50000)) / 100
+                price = (cost * Decimal(self.rng.uniform(1.1, 1.8))).quantize(CENT)
+                by_weight = self.rng.random() < self.args.weight_fraction
+                rows.append((
+                    start + len(rows), f"{PRODUCT_PREFIX}{n:07d}", self.rng.choice(category_ids),
+                    f"Produto Sintético {n:07d}", cost, price, 10_000_000, self.rng.randint(0, 50),
+                    by_weight, now, now, now, True, False
+                ))
+            self.loader.load(conn, Product,
+                             ("id", "sku", "category_id", "name", "cost_price", "sale_price", "current_stock",
+                              "min_stock", "venda_por_peso", "created_at", "updated_at", "last_updated",
+                              "is_active", "synced"), rows)
+            self.log_changes(conn, "products", [row[0] for row in rows])
+        return conn.execute(
+            select(Product.id, Product.nome.label("nome"), Product.preco_compra.label("preco_compra"),
+                   Product.preco_venda.label("preco_venda"), Product.venda_por_peso)
+            .where(Product.codigo.like(f"{PRODUCT_PREFIX}%"))
+            .order_by(Product.id)
+        ).all()
+
+    def generate_sales(self, products: list, cashier_ids: list, customer_ids: list) -> None:
+        args = self.args
+        rng = self.rng
+        # A ordem dos produtos é embaralhada para a popularidade não seguir o código
+        products = list(products)
+        rng.shuffle(products)
+        product_cum_weights = zipf_cum_weights(len(products), args.zipf)
+
+        with engine.connect() as conn:
+            existing = conn.execute(select(func.count()).where(Sale.sale_number.like(f"{SALE_PREFIX}%"))).scalar()
+            sale_id = next_id(conn, Sale)
+            item_id = next_id(conn, SaleItem)
+        total = args.sales - existing
+        if total <= 0:
+            print(f"✅ Já existem {existing} vendas sintéticas")
+            return
+
+        days = [self.end_date - timedelta(days=offset) for offset in range(args.days - 1, -1, -1)]
+        per_day = distribute(total, [WEEKDAY_WEIGHTS[day.weekday()] for day in days])
+
+        sale_columns = ("id", "sale_number", "status", "subtotal", "tax_amount", "discount_amount",
+                        "total_amount", "payment_method", "payment_status", "customer_id", "user_id",
+                        "is_delivery", "created_at", "updated_at", "last_updated", "is_active", "synced")
+        item_columns = ("id", "sale_id", "product_id", "quantity", "unit_price", "discount_percent",
+                        "total_price", "is_weight_sale", "weight_in_kg", "product_name_at_sale",
+                        "cost_price_at_sale", "created_at", "updated_at", "last_updated", "is_active", "synced")
+
+        sale_rows, item_rows = [], []
+        number = existing
+        loaded_sales = loaded_items = 0
+        started = time.perf_counter()
+
+        def flush():
+            nonlocal sale_rows, item_rows, loaded_sales, loaded_items
+            with engine.begin() as conn:
+                self.loader.load(conn, Sale, sale_columns, sale_rows)
+                self.loader.load(conn, SaleItem, item_columns, item_rows)
+                self.log_changes(conn, "sales", [row[0] for row in sale_rows])
+            loaded_sales += len(sale_rows)
+            loaded_items += len(item_rows)
+            elapsed = time.perf_counter() - started
+            print(f"   {loaded_sales}/{total} vendas, {loaded_items} itens "
+                  f"({(loaded_sales + loaded_items) / elapsed:,.0f} linhas/s)", end="\r")
+            sale_rows, item_rows = [], []
+
+        for day, count in zip(days, per_day):
+            for created_at in sorted(self.timestamp(day) for _ in range(count)):
+                item_count = min(args.items_max, 1 + int(rng.expovariate(1 / max(args.items_mean - 1, 0.01))))
+                chosen = {product.id: product for product in
+                          rng.choices(products, cum_weights=product_cum_weights, k=item_count)}
+                subtotal = Decimal("0")
+                for product in chosen.values():
+                    if product.venda_por_peso:
+                        quantity = (Decimal(rng.randint(100, 3000)) / 1000).quantize(GRAM)
+                    else:
+                        quantity = Decimal(rng.choices((1, 2, 3, 4, 6, 12), cum_weights=(60, 80, 88, 93, 97, 100))[0])
+                    line_total = (product.preco_venda * quantity).quantize(CENT)
+                    subtotal += line_total
+                    item_rows.append((
+                        item_id, sale_id, product.id, quantity, product.preco_venda, 0, line_total,
+                        product.venda_por_peso, quantity if product.venda_por_peso else None,
+                        product.nome, product.preco_compra, created_at, created_at, created_at, True, False
+                    ))
+                    item_id += 1
+
+                discount = Decimal("0")
+                if rng.random() < args.discount_fraction:
+                    discount = (subtotal * Decimal(rng.choice((5, 10, 15))) / 100).quantize(CENT)
+                status = SaleStatus.CANCELADA if rng.random() < args.cancel_fraction else SaleStatus.CONCLUIDA
+                customer_id = rng.choice(customer_ids) if customer_ids and rng.random() < args.customer_fraction else None
+                sale_rows.append((
+                    sale_id, f"{SALE_PREFIX}{number:010d}", status.name, subtotal, 0, discount,
+                    subtotal - discount,
+                    rng.choices(self.payment_methods, cum_weights=self.payment_cum_weights)[0].name,
+                    "paid", customer_id, rng.choice(cashier_ids), False,
+                    created_at, created_at, created_at, True, False
+                ))
+                sale_id += 1
+                number += 1
+
+                if len(item_rows) >= args.batch_size:
+                    flush()
+        flush()
+
+        with engine.begin() as conn:
+            reset_sequences(conn, (Sale, SaleItem))
+        elapsed = time.perf_counter() - started
+        print(f"\n✅ {loaded_sales} vendas e {loaded_items} itens em {elapsed:.1f}s")
+
+    def run(self) -> None:
+        args = self.args
+        method = "COPY" if self.loader.use_copy else "executemany"
+        print(f"🚀 Gerando dados sintéticos ({method}, seed={args.seed}, até {self.end_date})")
+        Base.metadata.create_all(bind=engine)
+
+        with engine.begin() as conn:
+            category_ids = self.ensure_categories(conn)
+            cashier_ids = self.ensure_cashiers(conn)
+            customer_ids = self.ensure_customers(conn)
+            products = self.ensure_products(conn, category_ids)
+            reset_sequences(conn, (Category, User, Customer, Product))
+        print(f"   {len(products)} produtos, {len(cashier_ids)} caixas, {len(customer_ids)} clientes")
+
+        self.generate_sales(products, cashier_ids, customer_ids)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gerador de dados sintéticos do Sistema PDV")
+    parser.add_argument("--sales", type=int, default=100000, help="Total de vendas sintéticas")
+    parser.add_argument("--products", type=int, default=2000, help="Número de produtos")
+    parser.add_argument("--cashiers", type=int, default=20, help="Número de caixas (caixa001..)")
+    parser.add_argument("--customers", type=int, default=5000, help="Número de clientes")
+    parser.add_argument("--days", type=int, default=365, help="Período coberto pelas vendas (dias)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date.today(),
+                        help="Último dia com vendas (AAAA-MM-DD); fixe-o para reproduzir o mesmo conjunto")
+    parser.add_argument("--items-mean", type=float, default=3.0, help="Média de itens por venda")
+    parser.add_argument("--items-max", type=int, default=30, help="Máximo de itens por venda")
+    parser.add_argument("--weight-fraction", type=float, default=0.15, help="Fração de produtos vendidos por peso")
+    parser.add_argument("--payment-weights", type=parse_weights, default=parse_weights(DEFAULT_PAYMENT_WEIGHTS),
+                        help=f"Pesos dos métodos de pagamento (padrão: {DEFAULT_PAYMENT_WEIGHTS})")
+    parser.add_argument("--cancel-fraction", type=float, default=0.02, help="Fração de vendas canceladas")
+    parser.add_argument("--discount-fraction", type=float, default=0.05, help="Fração de vendas com desconto")
+    parser.add_argument("--customer-fraction", type=float, default=0.2, help="Fração de vendas com cliente")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Expoente de popularidade dos produtos")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador aleatório")
+    parser.add_argument("--password", default="bench123", help="Senha dos caixas criados")
+    parser.add_argument("--batch-size", type=int, default=50000, help="Itens de venda por transação")
+    parser.add_argument("--method", choices=("auto", "copy", "insert"), default="auto",
+                        help="auto: COPY no PostgreSQL, executemany nos demais")
+    parser.add_argument("--no-change-log", dest="change_log", action="store_false",
+                        help="Não registrar as linhas geradas no change_log (sincronização por sequência)")
+    return parser.parse_args()
+
+
+def main():
+    SyntheticDataGenerator(parse_args()).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Perfil de inicialização da aplicação (equivalente a `python -X importtime -c "import main"`).
+
+Executa a importação de `main` em processos novos, mede o tempo total (mediana de
+--repeat execuções) e lista os módulos mais caros, por tempo acumulado e próprio,
+além do total por pacote de primeiro nível.
+
+    python scripts/import_profile.py
+    python scripts/import_profile.py --module main --top 30 --repeat 5
+    python scripts/import_profile.py --json > startup.json
+    python scripts/import_profile.py --compare startup.json
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Mede o tempo total dentro do processo filho, sem contar a inicialização do interpretador
+PROBE = (
+    "import time; _start = time.perf_counter(); import {module}; "
+    "print('__total_us__', int((time.perf_counter() - _start) * 1e6))"
+)
+
+
+def run_once(module: str) -> tuple:
+    """Retorna (tempo total em µs, [(módulo, self_us, cumulativo_us, profundidade)])"""
+    env = dict(os.environ)
+    # A aplicação não conecta ao banco na importação; qualquer URL válida serve
+    env.setdefault("DATABASE_URL", "sqlite://")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"Falha ao importar {module}")
+
+    total = next(
+        int(line.split()[1]) for line in result.stdout.splitlines() if line.startswith("__total_us__")
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return total, entries
+
+
+def profile(module: str, repeat: int) -> dict:
+    runs = [run_once(module) for _ in range(repeat)]
+    totals = [total for total, _ in runs]
+    # Perfil detalhado da execução mediana
+    median_run = sorted(runs, key=lambda run: run[0])[len(runs) // 2][1]
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in median_run:
+        packages[name.split(".")[0]] += self_us
+
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "runs_ms": [round(total / 1000, 1) for total in totals],
+        "median_ms": round(statistics.median(totals) / 1000, 1),
+        "modules": len(median_run),
+        "cumulative": sorted(
+            ({"module": name, "ms": round(cumulative / 1000, 2)} for name, _, cumulative, _ in median_run),
+            key=lambda item: item["ms"], reverse=True
+        ),
+        "self": sorted(
+            ({"module": name, "ms": round(self_us / 1000, 2)} for name, self_us, _, _ in median_run),
+            key=lambda item: item["ms"], reverse=True
+        ),
+        "packages": sorted(
+            ({"package": name, "ms": round(us / 1000, 2)} for name, us in packages.items()),
+            key=lambda item: item["ms"], reverse=True
+        ),
+    }
+
+
+def print_report(report: dict, top: int, baseline: dict = None) -> None:
+    print(f"Importação de '{report['module']}' (Python {report['python']}): "
+          f"mediana {report['median_ms']} ms em {len(report['runs_ms'])} execuções {report['runs_ms']}, "
+          f"{report['modules']} módulos")
+    if baseline:
+        delta = report["median_ms"] - baseline["median_ms"]
+        print(f"Base: {baseline['median_ms']} ms -> diferença {delta:+.1f} ms "
+              f"({delta / baseline['median_ms']:+.1%})")
+
+    print(f"\nTop {top} por tempo acumulado (inclui dependências):")
+    for item in report["cumulative"][:top]:
+        print(f"  {item['ms']:9.2f} ms  {item['module']}")
+
+    print(f"\nTop {top} por tempo próprio:")
+    for item in report["self"][:top]:
+        print(f"  {item['ms']:9.2f} ms  {item['module']}")
+
+    print("\nPor pacote (tempo próprio somado):")
+    for item in report["packages"][:top]:
+        print(f"  {item['ms']:9.2f} ms  {item['package']}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Perfil de importação/inicialização da aplicação")
+    parser.add_argument("--module", default="main", help="Módulo importado (padrão: main)")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções; o relatório usa a mediana")
+    parser.add_argument("--top", type=int, default=20, help="Quantidade de módulos listados")
+    parser.add_argument("--json", action="store_true", help="Imprimir o relatório em JSON")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparação")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    report = profile(args.module, max(args.repeat, 1))
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, args.top, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,19 @@
 """
 Script para popular o banco de dados com dados de teste
 Executar: python scripts/populate_database.py
+
+Para benchmarks, popular em escala (N produtos, M vendas, K caixas):
+    python scripts/populate_database.py --scale --products 1000 --sales 10000 --cashiers 10 --seed 42
+
+Para volumes grandes (milhões de itens de venda), use scripts/generate_synthetic_data.py,
+que carrega em lote com COPY/executemany.
 """
 
 import sys
 import os
-from datetime import datetime, date
+import argparse
+import random
+from datetime import datetime, date, timedelta, timezone
 from decimal import Decimal
 
 # Adicionar o diretório raiz ao path para importar os módulos
@@ -22,14 +30,9 @@ from app.models.customer import Customer
 from app.models.sale import Sale
 from app.models.sale_item import SaleItem
 from app.models.inventory import Inventory
-from app.models.user import User
-from passlib.context import CryptContext
-
-# Configurar contexto de senha
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-	return pwd_context.hash(password)
+from app.models.user import User, UserRole
+from app.schemas.sale import SaleStatus, PaymentMethod
+from app.core.passwords import get_password_hash
 
 def create_tables():
     """Criar todas as tabelas se não existirem"""
@@ -465,16 +468,144 @@ def populate_inventory_movements(db: Session, products):
     db.commit()
     print(f"✅ {len(products)} movimentações de inventário criadas")
 
+def populate_scale(
+    db: Session,
+    products: int = 1000,
+    sales: int = 10000,
+    cashiers: int = 10,
+    seed: int = 42,
+    password: str = "bench123",
+    days: int = 90,
+    batch_size: int = 1000
+):
+    """Popular o banco em escala configurável para benchmarks.
+
+    Os registros usam prefixos próprios (caixaNNN, BENCH-) e só os que faltam são
+    criados, então executar de novo com a mesma escala não duplica dados."""
+    rng = random.Random(seed)
+    print(f"Populando em escala: {products} produtos, {sales} vendas, {cashiers} caixas (seed={seed})")
+
+    # Categorias
+    categories = db.query(Category).filter(Category.is_active == True).all()
+    if not categories:
+        categories = [Category(name=name) for name in ("Bebidas", "Alimentos", "Limpeza", "Eletrônicos")]
+        db.add_all(categories)
+        db.commit()
+
+    # Caixas: o hash bcrypt é calculado uma vez e reutilizado
+    hashed_password = get_password_hash(password)
+    usernames = [f"caixa{i:03d}" for i in range(1, cashiers + 1)]
+    existing = {u.username for u in db.query(User.username).filter(User.username.in_(usernames))}
+    db.add_all([
+        User(
+            username=username,
+            full_name=f"Caixa {username[5:]}",
+            hashed_password=hashed_password,
+            role=UserRole.CASHIER,
+            is_active=True
+        )
+        for username in usernames if username not in existing
+    ])
+    db.commit()
+    cashier_ids = [u.id for u in db.query(User.id).filter(User.username.in_(usernames))]
+
+    # Produtos com estoque alto para não esgotar durante o benchmark
+    existing_products = db.query(Product).filter(Product.codigo.like("BENCH-%")).count()
+    for start in range(existing_products, products, batch_size):
+        batch = []
+        for i in range(start, min(start + batch_size, products)):
+            cost = Decimal(rng.randint(50, 50000)) / 100
+            batch.append(Product(
+                codigo=f"BENCH-{i:06d}",
+                nome=f"Produto Benchmark {i:06d}",
+                descricao=f"Produto gerado para benchmark ({i})",
+                preco_compra=cost,
+                preco_venda=(cost * Decimal(rng.uniform(1.1, 1.8))).quantize(Decimal("0.01")),
+                estoque=1_000_000,
+                estoque_minimo=rng.randint(0, 20),
+                category_id=rng.choice(categories).id,
+                venda_por_peso=rng.random() < 0.1
+            ))
+        db.add_all(batch)
+        db.commit()
+    product_rows = db.query(Product.id, Product.preco_venda, Product.venda_por_peso)\
+        .filter(Product.codigo.like("BENCH-%")).all()
+
+    # Vendas distribuídas pelos últimos `days` dias
+    payment_methods = list(PaymentMethod)
+    now = datetime.now(timezone.utc)
+    existing_sales = db.query(Sale).filter(Sale.sale_number.like("BENCH%")).count()
+    for start in range(existing_sales, sales, batch_size):
+        for j in range(start, min(start + batch_size, sales)):
+            created_at = now - timedelta(seconds=rng.randint(0, days * 86400))
+            sale = Sale(
+                sale_number=f"BENCH{j:08d}",
+                status=SaleStatus.CONCLUIDA,
+                payment_method=rng.choice(payment_methods),
+                user_id=rng.choice(cashier_ids) if cashier_ids else None,
+                created_at=created_at
+            )
+            total = Decimal("0")
+            for product in rng.sample(product_rows, k=min(len(product_rows), rng.randint(1, 5))):
+                if product.venda_por_peso:
+                    quantity = Decimal(rng.randint(100, 3000)) / 1000
+                else:
+                    quantity = Decimal(rng.randint(1, 5))
+                line_total = (product.preco_venda * quantity).quantize(Decimal("0.01"))
+                total += line_total
+                sale.items.append(SaleItem(
+                    product_id=product.id,
+                    quantity=quantity,
+                    unit_price=product.preco_venda,
+                    total_price=line_total,
+                    is_weight_sale=product.venda_por_peso,
+                    weight_in_kg=quantity if product.venda_por_peso else None,
+                    created_at=created_at
+                ))
+            sale.subtotal = total
+            sale.total_amount = total
+            db.add(sale)
+        db.commit()
+
+    print(f"✅ Escala pronta: {len(product_rows)} produtos, {max(existing_sales, sales)} vendas, {len(cashier_ids)} caixas")
+    print(f"   Senha dos caixas: {password}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Popular o banco de dados do Sistema PDV")
+    parser.add_argument("--scale", action="store_true", help="Popular em escala para benchmarks")
+    parser.add_argument("--products", type=int, default=1000, help="Número de produtos (N)")
+    parser.add_argument("--sales", type=int, default=10000, help="Número de vendas (M)")
+    parser.add_argument("--cashiers", type=int, default=10, help="Número de caixas (K)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do gerador aleatório")
+    parser.add_argument("--password", default="bench123", help="Senha dos caixas criados")
+    return parser.parse_args()
+
 def main():
     """Função principal"""
     print("🚀 Iniciando população do banco de dados...")
     
+    args = parse_args()
+
     # Criar tabelas se não existirem
     create_tables()
     
     # Obter sessão do banco
     db = SessionLocal()
     
+    if args.scale:
+        try:
+            populate_scale(
+                db,
+                products=args.products,
+                sales=args.sales,
+                cashiers=args.cashiers,
+                seed=args.seed,
+                password=args.password
+            )
+        finally:
+            db.close()
+        return
+    
     try:
         # Popular dados na ordem correta (respeitando foreign keys)
         users = populate_users(db)
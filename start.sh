@@ -103,13 +103,9 @@ echo "   Porta: $PORT"
 echo "   Ambiente: $ENVIRONMENT"
 echo "   Debug: $DEBUG"
 
-# Iniciar o Gunicorn com as configurações
+# Iniciar o Gunicorn: workers, timeouts e logs vêm de gunicorn_config.py (derivados de
+# CPU/memória, ajustáveis por WEB_CONCURRENCY, GUNICORN_TIMEOUT, ...); aqui só a porta
 exec gunicorn \
+    --config gunicorn_config.py \
     --bind "0.0.0.0:${PORT:-8000}" \
-    --workers 2 \
-    --worker-class uvicorn.workers.UvicornWorker \
-    --timeout 30 \
-    --access-logfile - \
-    --error-logfile - \
-    --log-level info \
     main:app
\ No newline at end of file
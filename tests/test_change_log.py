@@ -0,0 +1,85 @@
+"""Ordem do change_log com transações intercaladas.
+
+Usa TEST_DATABASE_URL (ex.: postgresql://...) se definida; senão um SQLite temporário.
+No PostgreSQL a primeira transação faz flush antes da segunda confirmar, o cenário
+em que um seq atribuído no flush ficaria para trás."""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registra as tabelas)
+from app.api.api_v1.endpoints.sync import fetch_updated
+from app.models.base import Base
+from app.models.change_log import record_changes
+from app.models.product import Product
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    url = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tmp_path / 'change_log.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def _product(codigo: str) -> Product:
+    return Product(codigo=codigo, nome=codigo, preco_compra=Decimal("1"), preco_venda=Decimal("2"), estoque=1, estoque_minimo=0)
+
+
+def test_long_transaction_is_not_skipped(session_factory):
+    with session_factory() as setup:
+        setup.add_all([_product("LONGA"), _product("CURTA")])
+        setup.commit()
+        long_id, short_id = [product.id for product in setup.query(Product).order_by(Product.id)]
+    with session_factory() as reader:
+        _, _, last_seq, _ = fetch_updated(reader, Product, None, 0, 100)
+
+    long_tx = session_factory()
+    short_tx = session_factory()
+    try:
+        # A transação longa registra a alteração primeiro, como o checkout ao baixar o estoque...
+        record_changes(long_tx, Product.__tablename__, [long_id])
+        if long_tx.get_bind().dialect.name == "postgresql":
+            # (no SQLite o flush bloquearia o banco inteiro até o commit)
+            long_tx.get(Product, long_id).nome = "longa alterada"
+            long_tx.flush()
+
+        # ...mas uma transação curta confirma antes dela
+        short_tx.get(Product, short_id).nome = "curta alterada"
+        short_tx.commit()
+
+        with session_factory() as reader:
+            updated, _, last_seq, _ = fetch_updated(reader, Product, None, last_seq, 100)
+        assert [product.id for product in updated] == [short_id]
+
+        long_tx.commit()
+    finally:
+        long_tx.close()
+        short_tx.close()
+
+    # O cliente continua do last_seq que já guardou e recebe a alteração da transação longa
+    with session_factory() as reader:
+        updated, _, _, _ = fetch_updated(reader, Product, None, last_seq, 100)
+    assert [product.id for product in updated] == [long_id]
+
+
+def test_rollback_discards_pending_changes(session_factory):
+    with session_factory() as session:
+        session.add(_product("DESCARTADO"))
+        session.flush()
+        session.rollback()
+        session.add(_product("MANTIDO"))
+        session.commit()
+        updated, _, last_seq, _ = fetch_updated(session, Product, None, 0, 100)
+    assert [product.codigo for product in updated] == ["MANTIDO"]
+    assert last_seq == 1
@@ -0,0 +1,73 @@
+"""Reconciliação dos contadores do dia (app/services/counters.py).
+
+Usa TEST_DATABASE_URL (ex.: postgresql://...) se definida; senão um SQLite temporário."""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registra as tabelas)
+from app.models.base import Base
+from app.models.product import Product
+from app.models.sale import Sale, generate_sale_number
+from app.models.sale_item import SaleItem
+from app.schemas.sale import SaleStatus
+from app.services.counters import reconcile_recent_days, record_sale, today_summary
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    url = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tmp_path / 'counters.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def _sale(db, product: Product, quantity: str, counted: bool = True) -> Sale:
+    """Venda concluída de um item; com `counted` também soma aos contadores, como o checkout"""
+    quantity = Decimal(quantity)
+    total = (product.preco_venda * quantity).quantize(Decimal("0.01"))
+    sale = Sale(sale_number=generate_sale_number(), status=SaleStatus.CONCLUIDA, subtotal=total, total_amount=total)
+    sale.items = [SaleItem(product_id=product.id, quantity=quantity, unit_price=product.preco_venda, total_price=total)]
+    db.add(sale)
+    db.flush()
+    if counted:
+        record_sale(db, int(total * 100), [(product.id, product.nome, quantity, int(total * 100))])
+    return sale
+
+
+def test_reconcile_applies_only_the_difference(session_factory):
+    with session_factory() as db:
+        rice = Product(codigo="A1", nome="Arroz", preco_compra=1, preco_venda=Decimal("15.10"), estoque=50, estoque_minimo=0)
+        cheese = Product(codigo="Q1", nome="Queijo", preco_compra=1, preco_venda=Decimal("150"), estoque=0, estoque_minimo=0, venda_por_peso=True)
+        db.add_all([rice, cheese])
+        db.flush()
+        _sale(db, rice, "2")
+        cancelled = _sale(db, cheese, "0.250")
+        # Venda sincronizada fora do checkout: ainda não está nos contadores
+        _sale(db, rice, "1", counted=False)
+        cancelled.status = SaleStatus.CANCELADA
+        db.commit()
+
+        reconcile_recent_days(db)
+        summary = today_summary(db)
+        assert summary["revenue"] == 45.30
+        assert summary["sales_count"] == 2
+        assert summary["top_product"]["quantity"] == 3.0
+
+        # Venda do checkout depois da reconciliação: somada por cima da correção
+        _sale(db, cheese, "0.500")
+        db.commit()
+        reconcile_recent_days(db)
+        summary = today_summary(db)
+        assert summary["revenue"] == 120.30
+        assert summary["sales_count"] == 3
@@ -0,0 +1,33 @@
+"""Arredondamento dos valores em centavos (app/core/money.py)."""
+
+from decimal import Decimal
+
+from app.core.money import cents_to_float, divide, from_cents, multiply, to_cents
+
+
+def test_to_cents_rounds_half_cent_up():
+    assert to_cents(Decimal("0.005")) == 1
+    assert to_cents(Decimal("0.004")) == 0
+    assert to_cents("12,345") == 1235
+    # 1.005 não é representável em binário; o repr do float ("1.005") é o valor usado
+    assert to_cents(1.005) == 101
+    assert to_cents(0.1) + to_cents(0.2) == to_cents(0.3)
+    assert to_cents(None) == 0
+    assert to_cents(7) == 700
+
+
+def test_multiply_weight_quantity():
+    # 0,333 kg a MT 15,00/kg = 4,995 -> 5,00
+    assert multiply(1500, Decimal("0.333")) == 500
+    # 0,125 kg a MT 0,99/kg = 0,12375 -> 0,12
+    assert multiply(99, Decimal("0.125")) == 12
+    assert multiply(1999, 0.5) == 1000
+    assert multiply(1999, 3.0) == 5997
+    assert multiply(1999, Decimal("3.000")) == 5997
+
+
+def test_divide_and_conversions():
+    assert divide(500, Decimal("0.333")) == 1502
+    assert divide(500, 0) == 0
+    assert from_cents(1235) == Decimal("12.35")
+    assert cents_to_float(1234) == 12.34
@@ -0,0 +1,95 @@
+"""Leitura do arquivo e gravação dos blocos da importação de produtos
+(app/services/product_import.py).
+
+Usa TEST_DATABASE_URL (ex.: postgresql://...) se definida; senão um SQLite temporário."""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registra as tabelas)
+from app.models.base import Base
+from app.models.category import Category
+from app.models.product import Product
+from app.services.product_import import CSV, NDJSON, ImportReport, import_chunk, iter_lines, iter_records
+
+
+def _records(data: bytes, format: str = CSV, chunk_size: int = 7) -> list:
+    """Registros do corpo `data` recebido em pedaços de `chunk_size` bytes"""
+    async def chunks():
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    async def collect():
+        return [record async for record in iter_records(iter_lines(chunks()), format)]
+
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    url = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tmp_path / 'product_import.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def test_csv_quoted_newline_keeps_record_and_line_numbers():
+    data = b'codigo,nome,descricao\r\nA1,Arroz,"Saco de 5kg\r\ntipo 1"\r\nB1,"Feij\xc3\xa3o ""preto""",\r\n'
+    assert _records(data) == [
+        (2, {"codigo": "A1", "nome": "Arroz", "descricao": "Saco de 5kg\ntipo 1"}),
+        (4, {"codigo": "B1", "nome": 'Feijão "preto"'}),
+    ]
+
+
+def test_csv_unclosed_quote_at_end_of_file():
+    data = b'codigo,nome\nA1,Arroz\nB1,"Feijao\nC1,Milho\n'
+    assert _records(data) == [
+        (2, {"codigo": "A1", "nome": "Arroz"}),
+        (3, "Aspas não fechadas no fim do arquivo"),
+    ]
+
+
+def test_bom_is_skipped_even_when_split_across_chunks():
+    data = "﻿codigo,nome\nA1,Açúcar".encode("utf-8")
+    for chunk_size in (1, 2, 4):
+        assert _records(data, chunk_size=chunk_size) == [(2, {"codigo": "A1", "nome": "Açúcar"})]
+    assert _records(b'\xef\xbb\xbf{"codigo": "A1"}\n\n[1]\n{x\n', NDJSON) == [
+        (1, {"codigo": "A1"}),
+        (3, "A linha deve ser um objeto JSON"),
+        (4, "JSON inválido"),
+    ]
+
+
+def test_update_keeps_columns_missing_from_the_row(session_factory):
+    with session_factory() as db:
+        category = Category(name="Grãos")
+        db.add(category)
+        db.flush()
+        db.add(Product(
+            codigo="A1", nome="Arroz", descricao="Saco de 5kg", category_id=category.id,
+            preco_compra=Decimal("10"), preco_venda=Decimal("15"), estoque=5, estoque_minimo=1,
+        ))
+        db.commit()
+        category_id = category.id
+
+        report = ImportReport(max_errors=10)
+        row = {"codigo": "A1", "nome": "Arroz Tipo 1", "preco_compra": "10", "preco_venda": "16", "estoque": "8", "estoque_minimo": "2"}
+        import_chunk(db, [(2, row)], update_existing=True, report=report)
+        assert report.as_dict()["updated"] == 1
+
+        db.expire_all()
+        product = db.query(Product).filter_by(codigo="A1").one()
+        assert (product.nome, product.preco_venda, product.estoque, product.estoque_minimo) == ("Arroz Tipo 1", Decimal("16.00"), 8, 2)
+        # descricao e category_id não vieram na linha: ficam como estavam
+        assert (product.descricao, product.category_id) == ("Saco de 5kg", category_id)
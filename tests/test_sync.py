@@ -0,0 +1,89 @@
+"""Sincronização de um dispositivo novo (since_seq=0) em um banco com dados
+anteriores ao change_log.
+
+A migração a4f9d2c7e315 registra um "insert" para cada registro sem entrada no
+change_log; roda via alembic em subprocesso (env.py lê DATABASE_URL do ambiente)."""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (registra as tabelas)
+from app.api.api_v1.endpoints.sync import fetch_updated
+from app.models.base import Base
+from app.models.category import Category
+from app.models.change_log import ChangeLogCounter, record_changes
+from app.models.product import Product
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _alembic(url: str, *args: str) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "alembic", *args],
+        cwd=ROOT,
+        env={**os.environ, "DATABASE_URL": url},
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def legacy_database(tmp_path):
+    """Banco no estado anterior a a4f9d2c7e315, com produtos gravados sem change_log"""
+    url = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{tmp_path / 'sync.db'}"
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    ChangeLogCounter.__table__.drop(engine)
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        category_id = connection.execute(
+            insert(Category).returning(Category.id), {"name": "Bebidas", "last_updated": now}
+        ).scalar_one()
+        # Core usa os nomes das colunas (codigo é "sku", nome é "name", ...)
+        connection.execute(
+            insert(Product.__table__),
+            [
+                {
+                    "sku": f"P{i}", "name": f"Produto {i}", "cost_price": 1, "sale_price": 2,
+                    "current_stock": 1, "min_stock": 0, "category_id": category_id,
+                    "is_active": i != 2, "last_updated": now,
+                }
+                for i in range(1, 4)
+            ],
+        )
+    _alembic(url, "stamp", "e8b4c2f6a071")
+    _alembic(url, "upgrade", "head")
+    yield sessionmaker(bind=engine, autoflush=False)
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def test_client_starting_from_zero_receives_existing_rows(legacy_database):
+    with legacy_database() as reader:
+        updated, deleted, last_seq, has_more = fetch_updated(reader, Product, None, 0, 100)
+        categories, _, _, _ = fetch_updated(reader, Category, None, 0, 100)
+    assert sorted(product.codigo for product in updated) == ["P1", "P3"]
+    assert len(deleted) == 1
+    assert [category.name for category in categories] == ["Bebidas"]
+    assert not has_more
+
+    # Alterações novas continuam a numeração depois das entradas da migração
+    with legacy_database() as session:
+        product = session.query(Product).filter_by(codigo="P1").one()
+        product.nome = "Produto 1 alterado"
+        record_changes(session, Product.__tablename__, [product.id])
+        session.commit()
+        updated, _, next_seq, _ = fetch_updated(session, Product, None, last_seq, 100)
+    assert [product.codigo for product in updated] == ["P1"]
+    assert next_seq > last_seq